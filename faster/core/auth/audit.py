@@ -0,0 +1,365 @@
+import asyncio
+from collections import deque
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+import json
+import os
+from pathlib import Path
+import re
+from typing import Any
+import uuid
+
+from prometheus_client import Counter, Gauge
+
+from ..config import Settings
+from ..logger import get_logger
+from .repositories import AuthRepository
+from .rollups import record_rollups
+from .segments import SegmentStore
+from .utilities import action_timestamp
+
+logger = get_logger(__name__)
+
+AUDIT_EVENTS = Counter(
+    "auth_audit_events_total",
+    "Audit events by outcome (written, dropped, spilled, replayed, malformed, dead_lettered)",
+    ["outcome"],
+)
+AUDIT_QUEUE_DEPTH = Gauge("auth_audit_queue_depth", "Audit events queued in memory, waiting to be written")
+
+# Failed replays after which a spilled event is set aside in the dead-letter file, and the field counting them
+MAX_REPLAY_ATTEMPTS = 5
+REPLAY_ATTEMPTS_FIELD = "replay_attempts"
+
+# Where queued events are written: anything with AuthRepository's `log_events`
+AuditSink = AuthRepository | SegmentStore
+
+
+class AuditOverflowPolicy(str, Enum):
+    """What happens to audit events that don't fit in the queue, or whose write failed."""
+
+    DROP = "drop"
+    SPILL = "spill"
+
+
+@dataclass
+class AuditWriterConfig:
+    """Thresholds and overflow handling of the `AuditWriter`, built from the `audit_*` settings."""
+
+    enabled: bool = True
+    batch_size: int = 100
+    flush_interval: float = 1.0
+    max_queue: int = 10000
+    overflow_policy: AuditOverflowPolicy = AuditOverflowPolicy.DROP
+    spill_path: str = "./logs/audit_spill.ndjson"
+    rollups: bool = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AuditWriterConfig":
+        return cls(
+            enabled=settings.audit_write_behind,
+            batch_size=settings.audit_batch_size,
+            flush_interval=settings.audit_flush_interval,
+            max_queue=settings.audit_max_queue,
+            overflow_policy=AuditOverflowPolicy(settings.audit_overflow_policy),
+            spill_path=settings.audit_spill_path,
+            rollups=settings.audit_rollups,
+        )
+
+
+class AuditWriter:
+    """
+    Write-behind buffer for audit events (AUTH_USER_ACTION rows).
+
+    `enqueue` keeps an event in memory and returns at once. A background task writes the queued events to the
+    sink (`AuthRepository.log_events` as multi-row inserts, or a `SegmentStore`), once `batch_size` are
+    waiting or `flush_interval` seconds after the first of them was queued. Events carry the time they were
+    queued, not the time they are written. With `rollups`, each written batch is also counted in the Redis
+    rollups (`record_rollups`, one pipelined call per batch), at the time its events were queued.
+
+    A batch the sink rejects is split in halves, down to single events, so that one bad event doesn't take
+    the whole batch with it: only the events that still fail are overflowed.
+
+    At most `max_queue` events are held. Events beyond that, and those of a failed write, are dropped or,
+    with the "spill" policy, appended as NDJSON to this process's own file next to `spill_path` (its pid
+    added to the name) and written once the queue has drained. The files left behind by processes that are
+    no longer running are replayed too. Unreadable spilled lines are skipped, and an event whose replay was
+    rejected MAX_REPLAY_ATTEMPTS times while the sink accepted others goes to this process's dead-letter
+    file (`audit_spill.dead-letter.<pid>.ndjson`) instead of being spilled again. `close()` writes
+    everything still queued.
+
+    Events are timestamped on the clock of the D_TIMESTAMP column default (naive UTC), as they were when
+    the database set it.
+
+    Example:
+        >>> writer = AuditWriter(AuthRepository(), AuditWriterConfig(batch_size=50))
+        >>> writer.start()
+        >>> writer.enqueue({"event_type": "auth", "event_name": "login", "event_source": "supabase"})
+        True
+        >>> await writer.close()
+    """
+
+    def __init__(self, sink: AuditSink, config: AuditWriterConfig) -> None:
+        self.sink = sink
+        self.config = config
+        self._queue: deque[dict[str, Any]] = deque()
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Start the background task writing queued events."""
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background task, then write every queued (and spilled) event."""
+        self._closing = True
+        self._pending.set()
+        self._full.set()
+        if self._task is not None:
+            _ = await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        _ = await self.flush()
+
+    def enqueue(self, event: dict[str, Any]) -> bool:
+        """
+        Queue an event for writing.
+
+        Args:
+            event: Keyword arguments of `AuthRepository.log_event` (without `session`)
+
+        Returns:
+            False if the queue was full and the event was dropped
+        """
+        _ = event.setdefault("timestamp", action_timestamp())
+        if len(self._queue) >= self.config.max_queue:
+            return self._overflow([event])
+        self._queue.append(event)
+        AUDIT_QUEUE_DEPTH.set(len(self._queue))
+        self._pending.set()
+        if len(self._queue) >= self.config.batch_size:
+            self._full.set()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write every queued event now, in batches of `batch_size`, then the spilled ones.
+
+        Returns:
+            Number of events written
+        """
+        async with self._flush_lock:
+            written = 0
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.config.batch_size, len(self._queue)))]
+                AUDIT_QUEUE_DEPTH.set(len(self._queue))
+                written += await self._write(batch)
+            self._pending.clear()
+            self._full.clear()
+            return written + await self._replay_spilled(sink_up=written > 0)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            _ = await self._pending.wait()
+            if not self._full.is_set():
+                with contextlib.suppress(asyncio.TimeoutError):
+                    _ = await asyncio.wait_for(self._full.wait(), self.config.flush_interval)
+            if self._closing:
+                return
+            try:
+                _ = await self.flush()
+            except Exception as exp:
+                logger.error(f"Audit event flush failed: {exp}")
+
+    async def _write(self, batch: list[dict[str, Any]]) -> int:
+        """Write a batch of queued events, and overflow those the sink rejects."""
+        written, failed = await self._write_events(batch)
+        AUDIT_EVENTS.labels(outcome="written").inc(written)
+        if failed:
+            _ = self._overflow(failed)
+        return written
+
+    async def _write_events(self, batch: list[dict[str, Any]]) -> tuple[int, list[dict[str, Any]]]:
+        """
+        Write a batch; if the sink rejects it, write its halves instead, down to single events.
+
+        Returns:
+            Number of events written, and the events that could not be
+        """
+        failed: list[dict[str, Any]] = []
+        errors: list[Exception] = []
+
+        async def write(events: list[dict[str, Any]]) -> int:
+            try:
+                written = await self.sink.log_events(events)
+            except Exception as exp:
+                if len(events) == 1:
+                    failed.extend(events)
+                    errors.append(exp)
+                    return 0
+                middle = len(events) // 2
+                return await write(events[:middle]) + await write(events[middle:])
+            if self.config.rollups:
+                _ = await record_rollups(events)
+            return written
+
+        written = await write(batch)
+        if failed:
+            logger.error(f"Failed to write {len(failed)} of {len(batch)} audit events: {errors[-1]}")
+        return written, failed
+
+    def _overflow(self, events: list[dict[str, Any]]) -> bool:
+        """Spill or drop events that can't be queued or written; True if they were spilled."""
+        if self.config.overflow_policy is AuditOverflowPolicy.SPILL:
+            try:
+                # A small append: cheaper than handing it to a thread, and it keeps the events in order
+                _append_ndjson(self._spill_file(os.getpid()), events)
+                AUDIT_EVENTS.labels(outcome="spilled").inc(len(events))
+                return True
+            except OSError as exp:
+                logger.error(f"Failed to spill {len(events)} audit events: {exp}")
+        AUDIT_EVENTS.labels(outcome="dropped").inc(len(events))
+        logger.warning(f"Dropped {len(events)} audit events", extra={"queued": len(self._queue)})
+        return False
+
+    def _spill_file(self, pid: int, replaying: bool = False) -> Path:
+        """
+        This process's spill file (`audit_spill.<pid>.ndjson`), or a new name to set one aside under while it
+        is replayed (`audit_spill.<pid>.<token>.ndjson.replaying`).
+        """
+        base = Path(self.config.spill_path)
+        if not replaying:
+            return base.with_name(f"{base.stem}.{pid}{base.suffix}")
+        return base.with_name(f"{base.stem}.{pid}.{uuid.uuid4().hex[:8]}{base.suffix}.replaying")
+
+    def _claim_spilled(self) -> list[Path]:
+        """
+        Set aside the spill files this process is to replay: its own files left from an earlier replay, those
+        of processes that are gone (or from before spill files were per process), oldest first, then its
+        current one.
+
+        Files are claimed by renaming them to a name of this process, so two workers can't replay the same one.
+        """
+        base = Path(self.config.spill_path)
+        if not base.parent.is_dir():
+            return []
+        pattern = re.compile(
+            rf"{re.escape(base.stem)}(?:\.(\d+)(?:\.[0-9a-f]+)?)?{re.escape(base.suffix)}(\.replaying)?"
+        )
+        own_pid = os.getpid()
+        claimed: list[Path] = []
+        current: Path | None = None
+        for path in sorted(base.parent.iterdir(), key=_modified_at):
+            match = pattern.fullmatch(path.name)
+            if match is None:
+                continue
+            pid = int(match[1]) if match[1] else None
+            if pid == own_pid and match[2]:
+                claimed.append(path)
+                continue
+            if pid is not None and pid != own_pid and _process_alive(pid):
+                continue
+            target = self._spill_file(own_pid, replaying=True)
+            try:
+                _ = path.rename(target)
+            except FileNotFoundError:  # claimed by another worker first
+                continue
+            if pid == own_pid:
+                current = target
+            else:
+                claimed.append(target)
+        return [*claimed, current] if current is not None else claimed
+
+    async def _replay_spilled(self, sink_up: bool = False) -> int:
+        """
+        Write the spilled events. Those that fail again are spilled again, with one more attempt counted
+        if the sink accepted other events in this flush (`sink_up`, or another replayed batch): a failure
+        while the sink is down says nothing about the event. Events out of attempts are dead-lettered.
+        """
+        if self.config.overflow_policy is not AuditOverflowPolicy.SPILL:
+            return 0
+        written = 0
+        for replaying in await asyncio.to_thread(self._claim_spilled):
+            lines = await asyncio.to_thread(replaying.read_text, encoding="utf-8")
+            events, attempts = self._parse_spilled(replaying, lines)
+            for start in range(0, len(events), self.config.batch_size):
+                batch_written, failed = await self._write_events(events[start : start + self.config.batch_size])
+                written += batch_written
+                if failed:
+                    counted = sink_up or written > 0
+                    self._respill(failed, [attempts[id(event)] + counted for event in failed])
+            await asyncio.to_thread(replaying.unlink)
+        AUDIT_EVENTS.labels(outcome="replayed").inc(written)
+        return written
+
+    @staticmethod
+    def _parse_spilled(path: Path, lines: str) -> tuple[list[dict[str, Any]], dict[int, int]]:
+        """Events of a spill file, and their failed replays (by event id()); malformed lines are skipped."""
+        events: list[dict[str, Any]] = []
+        attempts: dict[int, int] = {}
+        malformed = 0
+        for line in lines.splitlines():
+            try:
+                event = json.loads(line)
+                event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+                attempts[id(event)] = int(event.pop(REPLAY_ATTEMPTS_FIELD, 0))
+            except (ValueError, TypeError, KeyError):  # a line torn by a crash, or not an event at all
+                malformed += 1
+                continue
+            events.append(event)
+        if malformed:
+            AUDIT_EVENTS.labels(outcome="malformed").inc(malformed)
+            logger.warning(f"Skipped {malformed} malformed lines of audit spill file {path.name}")
+        return events, attempts
+
+    def _respill(self, events: list[dict[str, Any]], attempts: list[int]) -> None:
+        """Spill replayed events again with their attempts, or dead-letter those out of attempts."""
+        retry = [{**event, REPLAY_ATTEMPTS_FIELD: n} for event, n in zip(events, attempts, strict=True)]
+        dead = [event for event in retry if event[REPLAY_ATTEMPTS_FIELD] >= MAX_REPLAY_ATTEMPTS]
+        if dead:
+            base = Path(self.config.spill_path)
+            dead_letter = base.with_name(f"{base.stem}.dead-letter.{os.getpid()}{base.suffix}")
+            try:
+                _append_ndjson(dead_letter, dead)
+                AUDIT_EVENTS.labels(outcome="dead_lettered").inc(len(dead))
+                logger.error(f"Moved {len(dead)} audit events that keep failing to {dead_letter}")
+            except OSError as exp:
+                AUDIT_EVENTS.labels(outcome="dropped").inc(len(dead))
+                logger.error(f"Failed to dead-letter {len(dead)} audit events: {exp}")
+        retry = [event for event in retry if event[REPLAY_ATTEMPTS_FIELD] < MAX_REPLAY_ATTEMPTS]
+        if retry:
+            _ = self._overflow(retry)
+
+
+def _append_ndjson(path: Path, events: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as file:
+        file.writelines(json.dumps(event, default=str) + "\n" for event in events)
+
+
+def _modified_at(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this pid is running (on this host)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
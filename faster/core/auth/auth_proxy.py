@@ -5,6 +5,7 @@ import httpx
 import jwt
 from supabase import Client, create_client
 
+from ..database import guard_external_io
 from ..logger import get_logger
 from .models import UserProfileData
 
@@ -202,6 +203,7 @@ class AuthProxy:
         """
         try:
             async with httpx.AsyncClient(timeout=10.0) as client:
+                guard_external_io("jwks")
                 response = await client.get(jwks_url)
                 _ = response.raise_for_status()
                 return dict(response.json())
@@ -333,6 +335,7 @@ class AuthProxy:
         """Get user profile by ID directly from Supabase Auth."""
         try:
             # Fetch from Supabase
+            guard_external_io("supabase")
             response = self.service_client.auth.admin.get_user_by_id(user_id)
             user_data = response.user
 
@@ -392,6 +395,7 @@ class AuthProxy:
         """
         try:
             # Use service client to update user password
+            guard_external_io("supabase")
             response = self.service_client.auth.admin.update_user_by_id(user_id, {"password": new_password})
 
             if response.user:
@@ -416,6 +420,7 @@ class AuthProxy:
         """
         try:
             # Use client (not service client) for password reset
+            guard_external_io("supabase")
             self.client.auth.reset_password_email(email)
 
             # Supabase password reset typically returns success even if email doesn't exist
@@ -440,6 +445,7 @@ class AuthProxy:
         """
         try:
             # Use client to verify session and update password
+            guard_external_io("supabase")
             response = self.client.auth.update_user({"password": new_password})
 
             if response.user:
@@ -465,6 +471,7 @@ class AuthProxy:
         """
         try:
             # Get user details to extract email
+            guard_external_io("supabase")
             response = self.service_client.auth.admin.get_user_by_id(user_id)
             if not response.user or not response.user.email:
                 logger.warning(f"User not found or no email for user {user_id}")
@@ -506,6 +513,7 @@ class AuthProxy:
         """
         try:
             # Use service client to delete user
+            guard_external_io("supabase")
             self.service_client.auth.admin.delete_user(user_id)
 
             # Supabase delete user typically doesn't return user data
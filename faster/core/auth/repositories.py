@@ -1,12 +1,16 @@
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import json
 import logging
-from typing import Any
+from typing import Any, cast
 
-from sqlmodel import select
+from sqlalchemy import ARRAY, ColumnElement, String, and_, any_, bindparam, case, or_
+from sqlalchemy import select as sa_select
+from sqlmodel import col, select, update
+from sqlmodel.sql.expression import SelectOfScalar
 
-from ..database import BaseRepository, DatabaseManager, DBSession
+from ..database import BaseRepository, D1Session, DatabaseManager, DBSession, HotQuery
 from ..exceptions import DBError
 from .models import UserProfileData
 from .schemas import User, UserAction, UserMetadata, UserProfile, UserRole
@@ -16,6 +20,44 @@ from .schemas import User, UserAction, UserMetadata, UserProfile, UserRole
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class UserRecord:
+    """The user columns a profile is built from, read by a hot query instead of loading a `User` entity."""
+
+    auth_id: str
+    aud: str
+    role: str
+    email: str
+    email_confirmed_at: datetime | None
+    phone: str | None
+    confirmed_at: datetime | None
+    last_sign_in_at: datetime | None
+    is_anonymous: bool
+    auth_created_at: datetime | None
+    auth_updated_at: datetime | None
+
+
+_USER_RECORD_COLUMNS = len(UserRecord.__slots__)
+
+# Hot-path reads behind the user and role caches, run on the raw asyncpg connection on PostgreSQL
+_HOT_USER_INFO = HotQuery(
+    sa_select(
+        *(col(getattr(User, name)) for name in UserRecord.__slots__),
+        col(UserMetadata.metadata_type),
+        col(UserMetadata.key),
+        col(UserMetadata.value),
+    )
+    .outerjoin(UserMetadata, and_(col(UserMetadata.user_auth_id) == col(User.auth_id), col(UserMetadata.in_used) == 1))
+    .where(col(User.auth_id) == bindparam("user_id"))
+    .where(col(User.in_used) == 1)
+)
+_HOT_ROLES = HotQuery(
+    select(UserRole.user_auth_id, UserRole.role).where(
+        col(UserRole.user_auth_id) == any_(bindparam("user_ids", type_=ARRAY(String))), UserRole.in_used == 1
+    )
+)
+
+
 class AuthRepository(BaseRepository):
     """
     Repository for authentication-related database operations.
@@ -164,6 +206,8 @@ class AuthRepository(BaseRepository):
         """
         Get user by authentication ID using internal session management.
 
+        Lookups running concurrently are batched into one query, and memoized within a request.
+
         Args:
             auth_id: User's authentication ID
 
@@ -178,12 +222,33 @@ class AuthRepository(BaseRepository):
             raise ValueError("Authentication ID cannot be empty")
 
         try:
-            async with self.session(readonly=True) as session:
-                return await self.get_user_by_auth_id(session, auth_id)
+            return await self.loader("users", self._load_users, default=None).load(auth_id)
         except Exception as e:
             logger.error(f"Error fetching user by auth_id {auth_id}: {e}")
             raise DBError(f"Failed to fetch user by auth_id {auth_id}: {e}") from e
 
+    async def _load_users(self, auth_ids: list[str]) -> dict[str, User | None]:
+        """Batch function of the users loader: active users by auth_id, one IN (...) query per chunk."""
+        users: dict[str, User | None] = {}
+        async with self.session(readonly=True) as session:
+            if len(auth_ids) == 1:
+                # A lone lookup keeps the plain equality query
+                users[auth_ids[0]] = await self.get_user_by_auth_id(session, auth_ids[0])
+                return users
+
+            chunk_size = self.in_list_size(session)
+            for start in range(0, len(auth_ids), chunk_size):
+                chunk = auth_ids[start : start + chunk_size]
+                query = select(User).where(col(User.auth_id).in_(chunk)).where(User.in_used == 1)
+                for user in (await session.exec(query)).all():
+                    users[user.auth_id] = user
+        return users
+
+    def _forget_users(self, *user_ids: str) -> None:
+        """Drop these users and their roles from the request's loaders after writing them."""
+        self.clear_loader("users", *user_ids)
+        self.clear_loader("roles", *user_ids)
+
     async def should_update_user_in_db(self, user_id: str) -> bool:
         """
         Check if user information should be updated in database.
@@ -357,6 +422,7 @@ class AuthRepository(BaseRepository):
                 session.add(user)
 
             await session.flush()
+            self._forget_users(user_data["id"])
             logger.info(
                 f"{'Updated existing' if existing_user else 'Created new'} user with auth_id: {user_data['id']}"
             )
@@ -396,45 +462,34 @@ class AuthRepository(BaseRepository):
             raise ValueError("Metadata dictionary cannot be empty")
 
         try:
-            # Handle each metadata key individually to avoid UNIQUE constraint violations
-            for key, value in metadata.items():
-                # First, try to find existing record for this specific key
-                existing_query = select(UserMetadata).where(
-                    UserMetadata.user_auth_id == user_auth_id,
-                    UserMetadata.metadata_type == metadata_type,
-                    UserMetadata.key == key,
-                )
-                existing_result = await session.exec(existing_query)
-                existing_record = existing_result.first()
-
-                if existing_record:
-                    # Update existing record
-                    existing_record.value = json.dumps(value) if value is not None else None
-                    existing_record.in_used = 1
-                    existing_record.updated_at = datetime.now()
-                else:
-                    # Insert new record
-                    new_record = UserMetadata(
-                        user_auth_id=user_auth_id,
-                        metadata_type=metadata_type,
-                        key=key,
-                        value=json.dumps(value) if value is not None else None,
-                    )
-                    session.add(new_record)
-
-            # Soft delete any remaining records that are no longer in the metadata
-            existing_keys = set(metadata.keys())
-            all_existing_query = select(UserMetadata).where(
-                UserMetadata.user_auth_id == user_auth_id,
-                UserMetadata.metadata_type == metadata_type,
-                UserMetadata.in_used == 1,
+            # Upsert every key at once, then soft delete the keys that are no longer in the metadata
+            now = datetime.now()
+            rows = [
+                {
+                    "user_auth_id": user_auth_id,
+                    "metadata_type": metadata_type,
+                    "key": key,
+                    "value": json.dumps(value) if value is not None else None,
+                    "in_used": 1,
+                    "updated_at": now,
+                }
+                for key, value in metadata.items()
+            ]
+            _ = await self.bulk_upsert(
+                UserMetadata,
+                rows,
+                conflict_cols=["user_auth_id", "metadata_type", "key"],
+                update_cols=["value", "in_used", "updated_at"],
+                session=session,
+            )
+            _ = await session.exec(
+                update(UserMetadata)
+                .where(col(UserMetadata.user_auth_id) == user_auth_id)
+                .where(col(UserMetadata.metadata_type) == metadata_type)
+                .where(col(UserMetadata.in_used) == 1)
+                .where(col(UserMetadata.key).not_in(list(metadata)))
+                .values(in_used=0, updated_at=now)
             )
-            all_existing_result = await session.exec(all_existing_query)
-
-            for record in all_existing_result:
-                if record.key not in existing_keys:
-                    record.in_used = 0
-                    record.updated_at = datetime.now()
         except Exception as e:
             logger.error(f"Error creating or updating metadata for user {user_auth_id}, type {metadata_type}: {e}")
             raise DBError(
@@ -475,11 +530,52 @@ class AuthRepository(BaseRepository):
             logger.error(f"Failed to get user info: {e}", extra={"user_id": user_id})
             raise DBError(f"Failed to get user info for user {user_id}: {e}") from e
 
+    async def get_users_info(
+        self, user_ids: Sequence[str], session: DBSession | None = None
+    ) -> dict[str, UserProfileData]:
+        """
+        Get profile information for many users at once.
+
+        Loads the users with one query and all their active metadata with a second one (per IN (...)
+        chunk of `in_list_size` users), instead of two queries per user.
+
+        Args:
+            user_ids: Users' authentication IDs; duplicates are ignored
+            session: Optional database session to use (for background tasks)
+
+        Returns:
+            Dictionary of user ID to UserProfileData, in the order of user_ids; users that don't exist are left out
+
+        Raises:
+            ValueError: If a user ID is empty
+            DBError: If database query fails
+
+        Example:
+            >>> repo = AuthRepository()
+            >>> profiles = await repo.get_users_info(["user123", "user456"])
+            >>> print(profiles["user123"].email)  # user@example.com
+        """
+        if any(not user_id or not user_id.strip() for user_id in user_ids):
+            raise ValueError("User ID cannot be empty")
+        unique_ids = list(dict.fromkeys(user_ids))
+        if not unique_ids:
+            return {}
+
+        try:
+            if session is not None:
+                return await self._get_users_info_impl(session, unique_ids)
+            async with self.session(readonly=True) as db_session:
+                return await self._get_users_info_impl(db_session, unique_ids)
+        except Exception as e:
+            logger.error(f"Failed to get user info for {len(unique_ids)} users: {e}")
+            raise DBError(f"Failed to get user info for {len(unique_ids)} users: {e}") from e
+
     async def _get_user_info_impl(self, session: DBSession, user_id: str) -> UserProfileData | None:
         """
         Internal implementation for getting user profile information.
 
-        Retrieves user data from the database and constructs a UserProfileData object.
+        Fetches the user and its active metadata with one outer-joined query (one row per metadata entry)
+        and constructs a UserProfileData object.
 
         Args:
             session: Database session
@@ -489,36 +585,85 @@ class AuthRepository(BaseRepository):
             UserProfileData object if user exists, None otherwise
         """
         try:
-            # Get base user information
-            user = await self._get_base_user(session, user_id)
-            if not user:
+            hot_rows = await self.fetch_hot(session, _HOT_USER_INFO, user_id=user_id)
+            if hot_rows is not None:
+                if not hot_rows:
+                    return None
+                app_metadata, user_metadata = self._split_metadata(
+                    tuple(row[_USER_RECORD_COLUMNS:]) for row in hot_rows if row[_USER_RECORD_COLUMNS] is not None
+                )
+                user = UserRecord(*hot_rows[0][:_USER_RECORD_COLUMNS])
+                return self._to_user_profile(user, app_metadata, user_metadata)
+
+            query = (
+                select(User, UserMetadata.metadata_type, UserMetadata.key, UserMetadata.value)
+                .outerjoin(
+                    UserMetadata,
+                    and_(col(UserMetadata.user_auth_id) == col(User.auth_id), col(UserMetadata.in_used) == 1),
+                )
+                .where(User.auth_id == user_id)
+                .where(User.in_used == 1)
+            )
+            rows = (await session.exec(query)).all()
+            if not rows:
                 return None
 
-            # Get and process metadata (simplified for compatibility)
-            app_metadata, user_metadata = await self._get_user_metadata_simple(session, user_id)
-
-            # Create UserProfileData object
-            return UserProfileData(
-                id=user.auth_id,
-                aud=user.aud or "",
-                role=user.role or "",
-                email=user.email or "",
-                email_confirmed_at=user.email_confirmed_at,
-                phone=user.phone,
-                confirmed_at=user.confirmed_at,
-                last_sign_in_at=user.last_sign_in_at,
-                is_anonymous=user.is_anonymous,
-                created_at=user.auth_created_at or datetime.now(),
-                updated_at=user.auth_updated_at,
-                app_metadata=app_metadata,
-                user_metadata=user_metadata,
-                identities=[],  # Simplified - can be extended if needed
+            app_metadata, user_metadata = self._split_metadata(
+                (metadata_type, key, value) for _, metadata_type, key, value in rows if metadata_type is not None
             )
+            return self._to_user_profile(rows[0][0], app_metadata, user_metadata)
 
         except Exception as e:
             logger.error(f"Error getting user info for user_id {user_id}: {e}")
             raise
 
+    async def _get_users_info_impl(self, session: DBSession, user_ids: list[str]) -> dict[str, UserProfileData]:
+        """Load users and their active metadata with two queries per IN (...) chunk."""
+        users: dict[str, User] = {}
+        metadata_rows: dict[str, list[tuple[str, str, str | None]]] = {}
+        chunk_size = self.in_list_size(session)
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start : start + chunk_size]
+            user_query = select(User).where(col(User.auth_id).in_(chunk)).where(User.in_used == 1)
+            for user in (await session.exec(user_query)).all():
+                users[user.auth_id] = user
+
+            metadata_query = (
+                select(UserMetadata.user_auth_id, UserMetadata.metadata_type, UserMetadata.key, UserMetadata.value)
+                .where(col(UserMetadata.user_auth_id).in_(chunk))
+                .where(UserMetadata.in_used == 1)
+            )
+            for user_auth_id, metadata_type, key, value in (await session.exec(metadata_query)).all():
+                metadata_rows.setdefault(user_auth_id, []).append((metadata_type, key, value))
+
+        profiles: dict[str, UserProfileData] = {}
+        for user_id in user_ids:
+            if user_id in users:
+                app_metadata, user_metadata = self._split_metadata(metadata_rows.get(user_id, []))
+                profiles[user_id] = self._to_user_profile(users[user_id], app_metadata, user_metadata)
+        return profiles
+
+    @staticmethod
+    def _to_user_profile(
+        user: User | UserRecord, app_metadata: dict[str, Any], user_metadata: dict[str, Any]
+    ) -> UserProfileData:
+        return UserProfileData(
+            id=user.auth_id,
+            aud=user.aud or "",
+            role=user.role or "",
+            email=user.email or "",
+            email_confirmed_at=user.email_confirmed_at,
+            phone=user.phone,
+            confirmed_at=user.confirmed_at,
+            last_sign_in_at=user.last_sign_in_at,
+            is_anonymous=user.is_anonymous,
+            created_at=user.auth_created_at or datetime.now(),
+            updated_at=user.auth_updated_at,
+            app_metadata=app_metadata,
+            user_metadata=user_metadata,
+            identities=[],  # Simplified - can be extended if needed
+        )
+
     async def _get_base_user(self, session: DBSession, user_id: str) -> User | None:
         """Get base user information from the users table."""
         user_query = select(User).where(User.auth_id == user_id).where(User.in_used == 1)
@@ -534,21 +679,27 @@ class AuthRepository(BaseRepository):
         )
         result = await session.exec(metadata_query)
         metadata_rows = result.all()
+        return self._split_metadata((row.metadata_type, row.key, row.value) for row in metadata_rows)
 
+    @staticmethod
+    def _split_metadata(
+        metadata_rows: Iterable[tuple[str, str, str | None]],
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Decode (metadata_type, key, value) rows into app and user metadata dictionaries."""
         app_metadata_dict: dict[str, Any] = {}
         user_metadata_dict: dict[str, Any] = {}
 
-        for metadata_row in metadata_rows:
+        for metadata_type, key, raw_value in metadata_rows:
             try:
                 # Try to parse as JSON first, fallback to string
-                value = json.loads(metadata_row.value) if metadata_row.value else None
+                value = json.loads(raw_value) if raw_value else None
             except (json.JSONDecodeError, TypeError):
-                value = metadata_row.value
+                value = raw_value
 
-            if metadata_row.metadata_type == "app":
-                app_metadata_dict[metadata_row.key] = value
-            elif metadata_row.metadata_type == "user":
-                user_metadata_dict[metadata_row.key] = value
+            if metadata_type == "app":
+                app_metadata_dict[key] = value
+            elif metadata_type == "user":
+                user_metadata_dict[key] = value
 
         return app_metadata_dict, user_metadata_dict
 
@@ -638,6 +789,7 @@ class AuthRepository(BaseRepository):
             await self._ensure_user_has_role(session, user_profile.id)
 
             await session.flush()
+            self._forget_users(user_profile.id)
             logger.info(f"Successfully stored user profile for user_id: {user_profile.id}")
             return True
 
@@ -716,6 +868,8 @@ class AuthRepository(BaseRepository):
         """
         Get all roles assigned to a user.
 
+        Lookups running concurrently are batched into one query, and memoized within a request.
+
         Args:
             user_id: User's authentication ID
 
@@ -735,16 +889,34 @@ class AuthRepository(BaseRepository):
             raise ValueError("User ID cannot be empty")
 
         try:
-            async with self.session(readonly=True) as session:
-                query = select(UserRole.role).where(UserRole.user_auth_id == user_id, UserRole.in_used == 1)
-                result = await session.exec(query)
-                roles = result.all()
-
-                return list(roles) if roles else []
+            # Copy, as the loaded list may be memoized and shared with other callers
+            return list(await self.loader("roles", self._load_roles, default=list[str]()).load(user_id))
         except Exception as e:
             logger.error(f"Failed to get roles for user {user_id}: {e}")
             raise DBError(f"Failed to get roles for user {user_id}: {e}") from e
 
+    async def _load_roles(self, user_ids: list[str]) -> dict[str, list[str]]:
+        """Batch function of the roles loader: active roles by user, one IN (...) query per chunk."""
+        roles: dict[str, list[str]] = {}
+        async with self.session(readonly=True) as session:
+            # An array parameter takes any number of users; with the query cache on, its results win
+            hot_rows = None
+            if self.db_manager.query_cache is None:
+                hot_rows = await self.fetch_hot(session, _HOT_ROLES, user_ids=user_ids)
+            if hot_rows is not None:
+                for user_auth_id, role in hot_rows:
+                    roles.setdefault(user_auth_id, []).append(role)
+                return roles
+
+            chunk_size = self.in_list_size(session)
+            for start in range(0, len(user_ids), chunk_size):
+                query = select(UserRole.user_auth_id, UserRole.role).where(
+                    col(UserRole.user_auth_id).in_(user_ids[start : start + chunk_size]), UserRole.in_used == 1
+                )
+                for user_auth_id, role in (await self.cached_exec(session, query)).all():
+                    roles.setdefault(user_auth_id, []).append(role)
+        return roles
+
     async def set_roles(self, user_id: str, roles: list[str], disable_others: bool = True) -> bool:
         """
         Set roles for a user with enhanced logic for managing existing roles.
@@ -777,61 +949,7 @@ class AuthRepository(BaseRepository):
 
         try:
             async with self.transaction() as session:
-                # Step 1: If disable_others=True, disable roles not in current roles list
-                if disable_others:
-                    # Get all active roles for the user
-                    all_user_roles_query = (
-                        select(UserRole).where(UserRole.user_auth_id == user_id).where(UserRole.in_used == 1)
-                    )
-
-                    all_user_roles_result = await session.exec(all_user_roles_query)
-                    all_user_roles = all_user_roles_result.all()
-
-                    # Find roles to disable (not in the current roles list)
-                    roles_set = set(roles)
-                    for role_record in all_user_roles:
-                        if role_record.role not in roles_set:
-                            role_record.in_used = 0
-                            role_record.updated_at = datetime.now()
-                            session.add(role_record)
-
-                # Step 2: For each role in the roles list, reactivate or insert
-                for role in roles:
-                    # Try to reactivate existing disabled role using SQLModel
-                    existing_disabled_role_query = (
-                        select(UserRole)
-                        .where(UserRole.user_auth_id == user_id)
-                        .where(UserRole.role == role)
-                        .where(UserRole.in_used == 0)
-                    )
-
-                    existing_disabled_result = await session.exec(existing_disabled_role_query)
-                    existing_disabled_role = existing_disabled_result.first()
-
-                    if existing_disabled_role:
-                        # Reactivate the existing disabled role
-                        existing_disabled_role.in_used = 1
-                        existing_disabled_role.updated_at = datetime.now()
-                        session.add(existing_disabled_role)
-                    else:
-                        # Check if role already exists and is active
-                        check_stmt = (
-                            select(UserRole).where(UserRole.user_auth_id == user_id).where(UserRole.role == role)
-                        )
-                        check_result = await session.exec(check_stmt)
-                        existing_role = check_result.first()
-
-                        # Only insert if role doesn't exist at all
-                        if not existing_role:
-                            new_role = UserRole(
-                                user_auth_id=user_id,
-                                role=role,
-                                in_used=1,
-                                created_at=datetime.now(),
-                                updated_at=datetime.now(),
-                            )
-                            session.add(new_role)
-
+                _ = await self._reconcile_roles(session, {user_id: roles}, disable_others)
                 await session.flush()
                 logger.info(f"Successfully set roles for user {user_id}: {roles} (disable_others={disable_others})")
                 return True
@@ -839,6 +957,95 @@ class AuthRepository(BaseRepository):
             logger.error(f"Failed to set roles for user {user_id}: {e}")
             raise DBError(f"Failed to set roles for user {user_id}: {e}") from e
 
+    async def set_roles_for_users(self, roles_by_user: dict[str, list[str]], disable_others: bool = True) -> bool:
+        """
+        Set roles for many users in one transaction, e.g. for a bulk admin operation or a role sync.
+
+        Same rules as `set_roles`, applied to every user: the current role rows of all users are loaded
+        in a few IN (...) queries and only the difference is written.
+
+        Args:
+            roles_by_user: Mapping of user authentication ID to the roles to assign
+            disable_others: If True, disable each user's roles that are not in their list
+
+        Returns:
+            True if successful
+
+        Raises:
+            ValueError: If a user ID is empty
+            DBError: If database operation fails
+
+        Example:
+            >>> repo = AuthRepository()
+            >>> await repo.set_roles_for_users({"user1": ["admin"], "user2": ["user"]})
+        """
+        if any(not user_id or not user_id.strip() for user_id in roles_by_user):
+            raise ValueError("User ID cannot be empty")
+        if not roles_by_user:
+            return True
+
+        try:
+            async with self.transaction() as session:
+                changed = await self._reconcile_roles(session, roles_by_user, disable_others)
+                await session.flush()
+                logger.info(f"Set roles for {len(roles_by_user)} users, {changed} role rows changed")
+                return True
+        except Exception as e:
+            logger.error(f"Failed to set roles for {len(roles_by_user)} users: {e}")
+            raise DBError(f"Failed to set roles for {len(roles_by_user)} users: {e}") from e
+
+    async def _reconcile_roles(
+        self, session: DBSession, roles_by_user: dict[str, list[str]], disable_others: bool
+    ) -> int:
+        """
+        Bring the users' role rows in line with `roles_by_user` and return how many rows changed.
+
+        The existing rows (active or not) are read once, the diff is computed in memory, and it is applied
+        with one UPDATE that sets in_used by primary key and one bulk insert for the missing roles
+        (both split into chunks only when the lists exceed what one statement can bind).
+        """
+        in_list_size = self.in_list_size(session)
+        user_ids = list(roles_by_user)
+        existing: dict[tuple[str, str], tuple[int, int]] = {}
+        for start in range(0, len(user_ids), in_list_size):
+            query = select(UserRole.id, UserRole.user_auth_id, UserRole.role, UserRole.in_used).where(
+                col(UserRole.user_auth_id).in_(user_ids[start : start + in_list_size])
+            )
+            for role_id, user_auth_id, role, in_used in (await session.exec(query)).all():
+                existing[(user_auth_id, role)] = (cast(int, role_id), in_used)
+
+        wanted = dict.fromkeys((user_id, role) for user_id, roles in roles_by_user.items() for role in roles)
+        changes: dict[int, int] = {}
+        for key, (role_id, in_used) in existing.items():
+            if key in wanted and not in_used:
+                changes[role_id] = 1
+            elif key not in wanted and in_used and disable_others:
+                changes[role_id] = 0
+        missing = [key for key in wanted if key not in existing]
+
+        now = datetime.now()
+        role_ids = list(changes)
+        # Each chunk binds its ids twice (WHERE and CASE) plus the timestamp
+        chunk_size = max(1, (in_list_size - 1) // 2)
+        for start in range(0, len(role_ids), chunk_size):
+            chunk = role_ids[start : start + chunk_size]
+            enabled = [role_id for role_id in chunk if changes[role_id]]
+            _ = await session.exec(
+                update(UserRole)
+                .where(col(UserRole.id).in_(chunk))
+                .values(in_used=case((col(UserRole.id).in_(enabled), 1), else_=0), updated_at=now)
+            )
+
+        _ = await self.bulk_upsert(
+            UserRole,
+            [{"user_auth_id": user_id, "role": role, "in_used": 1, "updated_at": now} for user_id, role in missing],
+            conflict_cols=["user_auth_id", "role"],
+            update_cols=["in_used", "updated_at"],
+            session=session,
+        )
+        self._forget_users(*user_ids)
+        return len(changes) + len(missing)
+
     async def log_event(
         self,
         event_type: str,
@@ -1037,6 +1244,125 @@ class AuthRepository(BaseRepository):
             )
             raise
 
+    async def log_events(self, events: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Log many user actions at once, inserted as multi-row statements in one transaction.
+
+        Args:
+            events: Keyword arguments of `log_event` per event (without `session`), optionally with the
+                `timestamp` the event occurred at
+
+        Returns:
+            Number of events logged
+
+        Raises:
+            DBError: If database operation fails
+
+        Example:
+            >>> await repo.log_events([{"event_type": "auth", "event_name": "login", "event_source": "supabase"}])
+            1
+        """
+        if not events:
+            return 0
+        try:
+            async with self.transaction() as session:
+                session.add_all([self._new_user_action(event) for event in events])
+                await session.flush()
+            return len(events)
+        except Exception as e:
+            logger.error(f"Failed to log {len(events)} events: {e}")
+            raise DBError(f"Failed to log {len(events)} events: {e}") from e
+
+    @staticmethod
+    def _new_user_action(event: Mapping[str, Any]) -> UserAction:
+        fields = dict(event)
+        for name in ("event_payload", "extra_metadata"):
+            fields[name] = json.dumps(fields[name]) if fields.get(name) else None
+        return UserAction(**fields, is_processed=False, processing_status="pending")
+
+    async def stream_user_actions(
+        self,
+        user_auth_id: str | None = None,
+        event_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[UserAction, None]:
+        """
+        Stream user actions in `(timestamp, id)` order, without loading the result set into memory.
+
+        Rows are fetched `batch_size` at a time from a server-side cursor, so memory stays flat whatever the
+        number of rows; the session (and its connection) is held until the iterator is exhausted or closed.
+        D1 has no cursors, so there the same order is paged through with keyset queries instead.
+
+        Args:
+            user_auth_id: Only actions of this user
+            event_type: Only actions of this event type
+            since: Only actions at or after this time
+            until: Only actions before this time
+            after: Resume after the action with this `(timestamp, id)`, i.e. the last one received
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            UserAction entities
+
+        Raises:
+            DBError: If the query fails
+
+        Example:
+            >>> async with aclosing(repo.stream_user_actions(event_type="auth")) as actions:
+            ...     async for action in actions:
+            ...         write(action)
+        """
+        query = self._user_actions_query(user_auth_id, event_type, since, until)
+        try:
+            async with self.session(readonly=True) as session:
+                if isinstance(session, D1Session):
+                    # D1 has no cursors: page through the same order with keyset queries
+                    while True:
+                        page_query = query if after is None else query.where(self._after_action(*after))
+                        page = (await session.exec(page_query.limit(batch_size))).all()
+                        for action in page:
+                            yield action
+                        if len(page) < batch_size:
+                            return
+                        after = (page[-1].timestamp, cast(int, page[-1].id))
+
+                if after is not None:
+                    query = query.where(self._after_action(*after))
+                # The identity map only holds weak references, so streamed entities are released once written out
+                actions = await session.stream_scalars(query.execution_options(yield_per=batch_size))
+                async for action in actions:
+                    yield action
+        except Exception as e:
+            logger.error(f"Error streaming user actions: {e}")
+            raise DBError(f"Failed to stream user actions: {e}") from e
+
+    @staticmethod
+    def _user_actions_query(
+        user_auth_id: str | None, event_type: str | None, since: datetime | None, until: datetime | None
+    ) -> SelectOfScalar[UserAction]:
+        """User actions matching the export filters, in `(timestamp, id)` order."""
+        query = select(UserAction)
+        if user_auth_id is not None:
+            query = query.where(UserAction.user_auth_id == user_auth_id)
+        if event_type is not None:
+            query = query.where(UserAction.event_type == event_type)
+        if since is not None:
+            query = query.where(UserAction.timestamp >= since)
+        if until is not None:
+            query = query.where(UserAction.timestamp < until)
+        return query.order_by(col(UserAction.timestamp), col(UserAction.id))
+
+    @staticmethod
+    def _after_action(timestamp: datetime, action_id: int) -> ColumnElement[bool]:
+        """Actions after `(timestamp, action_id)` in `(timestamp, id)` order."""
+        return or_(
+            col(UserAction.timestamp) > timestamp,
+            and_(col(UserAction.timestamp) == timestamp, col(UserAction.id) > action_id),
+        )
+
     # =============================================================================
     # Account Management Methods
     # =============================================================================
@@ -1100,6 +1426,7 @@ class AuthRepository(BaseRepository):
                     session.add(role)
 
                 await session.flush()
+                self._forget_users(user_id)
                 logger.info(f"Account deactivated for user {user_id}")
                 return True
 
@@ -1159,6 +1486,7 @@ class AuthRepository(BaseRepository):
                 await self.create_or_update_user_metadata(session, target_user_id, "system", ban_metadata)
 
                 await session.flush()
+                self._forget_users(target_user_id)
                 logger.info(f"User {target_user_id} banned by admin {admin_user_id}")
                 return True
 
@@ -1212,6 +1540,7 @@ class AuthRepository(BaseRepository):
                 await self.create_or_update_user_metadata(session, target_user_id, "system", unban_metadata)
 
                 await session.flush()
+                self._forget_users(target_user_id)
                 logger.info(f"User {target_user_id} unbanned by admin {admin_user_id}")
                 return True
 
@@ -1248,44 +1577,9 @@ class AuthRepository(BaseRepository):
 
         try:
             async with self.transaction() as session:
-                # First, soft delete all existing roles by setting in_used = 0
-                existing_roles_query = (
-                    select(UserRole).where(UserRole.user_auth_id == target_user_id).where(UserRole.in_used == 1)
-                )
-                existing_roles_result = await session.exec(existing_roles_query)
-                existing_roles = existing_roles_result.all()
-
-                for role_record in existing_roles:
-                    role_record.in_used = 0
-                    role_record.updated_at = datetime.now()
-                    session.add(role_record)
-
-                # Then, add new roles
-                roles_added = []
-                for role in roles:
-                    # Check if role already exists for this user
-                    existing_role_query = (
-                        select(UserRole).where(UserRole.user_auth_id == target_user_id).where(UserRole.role == role)
-                    )
-                    existing_role_result = await session.exec(existing_role_query)
-                    existing_role = existing_role_result.first()
-
-                    if existing_role:
-                        # Reactivate existing role
-                        existing_role.in_used = 1
-                        existing_role.updated_at = datetime.now()
-                        session.add(existing_role)
-                    else:
-                        # Create new role record
-                        user_role = UserRole(
-                            user_auth_id=target_user_id,
-                            role=role,
-                            in_used=1,
-                            created_at=datetime.now(),
-                            updated_at=datetime.now(),
-                        )
-                        session.add(user_role)
-                    roles_added.append(role)
+                # Roles not in the list are disabled, the listed ones reactivated or inserted
+                _ = await self._reconcile_roles(session, {target_user_id: roles}, disable_others=True)
+                roles_added = list(dict.fromkeys(roles))
 
                 await session.flush()
                 logger.info(f"Adjusted roles for user {target_user_id} to {roles_added} by admin {admin_user_id}")
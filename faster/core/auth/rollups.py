@@ -0,0 +1,303 @@
+import asyncio
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from enum import Enum
+import os
+from typing import Any
+
+from ..logger import get_logger
+from ..redis import get_redis
+from ..redisex import KeyPrefix
+from .utilities import action_timestamp
+
+logger = get_logger(__name__)
+
+
+class RollupResolution(str, Enum):
+    """Bucket width of the audit rollups."""
+
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+    @property
+    def step(self) -> timedelta:
+        return ROLLUP_STEPS[self]
+
+    def floor(self, moment: datetime) -> datetime:
+        """Start of the bucket holding `moment`."""
+        if self is RollupResolution.MINUTE:
+            return moment.replace(second=0, microsecond=0)
+        if self is RollupResolution.HOUR:
+            return moment.replace(minute=0, second=0, microsecond=0)
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def bucket(self, moment: datetime) -> str:
+        """Name of the bucket holding `moment`."""
+        return moment.strftime(ROLLUP_FORMATS[self])
+
+
+ROLLUP_STEPS = {
+    RollupResolution.MINUTE: timedelta(minutes=1),
+    RollupResolution.HOUR: timedelta(hours=1),
+    RollupResolution.DAY: timedelta(days=1),
+}
+ROLLUP_FORMATS = {
+    RollupResolution.MINUTE: "%Y%m%d%H%M",
+    RollupResolution.HOUR: "%Y%m%d%H",
+    RollupResolution.DAY: "%Y%m%d",
+}
+# How long buckets are kept: minutes for live dashboards, hours until their day is compacted, days for trends
+ROLLUP_TTLS = {
+    RollupResolution.MINUTE: 2 * 86400,
+    RollupResolution.HOUR: 35 * 86400,
+    RollupResolution.DAY: 400 * 86400,
+}
+# Largest number of buckets one query may read
+MAX_QUERY_BUCKETS = 1500
+# Set of the day buckets already compacted from their hours
+COMPACTED_DAYS_KEY = KeyPrefix.AUDIT_ROLLUP.get_key("compacted")
+# Taken for one interval by the worker running the periodic compaction, so that the others skip it
+COMPACTION_LOCK_KEY = KeyPrefix.AUDIT_ROLLUP.get_key("compacting")
+
+
+def rollup_field(event_type: str, event_name: str, event_source: str) -> str:
+    """Hash field counting one kind of event in a rollup bucket."""
+    return f"{event_type}|{event_name}|{event_source}"
+
+
+def _counter_key(resolution: RollupResolution, bucket: str) -> str:
+    return KeyPrefix.AUDIT_ROLLUP.get_key(f"{resolution.value}:{bucket}")
+
+
+def _unique_key(resolution: RollupResolution, bucket: str, dimension: str) -> str:
+    return KeyPrefix.AUDIT_UNIQUE.get_key(f"{resolution.value}:{bucket}:{dimension}")
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+async def _compacted_days() -> set[str]:
+    return {_text(day) for day in await get_redis().smembers(COMPACTED_DAYS_KEY)}
+
+
+async def record_rollup(
+    event_type: str,
+    event_name: str,
+    event_source: str,
+    user_auth_id: str | None = None,
+    at: datetime | None = None,
+) -> bool:
+    """
+    Count one event in the rollups (see `record_rollups`).
+
+    Args:
+        event_type: Type of event (e.g., 'auth', 'admin')
+        event_name: Specific event name (e.g., 'login')
+        event_source: Source of the event (e.g., 'supabase')
+        user_auth_id: User counted as unique, if any
+        at: Time of the event (defaults to now, on the clock of AUTH_USER_ACTION's timestamps)
+
+    Returns:
+        True if the rollups were updated, False on a Redis error (logged, never raised)
+    """
+    event = {
+        "event_type": event_type,
+        "event_name": event_name,
+        "event_source": event_source,
+        "user_auth_id": user_auth_id,
+        "timestamp": at,
+    }
+    return await record_rollups([event])
+
+
+async def record_rollups(events: Sequence[Mapping[str, Any]]) -> bool:
+    """
+    Count events in their minute and hour buckets and add their users to the hour's unique-user HyperLogLogs
+    (one per event type, one per event type and name), in one pipelined call for the whole batch.
+
+    Args:
+        events: Keyword arguments of `AuthRepository.log_event` per event; those without a `timestamp`
+            are counted now
+
+    Returns:
+        True if the rollups were updated, False on a Redis error (logged, never raised)
+    """
+    if not events:
+        return True
+    counts: Counter[tuple[str, str]] = Counter()
+    users: dict[str, set[str]] = {}
+    ttls: dict[str, int] = {}
+    for event in events:
+        at = event.get("timestamp") or action_timestamp()
+        field = rollup_field(event["event_type"], event["event_name"], event["event_source"])
+        for resolution in (RollupResolution.MINUTE, RollupResolution.HOUR):
+            key = _counter_key(resolution, resolution.bucket(at))
+            counts[key, field] += 1
+            ttls[key] = ROLLUP_TTLS[resolution]
+        if user_auth_id := event.get("user_auth_id"):
+            hour = RollupResolution.HOUR.bucket(at)
+            for dimension in (event["event_type"], f"{event['event_type']}|{event['event_name']}"):
+                key = _unique_key(RollupResolution.HOUR, hour, dimension)
+                users.setdefault(key, set()).add(user_auth_id)
+                ttls[key] = ROLLUP_TTLS[RollupResolution.HOUR]
+
+    commands: list[tuple[str, tuple[Any, ...]]] = [("hincrby", (key, field, n)) for (key, field), n in counts.items()]
+    commands += [("pfadd", (key, *sorted(members))) for key, members in users.items()]
+    commands += [("expire", (key, ttl)) for key, ttl in ttls.items()]
+    try:
+        _ = await get_redis().pipeline(commands)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to update audit rollups of {len(events)} events: {e}")
+        return False
+
+
+async def query_rollups(
+    since: datetime,
+    until: datetime,
+    resolution: RollupResolution = RollupResolution.MINUTE,
+    event_type: str | None = None,
+    event_name: str | None = None,
+    event_source: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Event counts per bucket in `[since, until)`, read from the rollups in one pipelined call.
+
+    Days not compacted yet (today, or when compaction is behind) are summed from their hour buckets.
+
+    Args:
+        since: Start of the range (rounded down to the bucket)
+        until: End of the range, exclusive
+        resolution: Bucket width
+        event_type: Only count events of this type
+        event_name: Only count events of this name
+        event_source: Only count events from this source
+
+    Returns:
+        One `{"start", "count", "events"}` dict per bucket, `events` counting each `type|name|source`
+
+    Raises:
+        ValueError: If the range spans more than MAX_QUERY_BUCKETS buckets
+    """
+    starts: list[datetime] = []
+    moment = resolution.floor(since)
+    while moment < until:
+        starts.append(moment)
+        moment += resolution.step
+    if len(starts) > MAX_QUERY_BUCKETS:
+        raise ValueError(f"{len(starts)} {resolution.value} buckets requested, at most {MAX_QUERY_BUCKETS} allowed")
+
+    compacted = await _compacted_days() if resolution is RollupResolution.DAY else set[str]()
+    plan: list[list[str]] = []
+    for start in starts:
+        bucket = resolution.bucket(start)
+        if resolution is RollupResolution.DAY and bucket not in compacted:
+            hours = (start + timedelta(hours=hour) for hour in range(24))
+            plan.append([_counter_key(RollupResolution.HOUR, RollupResolution.HOUR.bucket(hour)) for hour in hours])
+        else:
+            plan.append([_counter_key(resolution, bucket)])
+    hashes = iter(await get_redis().pipeline([("hgetall", (key,)) for keys in plan for key in keys]))
+
+    wanted = (event_type, event_name, event_source)
+    series: list[dict[str, Any]] = []
+    for start, keys in zip(starts, plan, strict=True):
+        events: Counter[str] = Counter()
+        for _ in keys:
+            for name, count in next(hashes).items():
+                field = _text(name)
+                if all(want is None or want == part for want, part in zip(wanted, field.split("|", 2), strict=False)):
+                    events[field] += int(count)
+        series.append({"start": start, "count": sum(events.values()), "events": dict(events)})
+    return series
+
+
+async def count_unique_users(since: datetime, until: datetime, event_type: str, event_name: str | None = None) -> int:
+    """
+    Approximate number of distinct users with events of a type (and name) in `[since, until)`.
+
+    The range is covered by compacted days where it holds whole days, hours elsewhere, so it is read with one
+    PFCOUNT over the union of O(days + hours) HyperLogLogs. It has hour precision: `since` is rounded down
+    to the hour.
+
+    Raises:
+        ValueError: If the range needs more than MAX_QUERY_BUCKETS HyperLogLogs
+    """
+    dimension = event_type if event_name is None else f"{event_type}|{event_name}"
+    compacted = await _compacted_days()
+    keys: list[str] = []
+    moment = RollupResolution.HOUR.floor(since)
+    while moment < until:
+        if len(keys) == MAX_QUERY_BUCKETS:
+            raise ValueError(f"More than {MAX_QUERY_BUCKETS} hour or day buckets requested")
+        day = RollupResolution.DAY.bucket(moment)
+        if moment.hour == 0 and moment + timedelta(days=1) <= until and day in compacted:
+            keys.append(_unique_key(RollupResolution.DAY, day, dimension))
+            moment += timedelta(days=1)
+        else:
+            keys.append(_unique_key(RollupResolution.HOUR, RollupResolution.HOUR.bucket(moment), dimension))
+            moment += timedelta(hours=1)
+    return await get_redis().pfcount(*keys)
+
+
+async def compact_rollups(today: datetime | None = None) -> list[str]:
+    """
+    Compact the hour buckets of each complete day still holding them into a day bucket: counters are summed
+    and the unique-user HyperLogLogs merged. Compacting a day again gives the same result.
+
+    Args:
+        today: Current time; days before it are compacted (defaults to now, on the clock of the event timestamps)
+
+    Returns:
+        The day buckets compacted by this call
+    """
+    redis = get_redis()
+    today = RollupResolution.DAY.floor(today or action_timestamp())
+    compacted = await _compacted_days()
+    done: list[str] = []
+    for age in range(1, ROLLUP_TTLS[RollupResolution.HOUR] // 86400):
+        start = today - timedelta(days=age)
+        day = RollupResolution.DAY.bucket(start)
+        if day in compacted:
+            continue
+        hours = [RollupResolution.HOUR.bucket(start + timedelta(hours=hour)) for hour in range(24)]
+        totals: Counter[str] = Counter()
+        for counts in await redis.pipeline([("hgetall", (_counter_key(RollupResolution.HOUR, h),)) for h in hours]):
+            for field, count in counts.items():
+                totals[_text(field)] += int(count)
+
+        day_key = _counter_key(RollupResolution.DAY, day)
+        day_ttl = ROLLUP_TTLS[RollupResolution.DAY]
+        commands: list[tuple[str, tuple[Any, ...]]] = [("delete", (day_key,))]
+        if totals:
+            commands += [("hset", (day_key, None, None, dict(totals))), ("expire", (day_key, day_ttl))]
+        dimensions = {part for field in totals for part in (field.split("|")[0], field.rsplit("|", 1)[0])}
+        for dimension in sorted(dimensions):
+            key = _unique_key(RollupResolution.DAY, day, dimension)
+            sources = [_unique_key(RollupResolution.HOUR, hour, dimension) for hour in hours]
+            commands += [("pfmerge", (key, *sources)), ("expire", (key, day_ttl))]
+        commands += [("sadd", (COMPACTED_DAYS_KEY, day)), ("expire", (COMPACTED_DAYS_KEY, day_ttl))]
+        _ = await redis.pipeline(commands)
+        done.append(day)
+    if done:
+        logger.info(f"Compacted audit rollups of {len(done)} days", extra={"days": done})
+    return done
+
+
+async def compact_rollups_periodically(interval: float) -> None:
+    """
+    Run `compact_rollups` every `interval` seconds, until cancelled.
+
+    Every worker runs this loop, but each interval only the one that takes COMPACTION_LOCK_KEY (SET NX,
+    expiring with the interval) compacts, so the workers don't compact the same days at once. The lock
+    isn't released: it expires, so another worker takes over if this one stops.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await get_redis().set(COMPACTION_LOCK_KEY, str(os.getpid()), ex=max(int(interval), 1), nx=True):
+                _ = await compact_rollups()
+        except Exception as e:
+            logger.error(f"Audit rollup compaction failed: {e}")
@@ -156,6 +156,22 @@ class RouterInfo:
         # Lookup RouterItem from dict cache using the key
         return self._route_cache.get(cache_key)
 
+    def find_path_template(self, method: str, path: str) -> str | None:
+        """
+        Path template of the route matching a request, without logging when the route finder isn't created yet.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            path: Request path
+
+        Returns:
+            The route's path template, or None if no route matches or the route finder isn't initialized
+        """
+        if not self._route_finder:
+            return None
+        route_item = self.find_route(method, path)
+        return route_item["path_template"] if route_item else None
+
     def _log_router_info(self, router_items: list[RouterItem]) -> None:
         """
         Log router information for debugging purposes.
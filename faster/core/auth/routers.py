@@ -1,14 +1,23 @@
-from typing import Any
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+import csv
+from datetime import datetime
+import io
+import json
+from typing import Any, Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
 from ..logger import get_logger
 from ..models import AppResponseDict
 from ..redisex import blacklist_delete
 from .middlewares import get_current_user, has_role
 from .models import UserProfileData
+from .rollups import RollupResolution, count_unique_users, query_rollups
+from .schemas import UserAction
 from .services import AuthService
-from .utilities import extract_bearer_token_from_request, log_event
+from .utilities import action_timestamp, extract_bearer_token_from_request, log_event
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -731,3 +740,155 @@ async def get_user_basic_info(
             message="An error occurred while retrieving user basic information.",
             data={},
         )
+
+
+# Columns of an action export, in order; a row's timestamp and id are the cursor to resume after it
+EXPORT_FIELDS = list(UserAction.model_fields)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows serialized into one chunk of the response body
+EXPORT_CHUNK_ROWS = 500
+
+
+async def _export_chunks(actions: AsyncGenerator[UserAction, None], export_format: str) -> AsyncGenerator[str, None]:
+    """Serialize streamed actions as NDJSON or CSV, a few hundred rows per chunk."""
+    # Closed in this task, also when the client disconnects, so the cursor and its connection are released
+    async with aclosing(actions):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        if export_format == "csv":
+            writer.writeheader()
+        rows = 0
+        try:
+            async for action in actions:
+                record = action.model_dump(mode="json")
+                if export_format == "csv":
+                    writer.writerow(record)
+                else:
+                    _ = buffer.write(json.dumps(record, separators=(",", ":")) + "\n")
+                rows += 1
+                if rows % EXPORT_CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    _ = buffer.seek(0)
+                    _ = buffer.truncate()
+        except Exception as e:
+            # The response has already started: the client sees a truncated body and resumes from its last row
+            logger.error(f"User action export aborted after {rows} rows: {e}")
+            raise
+        yield buffer.getvalue()
+
+
+@router.get("/actions/export", include_in_schema=False, response_model=None, tags=["admin"])
+async def export_user_actions(
+    request: Request,
+    *,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    user_id: str | None = None,
+    event_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_timestamp: datetime | None = None,
+    after_id: int | None = None,
+    user: UserProfileData | None = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> StreamingResponse | AppResponseDict:
+    """
+    Export logged user actions as NDJSON or CSV, streamed in `(timestamp, id)` order.
+
+    The export is read through a server-side cursor, so it can be of any size. To resume an interrupted
+    export, repeat the request with `after_timestamp` and `after_id` set to the `timestamp` and `id` of the
+    last complete row received.
+
+    Only AUTH_USER_ACTION is read: with the segments audit sink, actions appear once their segment is compacted.
+    """
+    if not user:
+        return AppResponseDict(
+            status="failed",
+            message="Authentication required. Please login first.",
+            data={},
+        )
+    if (after_timestamp is None) != (after_id is None):
+        return AppResponseDict(
+            status="failed",
+            message="after_timestamp and after_id must be given together.",
+            data={},
+        )
+
+    after = (after_timestamp, after_id) if after_timestamp is not None and after_id is not None else None
+    actions = auth_service.stream_user_actions(
+        user_auth_id=user_id, event_type=event_type, since=since, until=until, after=after
+    )
+    if actions is None:
+        return AppResponseDict(
+            status="failed",
+            message="An error occurred while exporting user actions.",
+            data={},
+        )
+
+    _ = await log_event(
+        request=request,
+        event_type="admin",
+        event_name="user_actions_exported",
+        event_source="admin_action",
+        user_auth_id=user.id,
+        event_payload={
+            "format": export_format,
+            "user_id": user_id,
+            "event_type": event_type,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None,
+            "resumed": after is not None,
+        },
+    )
+    return StreamingResponse(_export_chunks(actions, export_format), media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@router.get("/actions/rollups", include_in_schema=False, response_model=None, tags=["admin"])
+async def get_user_action_rollups(
+    *,
+    since: datetime,
+    until: datetime | None = None,
+    resolution: RollupResolution = RollupResolution.MINUTE,
+    event_type: str | None = None,
+    event_name: str | None = None,
+    event_source: str | None = None,
+    user: UserProfileData | None = Depends(get_current_user),
+) -> AppResponseDict:
+    """
+    Event counts per minute, hour or day, served from the Redis rollups without scanning AUTH_USER_ACTION.
+
+    With `event_type`, the number of distinct users with such events (of `event_name`, if given) over the
+    whole range is returned as well, estimated by HyperLogLog with hour precision.
+    """
+    if not user:
+        return AppResponseDict(
+            status="failed",
+            message="Authentication required. Please login first.",
+            data={},
+        )
+    until = until or action_timestamp()
+    if since >= until:
+        return AppResponseDict(status="failed", message="since must be before until.", data={})
+
+    try:
+        buckets = await query_rollups(since, until, resolution, event_type, event_name, event_source)
+        unique_users = await count_unique_users(since, until, event_type, event_name) if event_type else None
+    except ValueError as e:
+        return AppResponseDict(status="failed", message=str(e), data={})
+    except Exception as e:
+        logger.error(f"Error reading user action rollups: {e}")
+        return AppResponseDict(
+            status="failed",
+            message="An error occurred while reading user action rollups.",
+            data={},
+        )
+
+    return AppResponseDict(
+        status="success",
+        message="User action rollups retrieved successfully.",
+        data={
+            "resolution": resolution.value,
+            "buckets": [{**bucket, "start": bucket["start"].isoformat()} for bucket in buckets],
+            "total": sum(bucket["count"] for bucket in buckets),
+            "unique_users": unique_users,
+        },
+    )
@@ -205,6 +205,8 @@ class UserAction(MyBase, table=True):
         Index("idx_user_action_type_time", "C_EVENT_TYPE", "D_TIMESTAMP"),
     )
 
+    # Partitioned by month on PostgreSQL (optional migration a3c91e4f7b20), the table's primary key there is
+    # (id, D_TIMESTAMP); id alone stays unique, being drawn from one sequence
     id: int | None = Field(default=None, primary_key=True, description="Primary key")
 
     # Core identification
@@ -0,0 +1,390 @@
+import asyncio
+from collections.abc import Iterator, Mapping, Sequence
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime
+import fcntl
+import itertools
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import Any, BinaryIO, Literal, TextIO
+import zlib
+
+from prometheus_client import Counter
+
+from ..config import Settings
+from ..logger import get_logger
+from .repositories import AuthRepository
+from .utilities import action_timestamp
+
+logger = get_logger(__name__)
+
+# A frame is one compressed batch of NDJSON records: magic, payload length and CRC32, then the zlib payload
+FRAME_HEADER = struct.Struct(">4sII")
+FRAME_MAGIC = b"UAF1"
+SEGMENT_PREFIX = "actions-"
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+CHECKPOINT_SUFFIX = ".loaded"
+COMPACT_BATCH_ROWS = 5000
+
+SEGMENT_EVENTS = Counter(
+    "auth_segment_events_total", "User actions appended to or compacted from segments", ["operation"]
+)
+
+
+@dataclass
+class SegmentStoreConfig:
+    """Location, rotation and compaction of the segment files, built from the `audit_segment_*` settings."""
+
+    directory: str = "./logs/audit_segments"
+    max_bytes: int = 64 * 1024 * 1024
+    fsync: bool = True
+    compact_interval: float = 60.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SegmentStoreConfig":
+        return cls(
+            directory=settings.audit_segment_dir,
+            max_bytes=settings.audit_segment_max_bytes,
+            fsync=settings.audit_segment_fsync,
+            compact_interval=settings.audit_segment_compact_interval,
+        )
+
+
+@dataclass
+class FrameIndex:
+    """Sidecar index entry of a frame: where it is, and the time range and users of its records."""
+
+    offset: int
+    length: int
+    count: int
+    first: datetime
+    last: datetime
+    users: list[str]
+
+    def matches(self, since: datetime | None, until: datetime | None, user_auth_id: str | None) -> bool:
+        return (
+            (since is None or self.last >= since)
+            and (until is None or self.first < until)
+            and (user_auth_id is None or user_auth_id in self.users)
+        )
+
+    def to_line(self) -> str:
+        entry = {**self.__dict__, "first": self.first.isoformat(), "last": self.last.isoformat()}
+        return json.dumps(entry) + "\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> "FrameIndex":
+        entry = json.loads(line)
+        entry["first"] = datetime.fromisoformat(entry["first"])
+        entry["last"] = datetime.fromisoformat(entry["last"])
+        return cls(**entry)
+
+
+def index_frame(events: Sequence[Mapping[str, Any]], offset: int, length: int) -> FrameIndex:
+    """Index entry of the frame holding `events`, at `offset` of its segment."""
+    timestamps = [event["timestamp"] for event in events]
+    users = sorted({event["user_auth_id"] for event in events if event.get("user_auth_id")})
+    return FrameIndex(offset, length, len(events), min(timestamps), max(timestamps), users)
+
+
+def encode_frame(events: Sequence[Mapping[str, Any]], offset: int) -> tuple[bytes, FrameIndex]:
+    """Compress events into a frame to be written at `offset`, with its index entry."""
+    records = [{**event, "timestamp": event.get("timestamp") or action_timestamp()} for event in events]
+    payload = zlib.compress("".join(json.dumps(record, default=str) + "\n" for record in records).encode())
+    frame = FRAME_HEADER.pack(FRAME_MAGIC, len(payload), zlib.crc32(payload)) + payload
+    return frame, index_frame(records, offset, len(frame))
+
+
+def decode_frame(data: bytes | mmap.mmap, offset: int) -> list[dict[str, Any]] | None:
+    """
+    Decode the frame at `offset` of a segment.
+
+    Returns:
+        The frame's events, or None if the frame is incomplete or corrupt (a write torn by a crash)
+    """
+    if offset + FRAME_HEADER.size > len(data):
+        return None
+    magic, length, crc = FRAME_HEADER.unpack_from(data, offset)
+    payload = data[offset + FRAME_HEADER.size : offset + FRAME_HEADER.size + length]
+    if magic != FRAME_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+        return None
+    events: list[dict[str, Any]] = [json.loads(line) for line in zlib.decompress(payload).splitlines()]
+    for event in events:
+        event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+    return events
+
+
+def segment_sequence(segment: Path) -> int:
+    """Sequence number of a segment, from `actions-<sequence>-<pid>.seg` (or the older `actions-<sequence>.seg`)."""
+    return int(segment.stem.removeprefix(SEGMENT_PREFIX).split("-")[0])
+
+
+def segment_writer(segment: Path) -> str:
+    """Pid of the process that wrote a segment, as in its name (empty for the older names without one)."""
+    return segment.stem.removeprefix(SEGMENT_PREFIX).partition("-")[2]
+
+
+def lock_segment(segment: Path, mode: Literal["rb", "ab"] = "rb") -> BinaryIO | None:
+    """
+    Open a segment and take its exclusive lock, without waiting.
+
+    The lock is a `flock` on the open file, held until it is closed: the writer holds the lock of its active
+    segment, and the compactor and crash recovery of the other stores only touch the segments they can lock.
+
+    Returns:
+        The open, locked segment, or None if another store (or another file of this one) holds its lock,
+        or it was deleted
+    """
+    try:
+        file = segment.open(mode)
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # A compactor may have deleted the segment between the open and the lock: the file is then unlinked
+        if os.stat(segment).st_ino == os.fstat(file.fileno()).st_ino:
+            return file
+    except OSError:
+        pass
+    file.close()
+    return None
+
+
+class SegmentStore:
+    """
+    Append-only store of user actions in segment files, an alternative sink to the AUTH_USER_ACTION table.
+
+    Each `log_events` call appends one frame, a zlib-compressed batch of NDJSON records, to the active
+    segment and fsyncs it once (so the AuditWriter batches are also the fsync batches). A segment is sealed
+    and a new one started once it reaches `max_bytes`, and on every `open()`. Next to each segment, a sidecar
+    index (`.idx`, one JSON line per frame) gives the frame's offset, time range and users, so `scan` only
+    decompresses the frames it needs, read from a memory map of the segment.
+
+    The compactor loads sealed segments into the database in bulk, through `AuthRepository.log_events`,
+    then deletes them. Progress is checkpointed per batch, so an interrupted load resumes where it stopped.
+
+    Several stores (one per worker process) can share the directory: segment names carry the writer's pid,
+    each store holds a `flock` on its active segment, and the compactor and crash recovery skip the segments
+    locked by another store (see `lock_segment`).
+
+    Example:
+        >>> store = SegmentStore(SegmentStoreConfig(directory="/var/lib/app/actions"))
+        >>> await store.open()
+        >>> await store.log_events([{"event_type": "auth", "event_name": "login", "event_source": "api"}])
+        1
+        >>> await store.query(since=datetime(2024, 1, 1), user_auth_id="user-123")
+        [...]
+        >>> await store.compact(AuthRepository())
+        1
+    """
+
+    def __init__(self, config: SegmentStoreConfig) -> None:
+        self.config = config
+        self.directory = Path(config.directory)
+        self._lock = asyncio.Lock()
+        self._active: Path | None = None
+        self._segment: BinaryIO | None = None
+        self._index: TextIO | None = None
+        self._size = 0
+        self._sequence = 0
+        self._compactor: asyncio.Task[None] | None = None
+
+    def segments(self) -> list[Path]:
+        """Segment files, oldest first."""
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    async def open(self) -> None:
+        """Recover the last segment from a crash, if needed, and start a new one."""
+        async with self._lock:
+            await asyncio.to_thread(self._open)
+
+    async def close(self) -> None:
+        """Stop the compactor and close the active segment."""
+        if self._compactor is not None:
+            _ = self._compactor.cancel()
+            _ = await asyncio.gather(self._compactor, return_exceptions=True)
+            self._compactor = None
+        async with self._lock:
+            self._close_active()
+
+    async def log_events(self, events: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Append events to the active segment as one frame.
+
+        Args:
+            events: Keyword arguments of `AuthRepository.log_event` per event, optionally with `timestamp`
+
+        Returns:
+            Number of events appended
+        """
+        if not events:
+            return 0
+        async with self._lock:
+            if self._segment is None:
+                await asyncio.to_thread(self._open)
+            await asyncio.to_thread(self._append, events)
+        SEGMENT_EVENTS.labels(operation="appended").inc(len(events))
+        return len(events)
+
+    def scan(
+        self, since: datetime | None = None, until: datetime | None = None, user_auth_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over stored events in `[since, until)`, optionally of one user, segment by segment.
+
+        This reads files: run it in a thread (or use `query`) from async code.
+        """
+        for segment in self.segments():
+            entries = [entry for entry in self._read_index(segment) if entry.matches(since, until, user_auth_id)]
+            if not entries:
+                continue
+            with segment.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for entry in entries:
+                    for event in decode_frame(data, entry.offset) or []:
+                        if (
+                            (since is None or event["timestamp"] >= since)
+                            and (until is None or event["timestamp"] < until)
+                            and (user_auth_id is None or event.get("user_auth_id") == user_auth_id)
+                        ):
+                            yield event
+
+    async def query(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_auth_id: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Collect up to `limit` events of `scan` in a thread."""
+        return await asyncio.to_thread(lambda: list(itertools.islice(self.scan(since, until, user_auth_id), limit)))
+
+    async def compact(self, repository: AuthRepository) -> int:
+        """
+        Load the sealed segments into AUTH_USER_ACTION, oldest first, and delete them once loaded.
+
+        Segments locked by a writer (the active ones of every store) or by another compactor are skipped.
+
+        Returns:
+            Number of events loaded
+        """
+        loaded = 0
+        for segment in self.segments():
+            lock = await asyncio.to_thread(lock_segment, segment)
+            if lock is None:
+                continue
+            try:
+                loaded += await self._compact_segment(segment, repository)
+            finally:
+                lock.close()
+        return loaded
+
+    def start_compaction(self, repository: AuthRepository) -> None:
+        """Compact every `compact_interval` seconds in the background (if it is positive)."""
+        if self.config.compact_interval > 0 and self._compactor is None:
+            self._compactor = asyncio.get_running_loop().create_task(self._compact_periodically(repository))
+
+    async def _compact_periodically(self, repository: AuthRepository) -> None:
+        while True:
+            await asyncio.sleep(self.config.compact_interval)
+            try:
+                _ = await self.compact(repository)
+            except Exception as exp:
+                logger.error(f"Segment compaction failed: {exp}")
+
+    async def _compact_segment(self, segment: Path, repository: AuthRepository) -> int:
+        checkpoint = segment.with_suffix(CHECKPOINT_SUFFIX)
+        done = int(await asyncio.to_thread(checkpoint.read_text)) if checkpoint.exists() else 0
+        entries = [entry for entry in await asyncio.to_thread(self._read_index, segment) if entry.offset >= done]
+        loaded = 0
+        while entries:
+            # Frames are as small as the writer's batches: load them in bigger ones
+            count = list(itertools.accumulate(entry.count for entry in entries))
+            size = next((i + 1 for i, rows in enumerate(count) if rows >= COMPACT_BATCH_ROWS), len(entries))
+            batch, entries = entries[:size], entries[size:]
+            events = await asyncio.to_thread(self._read_frames, segment, batch)
+            loaded += await repository.log_events(events)
+            _ = await asyncio.to_thread(checkpoint.write_text, str(batch[-1].offset + batch[-1].length))
+        for path in (segment, segment.with_suffix(INDEX_SUFFIX), checkpoint):
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+        SEGMENT_EVENTS.labels(operation="compacted").inc(loaded)
+        logger.info(f"Compacted {loaded} user actions from segment {segment.name}")
+        return loaded
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self.segments()
+        # The last segment of each writer is the one it was appending to: recover those no live store holds
+        last = {segment_writer(segment): segment for segment in segments}
+        for segment in last.values():
+            lock = lock_segment(segment)
+            if lock is not None:
+                with lock:
+                    self._recover(segment)
+        if segments:
+            self._sequence = max(segment_sequence(segment) for segment in segments) + 1
+        self._start_segment()
+
+    def _start_segment(self) -> None:
+        self._close_active()
+        segment = None
+        while segment is None:
+            # Another store of this process may have started this sequence number: take the next one
+            path = self.directory / f"{SEGMENT_PREFIX}{self._sequence:08d}-{os.getpid()}{SEGMENT_SUFFIX}"
+            self._sequence += 1
+            segment = lock_segment(path, "ab")
+        self._active, self._segment = path, segment
+        self._index = path.with_suffix(INDEX_SUFFIX).open("a", encoding="utf-8")
+        self._size = self._segment.tell()
+
+    def _close_active(self) -> None:
+        for file in (self._segment, self._index):
+            if file is not None:
+                file.close()
+        self._segment = self._index = None
+        self._active = None
+
+    def _append(self, events: Sequence[Mapping[str, Any]]) -> None:
+        assert self._segment is not None and self._index is not None
+        frame, entry = encode_frame(events, self._size)
+        _ = self._segment.write(frame)
+        self._segment.flush()
+        if self.config.fsync:
+            os.fsync(self._segment.fileno())
+        # The index isn't fsynced: after a crash it is rebuilt from the segment (see _recover)
+        _ = self._index.write(entry.to_line())
+        self._index.flush()
+        self._size += len(frame)
+        if self._size >= self.config.max_bytes:
+            self._start_segment()
+
+    def _recover(self, segment: Path) -> None:
+        """Rebuild the index of the segment last written to, and truncate a frame torn by a crash."""
+        entries: list[FrameIndex] = []
+        offset = 0
+        with segment.open("r+b") as file:
+            if os.fstat(file.fileno()).st_size > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    while (events := decode_frame(data, offset)) is not None:
+                        length = FRAME_HEADER.size + FRAME_HEADER.unpack_from(data, offset)[1]
+                        entries.append(index_frame(events, offset, length))
+                        offset += length
+                    if offset < len(data):
+                        logger.warning(f"Truncating {len(data) - offset} torn bytes from segment {segment.name}")
+            _ = file.truncate(offset)
+        _ = segment.with_suffix(INDEX_SUFFIX).write_text("".join(entry.to_line() for entry in entries))
+
+    @staticmethod
+    def _read_index(segment: Path) -> list[FrameIndex]:
+        with contextlib.suppress(FileNotFoundError):
+            return [FrameIndex.from_line(line) for line in segment.with_suffix(INDEX_SUFFIX).read_text().splitlines()]
+        return []
+
+    @staticmethod
+    def _read_frames(segment: Path, entries: list[FrameIndex]) -> list[dict[str, Any]]:
+        with segment.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return [event for entry in entries for event in decode_frame(data, entry.offset) or []]
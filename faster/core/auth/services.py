@@ -1,10 +1,12 @@
+import asyncio
+from collections.abc import AsyncGenerator
 from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import FastAPI, Request
 
 from ..config import Settings
-from ..database import DBSession, get_transaction
+from ..database import DBSession, get_session, get_transaction
 from ..exceptions import DBError
 from ..logger import get_logger
 from ..plugins import BasePlugin
@@ -16,11 +18,14 @@ from ..redisex import (
     user2role_set,
 )
 from ..repositories import AppRepository
+from .audit import AuditSink, AuditWriter, AuditWriterConfig
 from .auth_proxy import AuthProxy
 from .models import AuthServiceConfig, RouterItem, UserProfileData
 from .repositories import AuthRepository
+from .rollups import compact_rollups_periodically, record_rollup
 from .router_info import RouterInfo
-from .schemas import User
+from .schemas import User, UserAction
+from .segments import SegmentStore, SegmentStoreConfig
 from .utilities import generate_trace_id, mask_sensitive_data
 
 logger = get_logger(__name__)
@@ -31,6 +36,10 @@ class AuthService(BasePlugin):
         # Lazy initialization - actual setup happens in setup() method
         self._auth_client: AuthProxy | None = None
         self._repository: AuthRepository | None = None
+        self._audit_writer: AuditWriter | None = None
+        self._segment_store: SegmentStore | None = None
+        self._rollups: bool = False
+        self._rollup_compactor: asyncio.Task[None] | None = None
 
         # Router information management
         self._router_info = RouterInfo()
@@ -82,6 +91,31 @@ class AuthService(BasePlugin):
             # Initialize repository
             self._repository = AuthRepository()
 
+            # Write audit events behind the request, in batches
+            audit_config = AuditWriterConfig.from_settings(settings)
+            if audit_config.enabled:
+                sink: AuditSink = self._repository
+                if settings.audit_sink == "segments":
+                    # Append to segment files instead, loaded into the database by the compactor
+                    self._segment_store = SegmentStore(SegmentStoreConfig.from_settings(settings))
+                    await self._segment_store.open()
+                    self._segment_store.start_compaction(self._repository)
+                    if settings.audit_segment_compact_interval <= 0:
+                        logger.warning(
+                            "Audit segment compaction is disabled: events appended to segments won't reach "
+                            "AUTH_USER_ACTION, and are left out of user action queries and exports"
+                        )
+                    sink = self._segment_store
+                self._audit_writer = AuditWriter(sink, audit_config)
+                self._audit_writer.start()
+
+            # Count events in Redis rollups, and compact them from hours into days in the background
+            self._rollups = settings.audit_rollups
+            if self._rollups and settings.audit_rollup_compact_interval > 0:
+                self._rollup_compactor = asyncio.get_running_loop().create_task(
+                    compact_rollups_periodically(settings.audit_rollup_compact_interval)
+                )
+
             self._is_setup = True
             logger.info("AuthService setup completed successfully")
 
@@ -108,6 +142,19 @@ class AuthService(BasePlugin):
             if self._auth_client:
                 self._auth_client.clear_jwks_cache()
 
+            if self._rollup_compactor:
+                _ = self._rollup_compactor.cancel()
+                _ = await asyncio.gather(self._rollup_compactor, return_exceptions=True)
+                self._rollup_compactor = None
+
+            # Write the queued audit events while the database is still up
+            if self._audit_writer:
+                await self._audit_writer.close()
+                self._audit_writer = None
+            if self._segment_store:
+                await self._segment_store.close()
+                self._segment_store = None
+
             self._is_setup = False
             logger.info("AuthService teardown completed successfully")
             return True
@@ -223,23 +270,28 @@ class AuthService(BasePlugin):
             logger.error(f"Failed to process logout for user {user_id}: {e}")
             raise
 
+    @staticmethod
+    def _user_record(user_profile: UserProfileData) -> dict[str, Any]:
+        """Map a user profile to the fields `create_or_update_user` stores."""
+        return {
+            "id": user_profile.id,
+            "aud": user_profile.aud,
+            "role": user_profile.role,
+            "email": user_profile.email,
+            "email_confirmed_at": user_profile.email_confirmed_at,
+            "phone": user_profile.phone,
+            "confirmed_at": user_profile.confirmed_at,
+            "last_sign_in_at": user_profile.last_sign_in_at,
+            "is_anonymous": user_profile.is_anonymous,
+            "created_at": user_profile.created_at,
+            "updated_at": user_profile.updated_at,
+        }
+
     async def _save_user_profile_to_database(self, user_profile: UserProfileData) -> User:
         """Save complete user profile to database."""
         async with await get_transaction() as session:
             # Create or update user
-            user_data = {
-                "id": user_profile.id,
-                "aud": user_profile.aud,
-                "role": user_profile.role,
-                "email": user_profile.email,
-                "email_confirmed_at": user_profile.email_confirmed_at,
-                "phone": user_profile.phone,
-                "confirmed_at": user_profile.confirmed_at,
-                "last_sign_in_at": user_profile.last_sign_in_at,
-                "is_anonymous": user_profile.is_anonymous,
-                "created_at": user_profile.created_at,
-                "updated_at": user_profile.updated_at,
-            }
+            user_data = self._user_record(user_profile)
             if not self._repository:
                 logger.error("AuthService repository not initialized")
                 raise DBError("Repository not available")
@@ -265,19 +317,7 @@ class AuthService(BasePlugin):
     ) -> User:
         """Save complete user profile to database using provided session."""
         # Create or update user
-        user_data = {
-            "id": user_profile.id,
-            "aud": user_profile.aud,
-            "role": user_profile.role,
-            "email": user_profile.email,
-            "email_confirmed_at": user_profile.email_confirmed_at,
-            "phone": user_profile.phone,
-            "confirmed_at": user_profile.confirmed_at,
-            "last_sign_in_at": user_profile.last_sign_in_at,
-            "is_anonymous": user_profile.is_anonymous,
-            "created_at": user_profile.created_at,
-            "updated_at": user_profile.updated_at,
-        }
+        user_data = self._user_record(user_profile)
         if not self._repository:
             logger.error("AuthService repository not initialized")
             raise DBError("Repository not available")
@@ -309,7 +349,7 @@ class AuthService(BasePlugin):
         return await self._auth_client.get_user_id_from_token(token)
 
     async def get_user_by_id(  # noqa: C901, PLR0912, PLR0911
-        self, user_id: str, from_cache: bool = True, session: DBSession | None = None
+        self, user_id: str, from_cache: bool = True, session: DBSession | None = None, persist: bool = True
     ) -> UserProfileData | None:
         """
         Get user profile data by user ID with 3-tier caching hierarchy:
@@ -321,6 +361,10 @@ class AuthService(BasePlugin):
             user_id: User's authentication ID
             from_cache: Whether to check cache first
             session: Optional database session to use (for background tasks)
+            persist: Whether to save a profile fetched from Supabase Auth to the database
+
+        Passing a session keeps it checked out across the Supabase round trip; callers that write
+        the profile themselves should fetch without one and with `persist=False`.
         """
         if not user_id or not user_id.strip():
             logger.error("User ID cannot be empty")
@@ -366,7 +410,7 @@ class AuthService(BasePlugin):
 
                 # Update local database with Supabase data
                 try:
-                    if self._repository:
+                    if self._repository and persist:
                         db_success = await self._repository.set_user_info(supabase_profile, session)
                         if db_success:
                             logger.debug(f"Updated database with Supabase data for user ID: {user_id}")
@@ -629,20 +673,21 @@ class AuthService(BasePlugin):
         """
         Background task to update user information in database.
         Fetches fresh user data and updates the database.
-        Uses a single transaction to avoid session binding issues.
+
+        The fetch runs before any transaction is opened, so no pooled connection is held while
+        waiting on Supabase; the profile is then written in one short transaction.
         """
         try:
             logger.info(f"Updating user info in background for {user_id}")
 
-            # Use a single transaction for all database operations to avoid session binding issues
-            async with await get_transaction() as session:
-                # Fetch fresh user data from external source (bypass cache for latest data)
-                fresh_user_data = await self.get_user_by_id(user_id, from_cache=False, session=session)
-                if not fresh_user_data:
-                    logger.warning(f"Could not fetch fresh user data for {user_id}")
-                    return
+            # Fetch fresh user data (bypass cache for latest data), outside any transaction
+            fresh_user_data = await self.get_user_by_id(user_id, from_cache=False, persist=False)
+            if not fresh_user_data:
+                logger.warning(f"Could not fetch fresh user data for {user_id}")
+                return
 
-                # Update user info in database with fresh data using the same session
+            # Transform and persist it in a single transaction
+            async with await get_transaction() as session:
                 _ = await self._save_user_profile_to_database_with_session(session, fresh_user_data)
 
             logger.info(f"Background user info update completed for {user_id}")
@@ -786,7 +831,8 @@ class AuthService(BasePlugin):
             timezone: Client timezone
             event_payload: Structured event data
             extra_metadata: Additional metadata (auto-includes request method/URL if request provided)
-            session: Optional database session to use
+            session: Optional database session to use; without one, the event is queued on the audit writer
+                (when `audit_write_behind` is on) and written within `audit_flush_interval` seconds
             request: FastAPI Request object for automatic field extraction
         """
         try:
@@ -859,24 +905,31 @@ class AuthService(BasePlugin):
                 logger.error("AuthService repository not initialized")
                 return False
 
-            success = await self._repository.log_event(
-                event_type=event_type,
-                event_name=event_name,
-                event_source=event_source,
-                user_auth_id=user_auth_id,
-                trace_id=trace_id,
-                session_id=session_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                client_info=client_info,
-                referrer=referrer,
-                country_code=country_code,
-                city=city,
-                timezone=timezone,
-                event_payload=sanitized_payload,
-                extra_metadata=enriched_metadata,
-                session=session,
-            )
+            event: dict[str, Any] = {
+                "event_type": event_type,
+                "event_name": event_name,
+                "event_source": event_source,
+                "user_auth_id": user_auth_id,
+                "trace_id": trace_id,
+                "session_id": session_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "client_info": client_info,
+                "referrer": referrer,
+                "country_code": country_code,
+                "city": city,
+                "timezone": timezone,
+                "event_payload": sanitized_payload,
+                "extra_metadata": enriched_metadata,
+            }
+            # Events outside a caller's transaction are written behind the request, in batches, and counted
+            # in the rollups as they are written
+            if session is None and self._audit_writer:
+                success = self._audit_writer.enqueue(event)
+            else:
+                success = await self._repository.log_event(**event, session=session)
+                if success and self._rollups:
+                    _ = await record_rollup(event_type, event_name, event_source, user_auth_id)
 
             if success:
                 logger.debug(f"Successfully logged event: {event_type}.{event_name} from {event_source}")
@@ -890,6 +943,37 @@ class AuthService(BasePlugin):
             # Don't re-raise exceptions to avoid disrupting the main application flow
             return False
 
+    def stream_user_actions(
+        self,
+        user_auth_id: str | None = None,
+        event_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+    ) -> AsyncGenerator[UserAction, None] | None:
+        """
+        Stream logged user actions in `(timestamp, id)` order, for exports.
+
+        Actions are read from AUTH_USER_ACTION only: those still queued by the audit writer, or in segment
+        files not compacted yet (with the segments sink), are not included.
+
+        Args:
+            user_auth_id: Only actions of this user
+            event_type: Only actions of this event type
+            since: Only actions at or after this time
+            until: Only actions before this time
+            after: Resume after the action with this `(timestamp, id)`
+
+        Returns:
+            An async generator of actions (close it when done), or None if the service is not initialized
+        """
+        if not self._repository:
+            logger.error("AuthService not properly initialized")
+            return None
+        return self._repository.stream_user_actions(
+            user_auth_id=user_auth_id, event_type=event_type, since=since, until=until, after=after
+        )
+
     # =============================================================================
     # Password Management Methods
     # =============================================================================
@@ -1267,32 +1351,34 @@ class AuthService(BasePlugin):
                 logger.error("AuthService not properly initialized")
                 return None
 
-            async with await get_transaction() as session:
-                # Detect if identifier is email or user ID
-                is_email = "@" in target_user_identifier
+            # Detect if identifier is email or user ID
+            is_email = "@" in target_user_identifier
 
-                if is_email:
+            if is_email:
+                async with await get_session(readonly=True) as session:
                     user_info = await self._repository.get_user_by_email(session, target_user_identifier)
-                    lookup_type = "email"
-                else:
-                    user_info = await self._repository.get_user_by_auth_id(session, target_user_identifier)
-                    lookup_type = "user_id"
+                lookup_type = "email"
+            else:
+                # Batched with concurrent lookups (e.g. an admin listing users) and memoized within the request
+                user_info = await self._repository.get_user_by_auth_id_simple(target_user_identifier)
+                lookup_type = "user_id"
 
-                if not user_info:
-                    logger.warning(f"User not found by {lookup_type}: {target_user_identifier}")
-                    return None
+            if not user_info:
+                logger.warning(f"User not found by {lookup_type}: {target_user_identifier}")
+                return None
 
-                # Get the actual user ID for role lookup
-                actual_user_id = user_info.auth_id
+            # Get the actual user ID for role lookup
+            actual_user_id = user_info.auth_id
 
-                # Get roles using existing method
-                roles = await self.get_roles(actual_user_id, from_cache=True)
+            # Get roles using existing method (batched the same way on a cache miss)
+            roles = await self.get_roles(actual_user_id, from_cache=True)
 
-                # Determine user status by checking both user record and metadata
+            # Determine user status by checking both user record and metadata
+            async with await get_session(readonly=True) as session:
                 status = await self._repository.determine_user_status(session, user_info, actual_user_id)
 
-                # Build basic info response
-                basic_info = {"id": actual_user_id, "email": user_info.email, "status": status, "roles": roles}
+            # Build basic info response
+            basic_info = {"id": actual_user_id, "email": user_info.email, "status": status, "roles": roles}
 
             logger.info(f"Basic info for user {target_user_identifier} (by {lookup_type}) retrieved by user {user_id}")
             return basic_info
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import Any
 import uuid
 
@@ -373,6 +374,16 @@ def generate_trace_id() -> str:
     return str(uuid.uuid4())
 
 
+def action_timestamp() -> datetime:
+    """
+    The current time on the clock of AUTH_USER_ACTION's D_TIMESTAMP default, for events timestamped by the app.
+
+    Returns:
+        Naive UTC datetime, as SQLite's CURRENT_TIMESTAMP and PostgreSQL's now() in a UTC session store it
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # =============================================================================
 # Event Logging Utilities
 # =============================================================================
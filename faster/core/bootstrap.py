@@ -22,14 +22,16 @@ from .auth import router as auth_router
 from .auth.middlewares import AuthMiddleware
 from .auth.services import AuthService
 from .config import Settings, default_settings, get_default_allowed_paths
-from .database import DatabaseManager
+from .database import BatchLoaderMiddleware, DatabaseManager, UnitOfWorkMiddleware
+from .event_bus import event_bus
 from .exceptions import (
     AppError,
     AuthError,
 )
 from .logger import get_logger, setup_logger
+from .metrics import HttpMetricsMiddleware
 from .plugins import PluginManager
-from .redis import RedisManager
+from .redis import RedisManager, get_redis
 from .routers import dev_router, sys_router
 from .sentry import SentryManager
 from .services import SysService
@@ -86,8 +88,16 @@ async def _setup_all(app: FastAPI, settings: Settings) -> None:
     if not success:
         logger.warning("Some plugins failed to initialize, but continuing startup")
 
+    # Share query cache invalidations with the other workers once Redis is up
+    if settings.query_cache_enabled and RedisManager.get_instance().is_ready:
+        DatabaseManager.get_instance().start_query_cache_sync(get_redis())
+
 
 async def _teardown_all(app: FastAPI) -> None:
+    # Handle the queued in-process events while the plugins their handlers use are still up
+    logger.info("Shutting down the event bus...")
+    await event_bus.shutdown()
+
     # Use plugin system for teardown
     logger.info("Tearing down all plugins...")
     success = await PluginManager.get_instance().teardown()
@@ -114,6 +124,12 @@ def _add_middlewares(app: FastAPI, settings: Settings, middlewares: list[Any] |
         require_auth=settings.auth_enabled,
     )
 
+    # Per-request memo for repository batch loaders; added after AuthMiddleware so it wraps it
+    app.add_middleware(BatchLoaderMiddleware)
+
+    # One read session and one write transaction per request, also wrapping AuthMiddleware
+    app.add_middleware(UnitOfWorkMiddleware)
+
     if settings.cors_enabled:
         app.add_middleware(
             CORSMiddleware,
@@ -137,6 +153,11 @@ def _add_middlewares(app: FastAPI, settings: Settings, middlewares: list[Any] |
     # TODO: Someone says this is not necessary and recommended, we will remove it later if confirmed
     app.add_middleware(SentryAsgiMiddleware)
 
+    # Outside every built-in middleware, so the latency recorded covers them; the custom middlewares added
+    # below wrap it, and their time is not recorded
+    if settings.http_metrics:
+        app.add_middleware(HttpMetricsMiddleware)
+
     # Add custom middlewares
     if middlewares:
         for middleware in middlewares:
@@ -26,6 +26,10 @@ class Settings(BaseSettings):
     port: int = Field(default=8000, description="Server port")
     workers: int = Field(default=4, description="Number of worker processes")
     access_log: bool = Field(default=True, description="Enable access log")
+    http_metrics: bool = Field(
+        default=True,
+        description="Record HTTP latency, requests in flight, response sizes and status codes (exported to /metrics)",
+    )
     limit_concurrency: int | None = Field(default=None, description="Concurrency limit")
     limit_max_requests: int | None = Field(default=None, description="Maximum number of requests")
     timeout_keep_alive: int = Field(default=5, description="Keep-alive timeout")
@@ -42,14 +46,123 @@ class Settings(BaseSettings):
     database_pool_size: int = Field(default=20, description="Connection pool size")
     database_max_overflow: int = Field(default=0, description="Maximum overflow connections for the pool")
     database_echo: bool = Field(default=False, description="Enable SQL logging")
+    database_pool_pre_ping: bool = Field(
+        default=True, description="Test pooled connections before use and replace the ones that were dropped"
+    )
+    database_pool_recycle: int = Field(
+        default=1800, description="Replace pooled connections older than this many seconds (-1 never)"
+    )
+    database_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a free pooled connection")
+    database_pool_warmup: int = Field(
+        default=2, description="Connections opened per pool during startup (capped at the pool size)"
+    )
+    database_statement_cache_size: int = Field(
+        default=500, description="Prepared statements cached per PostgreSQL (asyncpg) connection"
+    )
+    database_hot_queries: bool = Field(
+        default=True, description="Run hot auth lookups on the raw asyncpg connection, skipping the ORM (PostgreSQL)"
+    )
+    database_replica_urls: list[str] = Field(
+        default=[], description="Read replica URLs; readonly sessions are balanced across them"
+    )
+    database_replica_strategy: str = Field(
+        default="round_robin", description="Replica load balancing strategy (round_robin, least_connections)"
+    )
+    database_replica_max_lag: float = Field(
+        default=5.0, description="Replication lag in seconds above which a replica leaves rotation (0 = no limit)"
+    )
+    database_replica_lag_check_interval: float = Field(
+        default=10.0, description="Seconds between replica lag checks (0 = disabled)"
+    )
+    database_read_your_writes: bool = Field(
+        default=True, description="Serve reads from the primary after a write in the same request"
+    )
+    database_request_session: bool = Field(
+        default=False, description="Share one read session and one write transaction across nested database blocks"
+    )
+    database_sql_metrics: bool = Field(
+        default=True, description="Time SQL statements and count the queries of each request (exported to /metrics)"
+    )
+    database_slow_query_threshold: float = Field(
+        default=0.5, description="Seconds after which a statement is logged as a slow query (0 = disabled)"
+    )
+    database_slow_query_redact: bool = Field(
+        default=True, description="Log only the type of bind parameters in the slow-query log, not their values"
+    )
+    database_n_plus_one_threshold: int = Field(
+        default=10, description="In debug mode, warn when one statement runs more often in a request (0 = disabled)"
+    )
+    database_partitioned_tables: list[str] = Field(
+        default=["AUTH_USER_ACTION"], description="Tables partitioned by month (PostgreSQL) whose partitions are kept"
+    )
+    database_partition_months_ahead: int = Field(
+        default=3, description="Monthly partitions created ahead of the current month"
+    )
+    database_partition_retention_months: int = Field(
+        default=0, description="Months of partitions kept; older ones are dropped instead of deleted (0 = keep all)"
+    )
+    database_partition_archive_dir: str = Field(
+        default="", description="Directory expired partitions are written to (gzipped CSV) before being dropped"
+    )
+    database_partition_interval: float = Field(
+        default=86400.0, description="Seconds between partition maintenance runs (0 = disabled)"
+    )
+
+    # SQLite performance profile (file-backed SQLite only)
+    sqlite_profile: bool = Field(
+        default=False, description="Enable WAL, tuned pragmas, a readonly connection pool and a single writer"
+    )
+    sqlite_synchronous: str = Field(default="NORMAL", description="PRAGMA synchronous (OFF, NORMAL, FULL)")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, description="PRAGMA mmap_size in bytes")
+    sqlite_cache_size: int = Field(default=-64_000, description="PRAGMA cache_size (negative = KiB, positive = pages)")
+    sqlite_busy_timeout: int = Field(default=5000, description="PRAGMA busy_timeout in milliseconds")
+    sqlite_temp_store: str = Field(default="MEMORY", description="PRAGMA temp_store (DEFAULT, FILE, MEMORY)")
+    sqlite_reader_pool_size: int = Field(default=4, description="Connections in the SQLite readonly pool")
+
+    # Repository query result cache
+    query_cache_enabled: bool = Field(
+        default=False, description="Cache results of repository reads on read-mostly tables"
+    )
+    query_cache_max_entries: int = Field(
+        default=1024, description="Cached query results kept before the least recently used are evicted"
+    )
+    query_cache_ttl: float = Field(default=60.0, description="Seconds a cached query result is kept")
+    query_cache_table_ttls: dict[str, float] = Field(
+        default={}, description='Per-table TTL overrides in seconds, e.g. {"SYS_DICT": 300} (0 = never cache)'
+    )
+    query_cache_channel: str = Field(
+        default="faster:query_cache:invalidate", description="Redis channel sharing cache invalidations between workers"
+    )
+
+    # Cloudflare D1 HTTP transport settings
+    d1_http_timeout: float = Field(default=30.0, description="Timeout in seconds for D1 HTTP API requests")
+    d1_http_max_connections: int = Field(default=20, description="Maximum open connections to the D1 HTTP API")
+    d1_http_max_keepalive_connections: int = Field(default=10, description="Maximum idle keep-alive connections")
+    d1_http_keepalive_expiry: float = Field(default=30.0, description="Seconds an idle D1 connection is kept open")
+    d1_http2: bool = Field(default=False, description="Use HTTP/2 for the D1 HTTP API (requires the 'h2' package)")
+    d1_max_retries: int = Field(default=3, description="Retries for read queries throttled (429) or failed (5xx)")
+    d1_retry_backoff: float = Field(default=0.1, description="Base delay in seconds for jittered retry backoff")
+    d1_retry_backoff_max: float = Field(default=2.0, description="Maximum delay in seconds between retries")
+    d1_retry_after_max: float = Field(
+        default=30.0, description="Longest server Retry-After in seconds to wait for; longer ones fail the query"
+    )
+    d1_initial_concurrency: int = Field(default=8, description="Starting limit of concurrent D1 requests")
+    d1_min_concurrency: int = Field(default=1, description="Lower bound of the adaptive D1 concurrency limit")
+    d1_max_concurrency: int = Field(default=20, description="Upper bound of the adaptive D1 concurrency limit")
+    d1_latency_target: float = Field(
+        default=1.0, description="D1 response time in seconds above which concurrency is reduced (0 = ignore)"
+    )
 
     # Redis settings
-    redis_provider: str = Field(default="local", description="Redis provider type (e.g., local, upstash, fake)")
+    redis_provider: str = Field(default="local", description="Redis provider type (e.g., local, upstash, fake, memory)")
     redis_url: str | None = Field(default=None, description="Redis connection URL")
     redis_password: str | None = Field(default=None, description="Redis password for local, and token for Upstash")
     redis_max_connections: int = Field(default=50, description="Maximum number of Redis connections")
     redis_decode_responses: bool = Field(default=True, description="Automatically decode Redis responses")
     redis_enabled: bool = Field(default=True, description="Whether Redis is enabled")
+    redis_max_memory: int = Field(
+        default=0, description="Memory cap in bytes for the in-process 'memory' provider (0 = unlimited)"
+    )
 
     # # Celery settings
     # celery_broker_url: str | None = Field(default=None, description="Celery Broker URL")
@@ -74,6 +187,38 @@ class Settings(BaseSettings):
     jwks_cache_ttl_seconds: int = Field(default=3600, description="JWKS cache TTL in seconds")
     user_cache_ttl_seconds: int = Field(default=3600, description="User profile cache TTL in seconds")
 
+    # Audit event writer (write-behind buffer for AUTH_USER_ACTION)
+    audit_write_behind: bool = Field(
+        default=True, description="Queue audit events in memory and write them in batches, off the request path"
+    )
+    audit_batch_size: int = Field(default=100, description="Queued audit events that trigger a flush")
+    audit_flush_interval: float = Field(default=1.0, description="Maximum seconds an audit event waits to be written")
+    audit_max_queue: int = Field(default=10000, description="Audit events held in memory before the overflow policy")
+    audit_overflow_policy: str = Field(
+        default="drop", description="What happens to audit events beyond the queue or a failed write (drop, spill)"
+    )
+    audit_spill_path: str = Field(
+        default="./logs/audit_spill.ndjson",
+        description="Where overflowing audit events are spilled to, then replayed (one file per process, pid added)",
+    )
+    audit_sink: str = Field(default="database", description="Where the audit writer stores events (database, segments)")
+    audit_segment_dir: str = Field(
+        default="./logs/audit_segments", description="Directory of the append-only audit segment files"
+    )
+    audit_segment_max_bytes: int = Field(default=64 * 1024 * 1024, description="Size at which a segment is sealed")
+    audit_segment_fsync: bool = Field(default=True, description="fsync each batch appended to a segment")
+    audit_segment_compact_interval: float = Field(
+        default=60.0,
+        description="Seconds between loads of sealed segments into the database (0 to disable: events then never "
+        "reach AUTH_USER_ACTION, nor the exports)",
+    )
+    audit_rollups: bool = Field(
+        default=False, description="Count audit events in per-minute/hour Redis rollups with unique-user HyperLogLogs"
+    )
+    audit_rollup_compact_interval: float = Field(
+        default=3600.0, description="Seconds between compactions of hour rollups into days (0 to disable)"
+    )
+
     # CORS settings
     cors_origins: list[str] = Field(default=["*"], description="Allowed CORS origins")
     cors_credentials: bool = Field(default=True, description="Allow CORS credentials")
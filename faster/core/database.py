@@ -1,23 +1,63 @@
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator, Callable
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+import contextlib
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager  # pyright: ignore[reportPrivateUsage]
-from datetime import datetime
+from contextvars import ContextVar
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+import gzip
+import importlib.util
+import json
 import os
-from typing import Any, TypedDict, TypeVar, cast
+from pathlib import Path
+import random
+import re
+import time
+import traceback
+from typing import Any, Generic, TextIO, TypedDict, TypeVar, cast
 from urllib.parse import parse_qs, urlparse
+import uuid
+import weakref
 
+from asgi_correlation_id import correlation_id
 import httpx
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlalchemy.schema import CreateIndex, CreateTable
-from sqlmodel import SQLModel, create_engine
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Select as SASelect
+from sqlalchemy import Table, event, text
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool, QueuePool
+from sqlalchemy.schema import ColumnDefault, CreateIndex, CreateTable
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlmodel import SQLModel, create_engine, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel.sql.expression import Select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .config import Settings
 from .exceptions import DBError
 from .logger import get_logger
 from .plugins import BasePlugin
+from .redis import RedisClient
 
 ###############################################################################
 
@@ -27,12 +67,482 @@ logger = get_logger(__name__)
 ModelType = TypeVar("ModelType", bound=SQLModel)
 DBSession = AsyncSession
 
+# Values bound per IN (...) list by repository batch queries; larger lists are split into several statements.
+# Well under SQLite's (32766) and asyncpg's (32767) bound parameter limits.
+MAX_IN_LIST_SIZE = 10000
+
 
 ###############################################################################
 # Cloudflare D1 Adapter Classes
 ###############################################################################
 
 
+# D1 rejects statements that bind more than 100 parameters.
+D1_MAX_BOUND_PARAMETERS = 100
+
+D1Statement = tuple[str, list[Any]]
+
+D1_API_BASE_URL = "https://api.cloudflare.com/client/v4"
+
+# Same default size as SQLAlchemy's per-engine compiled cache (`query_cache_size`).
+D1_STATEMENT_CACHE_SIZE = 500
+
+# D1 speaks SQLite and binds positional `?` parameters.
+_D1_DIALECT = sqlite.dialect(paramstyle="qmark")  # type: ignore[no-untyped-call]
+
+# Throttling and transient server errors; a request that got one of these may be sent again if it only reads.
+D1_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Failures raised before the request reached the server, so retrying cannot apply a write twice.
+_D1_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_D1_READ_ONLY_SQL = re.compile(r"^\s*(SELECT|PRAGMA|EXPLAIN)\b", re.IGNORECASE)
+_D1_SQL_VERB = re.compile(r"^\s*([A-Za-z]+)")
+_D1_METRIC_VERBS = frozenset({"select", "insert", "update", "delete", "replace", "pragma"})
+
+D1_QUERY_DURATION = Histogram(
+    "d1_query_duration_seconds",
+    "Latency of D1 HTTP API requests, including time spent waiting for a concurrency slot",
+    ["operation", "status"],
+)
+D1_QUERY_RETRIES = Counter("d1_query_retries_total", "D1 HTTP API requests that were retried", ["reason"])
+D1_CONCURRENCY_LIMIT = Gauge("d1_concurrency_limit", "Current adaptive concurrency limit for D1 HTTP requests")
+
+
+def is_read_only_sql(sql: str) -> bool:
+    """Whether a statement only reads, and so can safely be retried."""
+    return bool(_D1_READ_ONLY_SQL.match(sql))
+
+
+def _d1_operation(payload: dict[str, Any]) -> str:
+    """Low-cardinality metric label for a D1 query payload."""
+    if "batch" in payload:
+        return "batch"
+    match = _D1_SQL_VERB.match(payload.get("sql", ""))
+    verb = match.group(1).lower() if match else ""
+    return verb if verb in _D1_METRIC_VERBS else "other"
+
+
+def _retry_after_seconds(header: str | None) -> float:
+    """Seconds a throttled response asks the client to wait; the HTTP-date form is not worth parsing here."""
+    if not header:
+        return 0.0
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        return 0.0
+
+
+@dataclass
+class D1HttpConfig:
+    """Tuning for the D1 HTTP transport: connection pool, retries and adaptive concurrency."""
+
+    timeout: float = 30.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    max_retries: int = 3
+    retry_backoff: float = 0.1
+    retry_backoff_max: float = 2.0
+    retry_after_max: float = 30.0
+    initial_concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 20
+    latency_target: float = 1.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "D1HttpConfig":
+        return cls(
+            timeout=settings.d1_http_timeout,
+            max_connections=settings.d1_http_max_connections,
+            max_keepalive_connections=settings.d1_http_max_keepalive_connections,
+            keepalive_expiry=settings.d1_http_keepalive_expiry,
+            http2=settings.d1_http2,
+            max_retries=settings.d1_max_retries,
+            retry_backoff=settings.d1_retry_backoff,
+            retry_backoff_max=settings.d1_retry_backoff_max,
+            retry_after_max=settings.d1_retry_after_max,
+            initial_concurrency=settings.d1_initial_concurrency,
+            min_concurrency=settings.d1_min_concurrency,
+            max_concurrency=settings.d1_max_concurrency,
+            latency_target=settings.d1_latency_target,
+        )
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit using additive increase / multiplicative decrease.
+
+    Each fast success raises the limit by 1/limit (about one slot per window of requests). A 429 halves it,
+    and a response slower than `latency_target` shrinks it by 10%. A request that started before the last
+    decrease cannot trigger another one, so a burst of throttled responses only backs off once.
+    """
+
+    THROTTLE_FACTOR = 0.5
+    LATENCY_FACTOR = 0.9
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 20, latency_target: float = 0.0) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Bound lazily so a client created at import time (or reused by another event loop) still works
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncGenerator[None, None]:
+        """Hold one concurrency slot for the duration of the block."""
+        condition = self._get_condition()
+        async with condition:
+            _ = await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def on_success(self, latency: float, started_at: float) -> None:
+        if self.latency_target and latency > self.latency_target:
+            self._decrease(self.LATENCY_FACTOR, started_at)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, started_at: float) -> None:
+        self.throttled += 1
+        self._decrease(self.THROTTLE_FACTOR, started_at)
+
+    def _decrease(self, factor: float, started_at: float) -> None:
+        if started_at < self._last_decrease:
+            return
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self._last_decrease = time.monotonic()
+
+
+@dataclass
+class D1RowSegment:
+    """Columns `start:stop` of a raw row, mapped to one entity or taken as a single column value."""
+
+    start: int
+    stop: int
+    entity: type[Any] | None = None
+    keys: tuple[str, ...] = ()
+
+
+@dataclass
+class D1RowPlan:
+    """How to turn a raw D1 row (an array of column values) into what SQLAlchemy would return for it."""
+
+    processors: Sequence[Callable[[Any], Any] | None]
+    segments: list[D1RowSegment]
+    scalar: bool = False
+
+    @classmethod
+    def for_statement(cls, statement: Any) -> "D1RowPlan | None":
+        if not isinstance(statement, SASelect):
+            return None
+
+        columns = list(statement.selected_columns)
+        processors = [column.type.dialect_impl(_D1_DIALECT).result_processor(_D1_DIALECT, None) for column in columns]
+        segments: list[D1RowSegment] = []
+        position = 0
+        for description in statement.column_descriptions:
+            expr = description["expr"]
+            if isinstance(expr, type) and description["entity"] is expr:
+                mapper: Mapper[Any] = sa_inspect(expr)
+                width = len(mapper.columns)
+                keys = tuple(mapper.get_property_by_column(c).key for c in columns[position : position + width])
+                segments.append(D1RowSegment(position, position + width, expr, keys))
+            else:
+                width = 1
+                segments.append(D1RowSegment(position, position + 1))
+            position += width
+
+        if position != len(columns):
+            # Unusual shape (e.g. an entity with deferred columns); fall back to one value per column
+            segments = [D1RowSegment(i, i + 1) for i in range(len(columns))]
+        # sqlmodel returns scalars for select(Model) and select(Model.column), as `exec` does here
+        return cls(processors, segments, scalar=isinstance(statement, SelectOfScalar) and len(segments) == 1)
+
+
+def _load_entity(entity: type[Any], values: dict[str, Any], validate: bool) -> Any:
+    """Build a model instance from column values, optionally skipping pydantic validation."""
+    if validate:
+        return entity.model_validate(values)
+    # The way the ORM loads rows: a bare instrumented instance with its attributes set directly
+    instance = sa_inspect(entity).class_manager.new_instance()
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    instance.__dict__.update(values)
+    return instance
+
+
+class D1Result:
+    """
+    The parts of SQLAlchemy's `Result` / `ScalarResult` API that repositories use, over D1 rows.
+
+    Rows are kept in D1's array ("raw") format and only turned into tuples, scalars or model instances as
+    they are accessed, so `first()` on a large result builds a single object. Column values go through the
+    same type result processors SQLAlchemy would apply; with `validate=False` entities are then populated
+    directly instead of going through pydantic validation.
+    """
+
+    def __init__(
+        self,
+        rows: list[list[Any]],
+        columns: list[str] | None = None,
+        meta: dict[str, Any] | None = None,
+        plan: D1RowPlan | None = None,
+        validate: bool = True,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns or []
+        self.meta = meta or {}
+        self.validate = validate
+        self._plan = plan
+        self._scalars = plan.scalar if plan else False
+
+    @classmethod
+    def from_query_result(cls, result: dict[str, Any]) -> "D1Result":
+        """Wrap a result in D1's object format (one dict per row)."""
+        objects: list[dict[str, Any]] = result.get("results") or []
+        columns = list(objects[0]) if objects else []
+        return cls([list(row.values()) for row in objects], columns, result.get("meta"))
+
+    @property
+    def rowcount(self) -> int:
+        return int(self.meta.get("changes", 0) or 0)
+
+    @property
+    def lastrowid(self) -> int | None:
+        return self.meta.get("last_row_id")
+
+    def keys(self) -> list[str]:
+        return self.columns
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Any]:
+        for raw in self.rows:
+            yield self._convert(raw)
+
+    def scalars(self) -> "D1Result":
+        """Return a view yielding the first column (or entity) of each row."""
+        view = D1Result(self.rows, self.columns, self.meta, self._plan, self.validate)
+        view._scalars = True
+        return view
+
+    def all(self) -> list[Any]:
+        return [self._convert(raw) for raw in self.rows]
+
+    def fetchall(self) -> list[Any]:
+        return self.all()
+
+    def first(self) -> Any:
+        return self._convert(self.rows[0]) if self.rows else None
+
+    def one_or_none(self) -> Any:
+        if len(self.rows) > 1:
+            raise MultipleResultsFound("Multiple rows were found when one or none was required")
+        return self.first()
+
+    def one(self) -> Any:
+        if not self.rows:
+            raise NoResultFound("No row was found when one was required")
+        return self.one_or_none()
+
+    def scalar(self) -> Any:
+        return self.scalars().first()
+
+    def scalar_one(self) -> Any:
+        return self.scalars().one()
+
+    def scalar_one_or_none(self) -> Any:
+        return self.scalars().one_or_none()
+
+    def _convert(self, raw: list[Any]) -> Any:
+        plan = self._plan
+        if plan is None:
+            return raw[0] if self._scalars else tuple(raw)
+
+        processed = zip(plan.processors, raw, strict=True)
+        values = [value if process is None else process(value) for process, value in processed]
+        if self._scalars:
+            return self._segment_value(plan.segments[0], values)
+        return tuple(self._segment_value(segment, values) for segment in plan.segments)
+
+    def _segment_value(self, segment: D1RowSegment, values: list[Any]) -> Any:
+        if segment.entity is None:
+            return values[segment.start]
+        columns = dict(zip(segment.keys, values[segment.start : segment.stop], strict=True))
+        return _load_entity(segment.entity, columns, self.validate)
+
+
+@dataclass
+class _CompiledD1Statement:
+    compiled: SQLCompiler
+    processors: dict[str, Callable[[Any], Any]]
+    expanding: bool
+    row_plan: D1RowPlan | None = field(default=None)
+
+
+class D1StatementCache:
+    """
+    LRU cache of statements compiled to `?`-parameterized SQL, keyed by statement structure.
+
+    Like SQLAlchemy's compiled cache, two statements that differ only in their bound values share one
+    compiled form; the values are pulled from each statement's cache key and passed as a bind list, so
+    identical SQL text reaches D1 and nothing is rendered inline.
+    """
+
+    def __init__(self, maxsize: int = D1_STATEMENT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, _CompiledD1Statement] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compile(self, statement: Any) -> D1Statement:
+        """Compile a SQLAlchemy/SQLModel statement into SQL text and its positional parameters."""
+        return self.compile_query(statement)[0]
+
+    def compile_query(self, statement: Any) -> tuple[D1Statement, D1RowPlan | None]:
+        """Like `compile`, also returning how to map result rows (None for statements that return no rows)."""
+        cache_key = statement._generate_cache_key()  # pyright: ignore[reportPrivateUsage]
+        if cache_key is None:
+            # Not cacheable (e.g. it embeds a custom construct); compile it on its own
+            self.misses += 1
+            uncached = self._compile(statement, None)
+            return self._render(uncached, uncached.compiled.construct_params()), uncached.row_plan
+
+        entry = self._entries.get(cache_key.key)
+        if entry is None:
+            self.misses += 1
+            entry = self._compile(statement, cache_key)
+            self._entries[cache_key.key] = entry
+            if len(self._entries) > self.maxsize:
+                _ = self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(cache_key.key)
+        parameters = entry.compiled.construct_params(extracted_parameters=cache_key.bindparams)
+        return self._render(entry, parameters), entry.row_plan
+
+    def compile_many(
+        self, statement: Any, rows: Sequence[Mapping[str, Any]], key: Hashable | None = None
+    ) -> list[D1Statement]:
+        """
+        Compile an INSERT run with many parameter sets into multi-row INSERTs under D1's bound parameter limit.
+
+        This is D1's counterpart of an executemany: `statement` must have no VALUES of its own and `rows`,
+        keyed by column key, must all have the same keys. It is compiled once per key set and each row's
+        placeholder group is repeated, so no per-row compilation happens. Python-side scalar column defaults
+        are filled in for columns the rows leave out, as the engine would.
+
+        `key` identifies the statement in the cache when SQLAlchemy can't (ON CONFLICT clauses have no cache key).
+        """
+        if not rows:
+            return []
+        keys = tuple(rows[0])
+        if key is None:
+            cache_key = statement._generate_cache_key()  # pyright: ignore[reportPrivateUsage]
+            key = cache_key.key if cache_key is not None else None
+        entry_key = (key, keys) if key is not None else None
+        entry = self._entries.get(entry_key) if entry_key is not None else None
+        if entry is None:
+            self.misses += 1
+            compiled = cast(SQLCompiler, statement.compile(dialect=_D1_DIALECT, column_keys=list(keys)))
+            entry = self._cache_entry(compiled)
+            if entry_key is not None:
+                self._entries[entry_key] = entry
+                if len(self._entries) > self.maxsize:
+                    _ = self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(entry_key)
+
+        compiled = entry.compiled
+        names = compiled.positiontup or []
+        row_placeholder = f"({', '.join('?' for _ in names)})"
+        head, values_clause, tail = compiled.string.partition(f"VALUES {row_placeholder}")
+        if not values_clause:
+            raise DBError("compile_many needs an INSERT ... VALUES statement")
+
+        defaults = {
+            column.key: column.default.arg
+            for column in compiled.insert_prefetch
+            if isinstance(column.default, ColumnDefault) and column.default.is_scalar
+        }
+        processors = [entry.processors.get(name) for name in names]
+        params = []
+        for row in rows:
+            for name, processor in zip(names, processors, strict=True):
+                value = row[name] if name in row else defaults.get(name)
+                params.append(processor(value) if processor is not None and value is not None else value)
+
+        rows_per_statement = max(1, D1_MAX_BOUND_PARAMETERS // max(1, len(names)))
+        statements: list[D1Statement] = []
+        for start in range(0, len(rows), rows_per_statement):
+            count = min(rows_per_statement, len(rows) - start)
+            sql = f"{head}VALUES {', '.join(row_placeholder for _ in range(count))}{tail}"
+            statements.append((sql, params[start * len(names) : (start + count) * len(names)]))
+        return statements
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @classmethod
+    def _compile(cls, statement: Any, cache_key: Any) -> _CompiledD1Statement:
+        compiled = cast(SQLCompiler, statement.compile(dialect=_D1_DIALECT, cache_key=cache_key))
+        entry = cls._cache_entry(compiled)
+        entry.row_plan = D1RowPlan.for_statement(statement)
+        return entry
+
+    @staticmethod
+    def _cache_entry(compiled: SQLCompiler) -> _CompiledD1Statement:
+        processors: dict[str, Callable[[Any], Any]] = {}
+        for name, bind in compiled.binds.items():
+            processor = bind.type.dialect_impl(_D1_DIALECT).bind_processor(_D1_DIALECT)
+            if processor is not None:
+                processors[name] = processor
+        return _CompiledD1Statement(compiled, processors, expanding=bool(compiled.post_compile_params))
+
+    @staticmethod
+    def _render(entry: _CompiledD1Statement, parameters: Mapping[str, Any]) -> D1Statement:
+        if entry.expanding:
+            # IN (...) lists render one placeholder per value, so their SQL is finished per call
+            state = entry.compiled.construct_expanded_state(parameters)
+            processors = {**entry.processors, **state.processors}
+            sql, names, parameters = state.statement, state.positiontup or [], dict(state.parameters)
+        else:
+            processors = entry.processors
+            sql, names = entry.compiled.string, entry.compiled.positiontup or []
+
+        params: list[Any] = []
+        for name in names:
+            value = parameters[name]
+            processor = processors.get(name)
+            params.append(processor(value) if processor is not None and value is not None else value)
+        return sql, params
+
+
 class D1ConnectionInfo(TypedDict):
     """Type definition for D1 connection information."""
     database_id: str
@@ -42,48 +552,76 @@ class D1ConnectionInfo(TypedDict):
     is_binding: bool
 
 
+# Session.info key marking read-only sessions, and the error raised when one of them is asked to write
+READ_ONLY_SESSION = "read_only"
+READ_ONLY_SESSION_ERROR = "Cannot write in a read-only session"
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_readonly_flush(session: Session, _flush_context: Any, _instances: Any) -> None:
+    if session.info.get(READ_ONLY_SESSION) and (session.new or session.deleted or session.dirty):
+        raise DBError(READ_ONLY_SESSION_ERROR)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _reject_readonly_dml(state: ORMExecuteState) -> None:
+    # Only statement objects can be told apart here: raw text writes are left to the database (READ ONLY on
+    # PostgreSQL, query_only with the SQLite profile)
+    if state.session.info.get(READ_ONLY_SESSION) and (state.is_insert or state.is_update or state.is_delete):
+        raise DBError(READ_ONLY_SESSION_ERROR)
+
+
 class D1Session:
     """
     Mock session that provides SQLAlchemy-compatible interface for D1 operations.
     Handles both HTTP client and Workers binding modes.
     """
 
-    def __init__(self, d1_client: "D1Client") -> None:
+    def __init__(self, d1_client: "D1Client", validate_rows: bool = True, readonly: bool = False) -> None:
         self.d1_client = d1_client
+        self.validate_rows = validate_rows
+        # Read-only sessions reject inserts, deletes and writing statements with a DBError
+        self.readonly = readonly
         self._closed = False
         self._in_transaction = False
         self._pending_operations: list[dict[str, Any]] = []
 
-    async def exec(self, statement: Any) -> Any:
-        """Execute a SQLModel statement and return results."""
+    async def exec(self, statement: Any) -> D1Result:
+        """
+        Execute a SQLModel statement and return a D1Result.
+
+        SELECTs are fetched in D1's compact array format. Pass `.execution_options(d1_validate_rows=False)`
+        on a statement to build its entities without pydantic validation.
+        """
         if self._closed:
             raise DBError("Session is closed")
+        if self.readonly and getattr(statement, "is_dml", False):
+            raise DBError(READ_ONLY_SESSION_ERROR)
+
+        (sql_query, params), plan = self.d1_client.statement_cache.compile_query(statement)
+        if plan is None:
+            return D1Result.from_query_result(await self.d1_client.execute_query(sql_query, params))
 
-        # Convert SQLModel statement to SQL
-        sql_query = str(statement.compile(compile_kwargs={"literal_binds": True}))
-        return await self.d1_client.execute_query(sql_query)
+        raw = await self.d1_client.execute_raw(sql_query, params)
+        validate = statement.get_execution_options().get("d1_validate_rows", self.validate_rows)
+        return D1Result(raw["rows"], raw["columns"], raw["meta"], plan, validate)
 
     async def get(self, model_class: type[ModelType], entity_id: Any) -> ModelType | None:
         """Get entity by primary key."""
         if self._closed:
             raise DBError("Session is closed")
 
-        # Build SELECT query for primary key
-        table_name = getattr(model_class, "__tablename__", model_class.__name__.lower())
-        sql_query = f"SELECT * FROM {table_name} WHERE id = ?"
-
-        result = await self.d1_client.execute_query(sql_query, [entity_id])
-        if not result.get("results") or not result["results"]:
-            return None
-
-        # Convert result to model instance
-        row_data = result["results"][0]
-        return model_class(**row_data)
+        mapper: Mapper[Any] = sa_inspect(model_class)
+        primary_key = mapper.primary_key[0]
+        result = await self.exec(select(model_class).where(primary_key == entity_id))
+        return cast(ModelType | None, result.first())
 
     def add(self, entity: Any) -> None:
         """Add entity to session (stage for insert)."""
         if self._closed:
             raise DBError("Session is closed")
+        if self.readonly:
+            raise DBError(READ_ONLY_SESSION_ERROR)
 
         operation = {
             "type": "insert",
@@ -101,6 +639,8 @@ class D1Session:
         """Delete entity from database."""
         if self._closed:
             raise DBError("Session is closed")
+        if self.readonly:
+            raise DBError(READ_ONLY_SESSION_ERROR)
 
         table_name = getattr(entity.__class__, "__tablename__", entity.__class__.__name__.lower())
         entity_id = getattr(entity, "id", None)
@@ -117,32 +657,74 @@ class D1Session:
         return entity
 
     async def flush(self) -> None:
-        """Execute pending operations."""
+        """
+        Execute pending operations.
+
+        Pending inserts are grouped into multi-row INSERT statements and sent to D1 as a single
+        batch, which D1 runs as one transaction.
+        """
         if self._closed:
             raise DBError("Session is closed")
 
-        for operation in self._pending_operations:
-            if operation["type"] == "insert":
-                await self._execute_insert(operation["entity"], operation["table"])
+        statements = self._build_insert_statements()
+        if len(statements) == 1:
+            sql_query, params = statements[0]
+            _ = await self.d1_client.execute_query(sql_query, params)
+        elif statements:
+            _ = await self.d1_client.execute_batch(statements)
 
         self._pending_operations.clear()
 
-    async def _execute_insert(self, entity: Any, table_name: str) -> None:
-        """Execute insert operation for an entity."""
-        # Convert entity to dict, excluding None values and id if it's None
-        entity_dict = entity.model_dump(exclude_none=True)
-        if "id" in entity_dict and entity_dict["id"] is None:
-            entity_dict.pop("id")
-
-        if not entity_dict:
-            return
+    def _build_insert_statements(self) -> list[D1Statement]:
+        """
+        Turn pending inserts into multi-row INSERT statements.
 
-        columns = list(entity_dict.keys())
-        placeholders = ["?" for _ in columns]
-        values = list(entity_dict.values())
+        Consecutive inserts into the same table are merged (so parent rows still go in before child rows),
+        split by column set, since rows omit None values to let column defaults apply, and chunked to stay
+        under D1's bound parameter limit.
+        """
+        statements: list[D1Statement] = []
+        run_table: str | None = None
+        run_rows: dict[tuple[str, ...], list[list[Any]]] = {}
 
-        sql_query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-        _ = await self.d1_client.execute_query(sql_query, values)
+        for operation in self._pending_operations:
+            if operation["type"] != "insert":
+                continue
+            row = self._insert_values(operation["entity"])
+            if not row:
+                continue
+            if operation["table"] != run_table:
+                if run_table is not None:
+                    statements.extend(self._multi_row_inserts(run_table, run_rows))
+                run_table, run_rows = operation["table"], {}
+            run_rows.setdefault(tuple(row), []).append(list(row.values()))
+
+        if run_table is not None:
+            statements.extend(self._multi_row_inserts(run_table, run_rows))
+        return statements
+
+    @staticmethod
+    def _insert_values(entity: Any) -> dict[str, Any]:
+        """Column values for an insert, excluding None values and id if it's None."""
+        entity_dict: dict[str, Any] = entity.model_dump(exclude_none=True)
+        if "id" in entity_dict and entity_dict["id"] is None:
+            entity_dict.pop("id")
+        return entity_dict
+
+    @staticmethod
+    def _multi_row_inserts(
+        table_name: str, rows_by_columns: dict[tuple[str, ...], list[list[Any]]]
+    ) -> list[D1Statement]:
+        statements: list[D1Statement] = []
+        for columns, rows in rows_by_columns.items():
+            rows_per_statement = max(1, D1_MAX_BOUND_PARAMETERS // len(columns))
+            row_placeholder = f"({', '.join('?' for _ in columns)})"
+            for start in range(0, len(rows), rows_per_statement):
+                chunk = rows[start : start + rows_per_statement]
+                values_clause = ", ".join(row_placeholder for _ in chunk)
+                sql_query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {values_clause}"
+                statements.append((sql_query, [value for row in chunk for value in row]))
+        return statements
 
     async def execute(self, statement: Any, parameters: dict[str, Any] | None = None) -> Any:
         """Execute raw SQL statement."""
@@ -153,9 +735,11 @@ class D1Session:
             sql_query = str(statement.text)
         else:
             sql_query = str(statement)
+        if self.readonly and not is_read_only_sql(sql_query):
+            raise DBError(READ_ONLY_SESSION_ERROR)
 
         params = list(parameters.values()) if parameters else []
-        return await self.d1_client.execute_query(sql_query, params)
+        return D1Result.from_query_result(await self.d1_client.execute_query(sql_query, params))
 
     def begin(self) -> "D1Transaction":
         """Begin a transaction."""
@@ -195,10 +779,23 @@ class D1Client:
     Unified client for D1 operations supporting both HTTP API and Workers binding.
     """
 
-    def __init__(self, connection_info: D1ConnectionInfo) -> None:
+    def __init__(self, connection_info: D1ConnectionInfo, http_config: D1HttpConfig | None = None) -> None:
         self.connection_info = connection_info
+        self.http_config = http_config or D1HttpConfig()
+        self.limiter = AIMDLimiter(
+            initial=self.http_config.initial_concurrency,
+            min_limit=self.http_config.min_concurrency,
+            max_limit=self.http_config.max_concurrency,
+            latency_target=self.http_config.latency_target,
+        )
         self.http_client: httpx.AsyncClient | None = None
         self.worker_binding: Any = None
+        self.statement_cache = D1StatementCache()
+        # Called with the tables a successful write statement changed (set by DatabaseManager for its query cache)
+        self.on_write: Callable[[set[str]], None] | None = None
+        # Called with each statement, its parameters and the seconds it took (set for SQL instrumentation)
+        self.on_statement: Callable[[str, Any, float], None] | None = None
+        self._prepared: OrderedDict[str, Any] = OrderedDict()
 
         if connection_info["is_binding"]:
             self._init_worker_binding()
@@ -233,57 +830,209 @@ class D1Client:
         if not account_id or not api_token:
             raise DBError("Account ID and API token are required for HTTP client mode")
 
+        config = self.http_config
+        http2 = config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested for D1 but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+
         self.http_client = httpx.AsyncClient(
             headers={
                 "Authorization": f"Bearer {api_token}",
                 "Content-Type": "application/json",
             },
-            timeout=30.0,
+            timeout=config.timeout,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=http2,
         )
 
     async def execute_query(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
         """Execute SQL query using appropriate method."""
+        started_at = time.perf_counter()
         if self.worker_binding:
-            return await self._execute_via_binding(sql, params)
-        if self.http_client:
-            return await self._execute_via_http(sql, params)
-        raise DBError("No D1 client method available")
+            result = await self._execute_via_binding(sql, params)
+        elif self.http_client:
+            result = await self._execute_via_http(sql, params)
+        else:
+            raise DBError("No D1 client method available")
+        self._notify_statements([(sql, params or [])], started_at)
+        return result
+
+    async def execute_raw(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
+        """
+        Execute a query and return its rows as arrays: `{"columns": [...], "rows": [[...]], "meta": {...}}`.
+        Repeating column names only once per result makes large payloads much smaller than the object format.
+        """
+        started_at = time.perf_counter()
+        if self.worker_binding:
+            result = await self._execute_raw_via_binding(sql, params)
+        elif self.http_client:
+            result = await self._execute_raw_via_http(sql, params)
+        else:
+            raise DBError("No D1 client method available")
+        self._notify_statements([(sql, params or [])], started_at)
+        return result
+
+    async def execute_batch(self, statements: list[D1Statement]) -> list[dict[str, Any]]:
+        """
+        Execute several statements in one round trip.
+        D1 runs a batch as a single transaction: if any statement fails, none of them is applied.
+        """
+        if not statements:
+            return []
+        started_at = time.perf_counter()
+        if self.worker_binding:
+            results = await self._execute_batch_via_binding(statements)
+        elif self.http_client:
+            results = await self._execute_batch_via_http(statements)
+        else:
+            raise DBError("No D1 client method available")
+        self._notify_statements(statements, started_at)
+        return results
+
+    def _notify_statements(self, statements: Sequence[D1Statement], started_at: float) -> None:
+        if self.on_statement is not None:
+            # A batch is one round trip: share its time between the statements
+            seconds = (time.perf_counter() - started_at) / len(statements)
+            for sql, params in statements:
+                self.on_statement(sql, params, seconds)
+        if self.on_write is not None:
+            tables = {table for table in (written_table(sql) for sql, _ in statements) if table is not None}
+            if tables:
+                self.on_write(tables)
+
+    def _prepare_bound(self, sql: str, params: list[Any] | None) -> Any:
+        # `bind()` returns a new statement, so one prepare() handle per SQL text can be reused
+        statement = self._prepared.get(sql)
+        if statement is None:
+            statement = self.worker_binding.prepare(sql)
+            self._prepared[sql] = statement
+            if len(self._prepared) > D1_STATEMENT_CACHE_SIZE:
+                _ = self._prepared.popitem(last=False)
+        else:
+            self._prepared.move_to_end(sql)
+        return statement.bind(*params) if params else statement
+
+    @staticmethod
+    def _binding_result(result: Any) -> dict[str, Any]:
+        return {
+            "success": True,
+            "results": result.results if hasattr(result, "results") else [],
+            "meta": getattr(result, "meta", {}),
+        }
 
     async def _execute_via_binding(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
         """Execute query via Workers binding."""
         try:
             # Workers binding API
-            statement = self.worker_binding.prepare(sql)
-            if params:
-                for param in params:
-                    statement = statement.bind(param)
+            result = await self._prepare_bound(sql, params).all()
+            return self._binding_result(result)
+        except Exception as e:
+            logger.error(f"D1 binding query failed: {e}")
+            raise DBError(f"D1 binding query failed: {e}") from e
 
-            result = await statement.all()
-            return {
-                "success": True,
-                "results": result.results if hasattr(result, "results") else [],
-                "meta": getattr(result, "meta", {}),
-            }
+    async def _execute_raw_via_binding(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
+        """Execute query via Workers binding `raw()`, which returns rows as arrays."""
+        try:
+            rows = await self._prepare_bound(sql, params).raw()
+            # Pyodide hands back JS arrays; convert them to Python lists
+            rows = rows.to_py() if hasattr(rows, "to_py") else rows
+            return {"columns": [], "rows": [list(row) for row in rows], "meta": {}}
         except Exception as e:
             logger.error(f"D1 binding query failed: {e}")
             raise DBError(f"D1 binding query failed: {e}") from e
 
+    async def _execute_batch_via_binding(self, statements: list[D1Statement]) -> list[dict[str, Any]]:
+        """Execute a batch via the Workers binding `batch()` API."""
+        try:
+            results = await self.worker_binding.batch([self._prepare_bound(sql, params) for sql, params in statements])
+            return [self._binding_result(result) for result in results]
+        except Exception as e:
+            logger.error(f"D1 binding batch failed: {e}")
+            raise DBError(f"D1 binding batch failed: {e}") from e
+
     async def _execute_via_http(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
         """Execute query via HTTP API."""
+        payload: dict[str, Any] = {"sql": sql}
+        if params:
+            payload["params"] = params
+
+        result = await self._post_query(payload, idempotent=is_read_only_sql(sql))
+        # The API answers with one result per statement
+        if isinstance(result, list):
+            return cast(dict[str, Any], result[0]) if result else {}
+        return cast(dict[str, Any], result)
+
+    async def _execute_raw_via_http(self, sql: str, params: list[Any] | None = None) -> dict[str, Any]:
+        """Execute query via the HTTP API's `/raw` endpoint."""
+        payload: dict[str, Any] = {"sql": sql}
+        if params:
+            payload["params"] = params
+
+        result = await self._post_query(payload, idempotent=is_read_only_sql(sql), endpoint="raw")
+        statement_result = (result[0] if result else {}) if isinstance(result, list) else result
+        results = statement_result.get("results") or {}
+        return {
+            "columns": results.get("columns", []),
+            "rows": results.get("rows", []),
+            "meta": statement_result.get("meta", {}),
+        }
+
+    async def _execute_batch_via_http(self, statements: list[D1Statement]) -> list[dict[str, Any]]:
+        """Execute a batch via the HTTP API in a single request."""
+        payload = {"batch": [{"sql": sql, "params": params} for sql, params in statements]}
+        idempotent = all(is_read_only_sql(sql) for sql, _ in statements)
+        result = await self._post_query(payload, idempotent=idempotent)
+        return cast(list[dict[str, Any]], result if isinstance(result, list) else [result])
+
+    async def _post_query(self, payload: dict[str, Any], idempotent: bool = False, endpoint: str = "query") -> Any:
+        """
+        POST a payload to a D1 query endpoint (`query` or `raw`) and return its `result`.
+
+        Requests that never reached the server are retried; 429 and 5xx responses are retried only when
+        `idempotent` is set, since a write may already have been applied. A server Retry-After is honored in
+        full, unless it exceeds `retry_after_max`, in which case the query fails instead of waiting.
+        """
         if not self.http_client:
             raise DBError("HTTP client not initialized")
 
         account_id = self.connection_info["account_id"]
         database_id = self.connection_info["database_id"]
 
-        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/d1/database/{database_id}/query"
+        url = f"{D1_API_BASE_URL}/accounts/{account_id}/d1/database/{database_id}/{endpoint}"
+        operation = _d1_operation(payload)
 
-        payload: dict[str, Any] = {"sql": sql}
-        if params:
-            payload["params"] = params
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(url, payload, operation)
+            except httpx.TransportError as e:
+                if attempt < self.http_config.max_retries and (idempotent or isinstance(e, _D1_UNSENT_ERRORS)):
+                    attempt += 1
+                    D1_QUERY_RETRIES.labels(reason=type(e).__name__).inc()
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                logger.error(f"D1 HTTP query failed: {e}")
+                raise DBError(f"D1 HTTP query failed: {e}") from e
+
+            retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+            if (
+                idempotent
+                and response.status_code in D1_RETRYABLE_STATUS_CODES
+                and attempt < self.http_config.max_retries
+                and retry_after <= self.http_config.retry_after_max
+            ):
+                attempt += 1
+                D1_QUERY_RETRIES.labels(reason=str(response.status_code)).inc()
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
+                continue
+            break
 
         try:
-            response = await self.http_client.post(url, json=payload)
             _ = response.raise_for_status()
 
             data = response.json()
@@ -292,12 +1041,36 @@ class D1Client:
                 error_msg = "; ".join(err.get("message", str(err)) for err in errors)
                 raise DBError(f"D1 query failed: {error_msg}")
 
-            result = data.get("result", {})
-            return cast(dict[str, Any], result)
+            return data.get("result", {})
         except httpx.HTTPError as e:
             logger.error(f"D1 HTTP query failed: {e}")
             raise DBError(f"D1 HTTP query failed: {e}") from e
 
+    async def _send(self, url: str, payload: dict[str, Any], operation: str) -> httpx.Response:
+        """Send one request under the concurrency limiter, feeding its outcome back to the limiter."""
+        assert self.http_client is not None
+        started_at = time.monotonic()
+        status = "error"
+        try:
+            async with self.limiter.slot():
+                sent_at = time.monotonic()
+                response = await self.http_client.post(url, json=payload)
+            status = str(response.status_code)
+            if response.status_code == 429:
+                self.limiter.on_throttle(sent_at)
+            elif response.status_code < 500:
+                self.limiter.on_success(time.monotonic() - sent_at, sent_at)
+            return response
+        finally:
+            D1_QUERY_DURATION.labels(operation=operation, status=status).observe(time.monotonic() - started_at)
+            D1_CONCURRENCY_LIMIT.set(self.limiter.limit)
+
+    def _retry_delay(self, attempt: int, retry_after: float = 0.0) -> float:
+        """Full-jitter exponential backoff, never shorter than a server-provided Retry-After."""
+        config = self.http_config
+        delay = random.uniform(0, min(config.retry_backoff_max, config.retry_backoff * 2 ** (attempt - 1)))
+        return max(delay, retry_after)
+
     async def close(self) -> None:
         """Close the client."""
         if self.http_client:
@@ -345,6 +1118,615 @@ def parse_d1_url(url: str) -> D1ConnectionInfo:
     raise DBError(f"Invalid D1 URL scheme: {parsed.scheme}")
 
 
+###############################################################################
+# Query Result Cache
+###############################################################################
+
+QUERY_CACHE_REQUESTS = Counter(
+    "db_query_cache_requests_total", "Repository query cache lookups, by table read", ["table", "result"]
+)
+QUERY_CACHE_INVALIDATIONS = Counter(
+    "db_query_cache_invalidations_total", "Cached query results dropped after a write to a table they read", ["source"]
+)
+QUERY_CACHE_ENTRIES = Gauge("db_query_cache_entries", "Results held by the repository query cache")
+
+# The table an INSERT / UPDATE / DELETE changes, including SQLite's `INSERT OR ...` and `REPLACE`
+_WRITTEN_TABLE_SQL = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+([\w.\"`\[\]]+)",
+    re.IGNORECASE,
+)
+
+# Connection.info keys: tables written in the current transaction, and in transactions ended since checkout
+_WRITTEN_TABLES = "query_cache_written"
+_ENDED_WRITES = "query_cache_ended"
+
+
+def written_table(sql: str) -> str | None:
+    """Lower-cased name of the table a write statement changes, without schema or quotes; None for reads."""
+    match = _WRITTEN_TABLE_SQL.match(sql)
+    if match is None:
+        return None
+    return re.sub(r"[\"`\[\]]", "", match.group(1)).rsplit(".", 1)[-1].lower()
+
+
+def _hashable_value(value: Any) -> Hashable:
+    if isinstance(value, list | tuple):
+        return tuple(_hashable_value(item) for item in value)
+    hash(value)  # raises TypeError for values that cannot be part of a key
+    return cast(Hashable, value)
+
+
+@dataclass
+class _QueryCacheEntry:
+    result: Any  # FrozenResult, or a D1Result (which converts its raw rows afresh on every read)
+    tables: frozenset[str]
+    expires_at: float
+    scalars: bool
+
+
+class QueryCache:
+    """
+    LRU cache of repository read results, keyed by statement structure plus bound values.
+
+    Every entry is tagged with the tables its statement reads. Ending a transaction that wrote one of those
+    tables drops the entry, in this worker directly and in the others through a Redis channel (see
+    `DatabaseManager.start_query_cache_sync`). Entries also expire after a TTL that can be overridden per
+    table; a statement reading several tables uses the shortest. A per-table generation counter keeps a
+    read that overlapped a write from caching what it saw.
+
+    Cached ORM instances are shared by every caller that hits the entry, so treat them as read-only.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, ttl: float = 60.0, table_ttls: Mapping[str, float] | None = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.table_ttls = {table.lower(): value for table, value in (table_ttls or {}).items()}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Hashable, _QueryCacheEntry] = OrderedDict()
+        self._by_table: dict[str, set[Hashable]] = {}
+        self._generations: dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "QueryCache":
+        return cls(
+            max_entries=settings.query_cache_max_entries,
+            ttl=settings.query_cache_ttl,
+            table_ttls=settings.query_cache_table_ttls,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key_for(statement: Any) -> Hashable | None:
+        """Cache key of a SELECT: its SQLAlchemy cache key plus bound values, or None if it can't be cached."""
+        if not getattr(statement, "is_select", False):
+            return None
+        cache_key = statement._generate_cache_key()  # pyright: ignore[reportPrivateUsage]
+        if cache_key is None:
+            return None
+        try:
+            values = tuple(_hashable_value(bind.effective_value) for bind in cache_key.bindparams)
+        except TypeError:
+            return None
+        return (cache_key.key, values)
+
+    @staticmethod
+    def tables_of(statement: Any) -> frozenset[str]:
+        """Lower-cased names of every table a statement reads, subqueries included."""
+        return frozenset(element.name.lower() for element in visitors.iterate(statement) if isinstance(element, Table))
+
+    async def exec(self, session: DBSession, statement: Any) -> Any:
+        """
+        Run a read through the cache and return what `session.exec(statement)` would.
+
+        Statements that can't be keyed or read no table run uncached, as do reads on a session holding
+        uncommitted writes.
+        """
+        key = self.key_for(statement)
+        tables = self.tables_of(statement) if key is not None else frozenset[str]()
+        if key is None or not tables or self._sees_uncommitted_writes(session):
+            return await session.exec(statement)
+
+        entry = self._lookup(key)
+        self._count(tables, "hit" if entry is not None else "miss")
+        if entry is not None:
+            return self._replay(entry)
+
+        generations = self._generations_of(tables)
+        result: Any
+        if isinstance(session, D1Session):
+            result = await session.exec(statement)
+        else:
+            result = (await session.execute(statement)).freeze()  # pyright: ignore[reportDeprecated]
+        ttl = min(self.table_ttls.get(table, self.ttl) for table in tables)
+        entry = _QueryCacheEntry(result, tables, time.monotonic() + ttl, isinstance(statement, SelectOfScalar))
+        # A write to one of the tables ended while the query ran: what it read may already be stale
+        if ttl > 0 and generations == self._generations_of(tables):
+            self._store(key, entry)
+        return self._replay(entry)
+
+    @staticmethod
+    def _sees_uncommitted_writes(session: DBSession) -> bool:
+        # What a unit of work's write session reads may never be committed
+        return not isinstance(session, D1Session) and bool(session.info.get(_UNCOMMITTED_WRITES))
+
+    def invalidate(self, tables: Iterable[str], source: str = "local") -> int:
+        """Drop every entry that read one of these tables; returns how many were dropped."""
+        dropped = 0
+        for table in {table.lower() for table in tables}:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in self._by_table.pop(table, set()):
+                dropped += self._drop(key)
+        if dropped:
+            self.invalidations += dropped
+            QUERY_CACHE_INVALIDATIONS.labels(source=source).inc(dropped)
+            QUERY_CACHE_ENTRIES.set(len(self._entries))
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_table.clear()
+        QUERY_CACHE_ENTRIES.set(0)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _lookup(self, key: Hashable) -> _QueryCacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            _ = self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, entry: _QueryCacheEntry) -> None:
+        _ = self._drop(key)
+        self._entries[key] = entry
+        for table in entry.tables:
+            self._by_table.setdefault(table, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            _ = self._drop(next(iter(self._entries)))
+        QUERY_CACHE_ENTRIES.set(len(self._entries))
+
+    def _drop(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+        return True
+
+    def _generations_of(self, tables: frozenset[str]) -> tuple[int, ...]:
+        return tuple(self._generations.get(table, 0) for table in sorted(tables))
+
+    def _count(self, tables: frozenset[str], result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+        for table in tables:
+            QUERY_CACHE_REQUESTS.labels(table=table, result=result).inc()
+
+    @staticmethod
+    def _replay(entry: _QueryCacheEntry) -> Any:
+        if isinstance(entry.result, D1Result):
+            return entry.result
+        result = entry.result()
+        return result.scalars() if entry.scalars else result
+
+
+###############################################################################
+# SQL Instrumentation
+###############################################################################
+
+SQL_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Latency of SQL statements, by normalized statement", ["statement"]
+)
+SQL_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "SQL statements slower than the slow-query threshold", ["operation"]
+)
+SQL_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total", "Requests that ran one statement more often than the N+1 threshold", ["statement"]
+)
+REQUEST_QUERIES = Histogram(
+    "db_request_queries", "SQL statements per HTTP request", buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+)
+REQUEST_QUERY_SECONDS = Histogram("db_request_query_seconds", "Time spent in SQL statements per HTTP request")
+
+_SQL_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_SQL_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\b\d+(?:\.\d+)?\b")
+_SQL_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_REPEATED_ROWS = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_SQL_WHITESPACE = re.compile(r"\s+")
+
+# Statement shapes get their own histogram label up to this many; later ones share "other"
+MAX_STATEMENT_LABELS = 200
+_MAX_STATEMENT_LENGTH = 300
+_QUERY_STARTED = "sql_instrumentation_started"
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a statement to its shape, so that runs with other values or list lengths compare equal:
+    literals and bind parameters become `?`, and IN lists and multi-row VALUES collapse to one entry.
+
+    Example:
+        >>> normalize_sql("SELECT * FROM t WHERE id IN ($1, $2, $3) LIMIT 10")
+        'SELECT * FROM t WHERE id IN (?) LIMIT ?'
+    """
+    shape = _SQL_PLACEHOLDER.sub("?", _SQL_STRING_LITERAL.sub("?", sql))
+    shape = _SQL_REPEATED_ROWS.sub(r"\1", _SQL_PLACEHOLDER_LIST.sub("(?)", shape))
+    shape = _SQL_WHITESPACE.sub(" ", shape).strip()
+    return shape if len(shape) <= _MAX_STATEMENT_LENGTH else shape[: _MAX_STATEMENT_LENGTH - 3] + "..."
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace bind parameter values with their type (and length for strings and bytes), keeping the structure."""
+    if isinstance(parameters, Mapping):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None:
+        return None
+    if isinstance(parameters, str | bytes):
+        return f"<{type(parameters).__name__}:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+@dataclass
+class StatementStats:
+    """Running totals for one statement shape."""
+
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class SQLInstrumentation:
+    """
+    Times every SQL statement through engine events (or D1 client callbacks) and records:
+
+    - a latency histogram per normalized statement (`db_query_duration_seconds`)
+    - a slow-query log, with bind parameters redacted unless configured otherwise
+    - the queries and time spent of the current request, on its `UnitOfWork`
+    - in debug mode, an N+1 warning when one statement shape runs more than `n_plus_one_threshold`
+      times in a request
+
+    Per-statement totals and the last requests are kept for the `/dev/sql_stats` endpoint.
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold: float = 0.5,
+        redact: bool = True,
+        n_plus_one_threshold: int = 0,
+        recent_requests: int = 50,
+    ) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.redact = redact
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements: dict[str, StatementStats] = {}
+        self.recent: deque[dict[str, Any]] = deque(maxlen=recent_requests)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SQLInstrumentation":
+        return cls(
+            slow_query_threshold=settings.database_slow_query_threshold,
+            redact=settings.database_slow_query_redact,
+            n_plus_one_threshold=settings.database_n_plus_one_threshold if settings.is_debug else 0,
+        )
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Time the statements run by this engine."""
+        _instrumented_engines[engine.sync_engine] = self
+
+    def record(self, sql: str, parameters: Any, seconds: float) -> None:
+        """Record one statement that took `seconds`."""
+        shape = normalize_sql(sql)
+        stats = self.statements.get(shape)
+        if stats is None and len(self.statements) >= MAX_STATEMENT_LABELS:
+            shape = "other"
+            stats = self.statements.get(shape)
+        if stats is None:
+            stats = self.statements[shape] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        SQL_QUERY_DURATION.labels(statement=shape).observe(seconds)
+
+        if self.slow_query_threshold and seconds >= self.slow_query_threshold:
+            verb = _D1_SQL_VERB.match(sql)
+            SQL_SLOW_QUERIES.labels(operation=verb.group(1).lower() if verb else "other").inc()
+            logger.warning(
+                "Slow query",
+                extra={
+                    "seconds": round(seconds, 4),
+                    "statement": _SQL_WHITESPACE.sub(" ", sql).strip(),
+                    "parameters": redact_parameters(parameters) if self.redact else parameters,
+                },
+            )
+
+        unit = _unit_of_work.get()
+        if unit is not None:
+            unit.queries += 1
+            unit.query_seconds += seconds
+            count = unit.statement_counts[shape] = unit.statement_counts.get(shape, 0) + 1
+            if self.n_plus_one_threshold and count == self.n_plus_one_threshold + 1:
+                SQL_N_PLUS_ONE.labels(statement=shape).inc()
+                logger.warning(
+                    "Possible N+1 query: statement repeated within one request",
+                    extra={
+                        "statement": shape,
+                        "threshold": self.n_plus_one_threshold,
+                        "stack": "".join(traceback.format_stack(limit=12)[:-1]),
+                    },
+                )
+
+    def finish_request(self, unit: "UnitOfWork", method: str, path: str) -> dict[str, Any]:
+        """Export a finished request's totals and keep them, under its correlation ID, for `/dev`."""
+        REQUEST_QUERIES.observe(unit.queries)
+        REQUEST_QUERY_SECONDS.observe(unit.query_seconds)
+        threshold = self.n_plus_one_threshold
+        summary = {
+            "correlation_id": correlation_id.get(),
+            "method": method,
+            "path": path,
+            "queries": unit.queries,
+            "seconds": round(unit.query_seconds, 6),
+            "checkouts": unit.checkouts,
+            "n_plus_one": {s: n for s, n in unit.statement_counts.items() if threshold and n > threshold},
+        }
+        self.recent.append(summary)
+        return summary
+
+    def snapshot(self, top: int = 50) -> dict[str, Any]:
+        """Statements by total time spent, and the most recent requests first."""
+        statements = sorted(self.statements.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+        return {
+            "slow_query_threshold": self.slow_query_threshold,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "statements": [
+                {
+                    "statement": shape,
+                    "count": stats.count,
+                    "total_seconds": round(stats.seconds, 6),
+                    "mean_seconds": round(stats.seconds / stats.count, 6),
+                    "max_seconds": round(stats.max_seconds, 6),
+                }
+                for shape, stats in statements
+            ],
+            "recent_requests": list(reversed(self.recent)),
+        }
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.recent.clear()
+
+
+# Engines whose statements are timed, and by which instrumentation. The listeners below are registered on
+# the Engine class once, rather than on each engine, and do nothing for engines not in this map.
+_instrumented_engines: "weakref.WeakKeyDictionary[Any, SQLInstrumentation]" = weakref.WeakKeyDictionary()
+
+
+def _base_engine(conn: Any) -> Any:
+    # Engines derived with execution_options() (the read-only session binds) report as their parent
+    return getattr(conn.engine, "_proxied", conn.engine)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn: Any, *_args: Any) -> None:
+    if _base_engine(conn) in _instrumented_engines:
+        conn.info.setdefault(_QUERY_STARTED, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn: Any, _cursor: Any, statement: str, parameters: Any, *_args: Any) -> None:
+    started = conn.info.get(_QUERY_STARTED)
+    instrumentation = _instrumented_engines.get(_base_engine(conn))
+    if started and instrumentation is not None:
+        instrumentation.record(statement, parameters, time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_statement_timer(context: Any) -> None:
+    started = context.connection.info.get(_QUERY_STARTED) if context.connection is not None else None
+    if started:
+        _ = started.pop()
+
+
+###############################################################################
+# Table Partitioning
+###############################################################################
+
+# Rows read per round trip when archiving a partition
+ARCHIVE_BATCH_ROWS = 5000
+
+# Session-level advisory lock taken by the maintenance job, so that only one worker runs it at a time
+_PARTITION_LOCK_QUERY = "SELECT pg_{}(hashtext('faster:partition_maintenance'))"
+
+_PARTITIONED_TABLE_QUERY = (
+    "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+)
+_PARTITIONS_QUERY = (
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+)
+
+
+def add_months(month: date, months: int) -> date:
+    """The first day of the month `months` months after (before, if negative) the month of `month`."""
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+@dataclass
+class PartitionConfig:
+    """
+    Maintenance of tables range-partitioned by month on PostgreSQL.
+
+    Partitions are kept created `months_ahead` months beyond the current one. With `retention_months` set,
+    partitions whose whole month is older than that are dropped, rather than deleting their rows, after
+    being written to `archive_dir` when it is set. `interval` is the time in seconds between runs.
+    """
+
+    tables: list[str] = field(default_factory=list)
+    months_ahead: int = 3
+    retention_months: int = 0
+    archive_dir: str = ""
+    interval: float = 86400.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PartitionConfig":
+        return cls(
+            tables=list(settings.database_partitioned_tables),
+            months_ahead=settings.database_partition_months_ahead,
+            retention_months=settings.database_partition_retention_months,
+            archive_dir=settings.database_partition_archive_dir,
+            interval=settings.database_partition_interval,
+        )
+
+
+def _open_archive(path: Path) -> TextIO:
+    return gzip.open(path, "wt", newline="")
+
+
+class MonthlyPartitions:
+    """
+    The monthly partitions of a PostgreSQL table range-partitioned on a timestamp column.
+
+    Partitions are named after their table and month (`AUTH_USER_ACTION_202401`) and cover that month; a
+    table that is not partitioned (on another database, or before its migration) is left alone.
+
+    Example:
+        >>> partitions = MonthlyPartitions("AUTH_USER_ACTION", PartitionConfig(retention_months=12))
+        >>> async with engine.connect() as conn:
+        ...     summary = await partitions.maintain(conn, date.today())
+        >>> summary["dropped"]
+        ['AUTH_USER_ACTION_202401']
+    """
+
+    def __init__(self, table: str, config: PartitionConfig) -> None:
+        self.table = table
+        self.config = config
+        self._name_pattern = re.compile(re.escape(table) + r"_(\d{4})(\d{2})")
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_{month:%Y%m}"
+
+    def plan(self, existing: Mapping[date, str], today: date) -> tuple[list[date], list[tuple[date, str]]]:
+        """The months that need a partition created, and the existing partitions past retention, oldest first."""
+        current = today.replace(day=1)
+        upcoming = (add_months(current, offset) for offset in range(self.config.months_ahead + 1))
+        create = [month for month in upcoming if month not in existing]
+        if self.config.retention_months <= 0:
+            return create, []
+        cutoff = add_months(current, -self.config.retention_months)
+        return create, sorted((month, name) for month, name in existing.items() if month < cutoff)
+
+    async def is_partitioned(self, conn: AsyncConnection) -> bool:
+        if conn.dialect.name != "postgresql":
+            return False
+        return (await conn.execute(text(_PARTITIONED_TABLE_QUERY), {"table": self.table})).first() is not None
+
+    async def partitions(self, conn: AsyncConnection) -> dict[date, str]:
+        """The existing monthly partitions by month (the default partition, if any, is not one of them)."""
+        found: dict[date, str] = {}
+        for (name,) in await conn.execute(text(_PARTITIONS_QUERY), {"table": self.table}):
+            match = self._name_pattern.fullmatch(name)
+            if match:
+                found[date(int(match[1]), int(match[2]), 1)] = name
+        return found
+
+    async def create(self, conn: AsyncConnection, month: date) -> str:
+        name = self.partition_name(month)
+        quote = conn.dialect.identifier_preparer.quote
+        _ = await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(self.table)} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+        return name
+
+    async def archive(self, conn: AsyncConnection, name: str) -> Path:
+        """
+        Write a partition's rows to `<archive_dir>/<name>.csv.gz`, with a header row.
+
+        Rows are read through a server-side cursor and written from a worker thread, so neither memory nor
+        the event loop depend on the partition's size. The file only appears once complete.
+        """
+        directory = Path(self.config.archive_dir)
+        path = directory / f"{name}.csv.gz"
+        partial = path.with_name(f"{path.name}.partial")
+        await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+        result = await conn.stream(text(f"SELECT * FROM {conn.dialect.identifier_preparer.quote(name)}"))
+        archive = await asyncio.to_thread(_open_archive, partial)
+        try:
+            writer = csv.writer(archive)
+            await asyncio.to_thread(writer.writerow, list(result.keys()))
+            async for rows in result.partitions(ARCHIVE_BATCH_ROWS):
+                await asyncio.to_thread(writer.writerows, rows)
+        except BaseException:
+            await asyncio.to_thread(archive.close)
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(archive.close)
+        await asyncio.to_thread(partial.replace, path)
+        return path
+
+    async def drop(self, conn: AsyncConnection, name: str) -> None:
+        quote = conn.dialect.identifier_preparer.quote
+        _ = await conn.execute(text(f"ALTER TABLE {quote(self.table)} DETACH PARTITION {quote(name)}"))
+        _ = await conn.execute(text(f"DROP TABLE {quote(name)}"))
+
+    async def maintain(self, conn: AsyncConnection, today: date) -> dict[str, list[str]]:
+        """
+        Create the partitions of the coming months, then archive and drop those past retention.
+
+        Each step is committed on its own, and a partition is only dropped once its archive is written.
+
+        Returns:
+            The names of the partitions created and dropped, and the archive files written
+        """
+        summary: dict[str, list[str]] = {"created": [], "archived": [], "dropped": []}
+        if not await self.is_partitioned(conn):
+            await conn.rollback()
+            return summary
+
+        create, expired = self.plan(await self.partitions(conn), today)
+        for month in create:
+            summary["created"].append(await self.create(conn, month))
+        await conn.commit()
+
+        for _, name in expired:
+            if self.config.archive_dir:
+                summary["archived"].append(str(await self.archive(conn, name)))
+                await conn.commit()
+            await self.drop(conn, name)
+            await conn.commit()
+            summary["dropped"].append(name)
+        return summary
+
+
 ###############################################################################
 # Database Manager with D1 Support
 ###############################################################################
@@ -353,9 +1735,212 @@ def parse_d1_url(url: str) -> D1ConnectionInfo:
 class EngineKwargs(TypedDict, total=False):
     echo: bool
     future: bool
-    connect_args: dict[str, bool]
+    connect_args: dict[str, Any]
     pool_size: int
     max_overflow: int
+    pool_pre_ping: bool
+    pool_recycle: int
+    pool_timeout: float
+    pool_logging_name: str
+    poolclass: type[Pool]
+
+
+# Summed over the live worker processes, each with its own pools
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ["pool"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["pool"], multiprocess_mode="livesum"
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+@dataclass
+class PoolConfig:
+    """
+    Connection pool options for server databases.
+
+    `pre_ping` tests a connection before handing it out, so connections dropped by the server or a proxy
+    are replaced instead of failing the request; `recycle` replaces connections older than that many
+    seconds (-1 never). `warmup` connections per pool are opened during setup, so that the first
+    requests don't pay for them.
+    """
+
+    pre_ping: bool = True
+    recycle: int = 1800
+    timeout: float = 30.0
+    warmup: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PoolConfig":
+        return cls(
+            pre_ping=settings.database_pool_pre_ping,
+            recycle=settings.database_pool_recycle,
+            timeout=settings.database_pool_timeout,
+            warmup=settings.database_pool_warmup,
+        )
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    An async queue pool that reports, under the pool's logging name, how long each checkout waited and its
+    occupancy. The occupancy gauges are set on every checkout and checkin, rather than read from the pool
+    on scrape, so that they are written to the multiprocess metric files too.
+    """
+
+    def _do_get(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(pool=self.logging_name or "default").observe(time.perf_counter() - started_at)
+            self._report_occupancy()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._report_occupancy()
+
+    def dispose(self) -> None:
+        super().dispose()
+        self._report_occupancy()
+
+    def _report_occupancy(self) -> None:
+        name = self.logging_name or "default"
+        POOL_CHECKED_OUT.labels(pool=name).set(self.checkedout())
+        POOL_OVERFLOW.labels(pool=name).set(max(self.overflow(), 0))
+
+
+def _queue_pool(engine: AsyncEngine) -> QueuePool:
+    return cast(QueuePool, engine.pool)
+
+
+def pool_status(pool: QueuePool) -> dict[str, Any]:
+    """
+    Occupancy of a queue pool. `saturation` is the share of its capacity (size plus overflow) in use;
+    at 1.0 new checkouts wait, and fail after the pool timeout.
+    """
+    checked_out = pool.checkedout()
+    max_overflow = pool._max_overflow  # pyright: ignore[reportPrivateUsage]
+    capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        "saturated": capacity is not None and checked_out >= capacity,
+    }
+
+
+@dataclass
+class SQLiteProfile:
+    """
+    Connection pragmas and pool layout for file-backed SQLite.
+
+    WAL lets readers run alongside the writer, so readonly sessions get their own pool of `query_only`
+    connections while every write goes through a single writer connection. That keeps writers from
+    failing with "database is locked" instead of waiting their turn.
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64_000
+    busy_timeout: int = 5000
+    temp_store: str = "MEMORY"
+    reader_pool_size: int = 4
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SQLiteProfile":
+        return cls(
+            synchronous=settings.sqlite_synchronous,
+            mmap_size=settings.sqlite_mmap_size,
+            cache_size=settings.sqlite_cache_size,
+            busy_timeout=settings.sqlite_busy_timeout,
+            temp_store=settings.sqlite_temp_store,
+            reader_pool_size=settings.sqlite_reader_pool_size,
+        )
+
+    def pragmas(self, readonly: bool = False) -> list[str]:
+        statements = [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA cache_size={int(self.cache_size)}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout)}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+        if readonly:
+            statements.append("PRAGMA query_only=ON")
+        return statements
+
+
+def is_sqlite_file_url(url: str) -> bool:
+    """Whether a URL points at an on-disk SQLite database (in-memory databases can't share a file)."""
+    if not url.startswith("sqlite"):
+        return False
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and "mode=memory" not in url
+
+
+###############################################################################
+# Read replica routing
+###############################################################################
+
+# Set once the current request (task context) has committed a write, so that its later reads see it.
+_primary_pinned: ContextVar[bool] = ContextVar("db_primary_pinned", default=False)
+
+# Replication lag in seconds, per dialect. Dialects without an entry are assumed to have no lag.
+_REPLICA_LAG_QUERIES: dict[str, str] = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+
+def pin_to_primary() -> None:
+    """Route all further reads of the current request (task context) to the primary database."""
+    _ = _primary_pinned.set(True)
+
+
+def unpin_primary() -> None:
+    """Allow readonly sessions of the current context to use replicas again."""
+    _ = _primary_pinned.set(False)
+
+
+def is_pinned_to_primary() -> bool:
+    """Check whether reads of the current context are pinned to the primary database."""
+    return _primary_pinned.get()
+
+
+class ReplicaStrategy(str, Enum):
+    """Load-balancing strategies for readonly sessions."""
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"
+
+
+@dataclass
+class ReplicaNode:
+    """A read replica with its own connection pool and routing state."""
+
+    url: str
+    session_factory: Callable[[], DBSession]
+    engine: AsyncEngine | None = None
+    d1_client: "D1Client | None" = None
+    in_flight: int = 0
+    lag: float | None = None
+    in_rotation: bool = True
+    last_error: str | None = None
 
 
 class DatabaseManager(BasePlugin):
@@ -369,17 +1954,46 @@ class DatabaseManager(BasePlugin):
         self.master_engine: AsyncEngine | None = None
         self.replica_engine: AsyncEngine | None = None
         self.master_session: async_sessionmaker[DBSession] | None = None
+        # Readonly sessions on the primary (see `_readonly_sessionmaker`)
+        self.master_readonly_session: async_sessionmaker[DBSession] | None = None
         self.replica_session: async_sessionmaker[DBSession] | None = None
         self.d1_master_client: D1Client | None = None
         self.d1_replica_client: D1Client | None = None
         self.is_d1_mode: bool = False
         self.is_ready: bool = False
 
+        self.replicas: list[ReplicaNode] = []
+        self.replica_strategy: ReplicaStrategy = ReplicaStrategy.ROUND_ROBIN
+        self.replica_max_lag: float = 0.0
+        self.read_your_writes: bool = True
+        self._replica_cursor: int = 0
+        self._lag_monitor: asyncio.Task[None] | None = None
+
+        self.query_cache: QueryCache | None = None
+        self._query_cache_channel: str = ""
+        self._query_cache_origin: str = uuid.uuid4().hex
+        self._query_cache_redis: RedisClient | None = None
+        self._query_cache_sync: asyncio.Task[None] | None = None
+        self._background_tasks: set[asyncio.Task[Any]] = set()
+
+        self.request_session: bool = False
+        self.io_guard: bool = False
+        self.sql_instrumentation: SQLInstrumentation | None = None
+        self.pool_config: PoolConfig = PoolConfig()
+        self.statement_cache_size: int = 100
+        self.hot_queries: bool = True
+        # Queue-pooled engines by name ("master", "readers", "replica-1", ...), for warm-up and telemetry
+        self.pools: dict[str, AsyncEngine] = {}
+        self.partition_config: PartitionConfig = PartitionConfig()
+        self._partition_monitor: asyncio.Task[None] | None = None
+
     def _is_d1_url(self, url: str) -> bool:
         """Check if URL is a D1 connection string."""
         return url.startswith(("d1+binding://", "d1+aiosqlite://"))
 
-    def _make_engine(self, url: str, pool_size: int, max_overflow: int, echo: bool) -> AsyncEngine:
+    def _make_engine(
+        self, url: str, pool_size: int, max_overflow: int, echo: bool, name: str = "master"
+    ) -> AsyncEngine:
         """Create database engine for traditional databases (SQLite, PostgreSQL)."""
         if self._is_d1_url(url):
             raise DBError("Use _create_d1_client for D1 connections")
@@ -391,29 +2005,155 @@ class DatabaseManager(BasePlugin):
         else:
             engine_kwargs["pool_size"] = pool_size
             engine_kwargs["max_overflow"] = max_overflow
+            engine_kwargs["pool_pre_ping"] = self.pool_config.pre_ping
+            engine_kwargs["pool_recycle"] = self.pool_config.recycle
+            engine_kwargs["pool_timeout"] = self.pool_config.timeout
+            engine_kwargs["pool_logging_name"] = name
+            engine_kwargs["poolclass"] = InstrumentedQueuePool
+            if make_url(url).get_driver_name() == "asyncpg":
+                # asyncpg's own cache serves hot queries (see HotQuery), SQLAlchemy's the ORM statements
+                engine_kwargs["connect_args"] = {
+                    "statement_cache_size": self.statement_cache_size,
+                    "prepared_statement_cache_size": self.statement_cache_size,
+                }
+
+        return self._track_pool(name, create_async_engine(url, **engine_kwargs))
+
+    def _track_pool(self, name: str, engine: AsyncEngine) -> AsyncEngine:
+        """Include a queue-pooled engine in warm-up and health checks (an InstrumentedQueuePool exports its occupancy)."""
+        if isinstance(engine.pool, QueuePool):
+            self.pools[name] = engine
+        return engine
+
+    async def _warm_up_pools(self) -> None:
+        """Open `pool_config.warmup` connections in every pool (at most its size) and return them to it."""
+        for name, engine in self.pools.items():
+            pool = _queue_pool(engine)
+            target = min(self.pool_config.warmup, pool.size()) - pool.checkedin()
+            if target <= 0:
+                continue
+            opened = await asyncio.gather(*(engine.connect().start() for _ in range(target)), return_exceptions=True)
+            connections = [conn for conn in opened if isinstance(conn, AsyncConnection)]
+            for conn in connections:
+                await conn.close()
+            errors = [error for error in opened if isinstance(error, BaseException)]
+            if errors:
+                logger.warning(
+                    "Connection pool warm-up incomplete",
+                    extra={"pool": name, "opened": len(connections), "error": str(errors[0])},
+                )
+            else:
+                logger.info("Connection pool warmed up", extra={"pool": name, "connections": len(connections)})
+
+    def _make_sqlite_engine(self, url: str, profile: SQLiteProfile, echo: bool, readonly: bool) -> AsyncEngine:
+        """
+        Create a SQLite engine that applies the profile's pragmas on every new connection.
+        The writer engine holds exactly one connection, so writes queue for it in the pool.
+        """
+        pool_size = max(1, profile.reader_pool_size) if readonly else 1
+        name = "readers" if readonly else "master"
+        engine = create_async_engine(
+            url,
+            echo=echo,
+            future=True,
+            connect_args={"check_same_thread": False},
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=self.pool_config.timeout,
+            pool_logging_name=name,
+        )
+        pragmas = profile.pragmas(readonly=readonly)
 
-        return create_async_engine(url, **engine_kwargs)
+        def apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+        event.listen(engine.sync_engine, "connect", apply_pragmas)
+        return self._track_pool(name, engine)
 
-    def _create_d1_client(self, url: str) -> D1Client:
+    def _create_d1_client(self, url: str, http_config: D1HttpConfig | None = None) -> D1Client:
         """Create D1 client from connection string."""
         connection_info = parse_d1_url(url)
-        return D1Client(connection_info)
+        return D1Client(connection_info, http_config)
+
+    def _choose_replica(self) -> ReplicaNode | None:
+        """Pick a replica for a readonly session, or None to use the primary."""
+        if not self.replicas or (self.read_your_writes and _primary_pinned.get()):
+            return None
+        candidates = [node for node in self.replicas if node.in_rotation]
+        if not candidates:
+            return None
+
+        start = self._replica_cursor % len(candidates)
+        self._replica_cursor += 1
+        rotated = candidates[start:] + candidates[:start]
+        if self.replica_strategy == ReplicaStrategy.LEAST_CONNECTIONS:
+            return min(rotated, key=lambda node: node.in_flight)
+        return rotated[0]
 
     def get_session_factory(self, readonly: bool = False) -> Callable[[], DBSession]:
         """Get an async session factory function for dependency injection."""
+        if readonly and self.replicas:
+            replica = self._choose_replica()
+            if replica is not None:
+                return replica.session_factory
+            return self._primary_session_factory()
+
         if self.is_d1_mode:
             # For D1, return factory that creates D1Session
             d1_client = self.d1_replica_client if readonly and self.d1_replica_client else self.d1_master_client
             if d1_client is None:
                 raise DBError("D1 database not initialized. Call setup first.")
-            return lambda: D1Session(d1_client)  # type: ignore[return-value]
+            return lambda: D1Session(d1_client, readonly=readonly)  # type: ignore[return-value]
 
         # Traditional database session factory
-        session_factory = self.replica_session if readonly and self.replica_session else self.master_session
+        if readonly:
+            session_factory = self.replica_session or self.master_readonly_session or self.master_session
+        else:
+            session_factory = self.master_session
         if session_factory is None:
             raise DBError("Database not initialized. Call setup first.")
         return session_factory
 
+    def _primary_session_factory(self) -> Callable[[], DBSession]:
+        """Readonly sessions on the primary, for when no replica can serve a read."""
+        if self.is_d1_mode:
+            d1_client = self.d1_master_client
+            if d1_client is None:
+                raise DBError("D1 database not initialized. Call setup first.")
+            return lambda: D1Session(d1_client, readonly=True)  # type: ignore[return-value]
+        session_factory = self.master_readonly_session or self.master_session
+        if session_factory is None:
+            raise DBError("Database not initialized. Call setup first.")
+        return session_factory
+
+    @staticmethod
+    def _readonly_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[DBSession]:
+        """
+        Sessions for readonly blocks. They skip the write bookkeeping (no autoflush, nothing expired on commit),
+        raise a DBError when asked to write, and run READ ONLY transactions on PostgreSQL, which asyncpg opens
+        with a single `BEGIN READ ONLY`.
+        """
+        if engine.dialect.name == "postgresql":
+            engine = engine.execution_options(postgresql_readonly=True)
+        return async_sessionmaker(
+            engine, class_=DBSession, expire_on_commit=False, autoflush=False, info={READ_ONLY_SESSION: True}
+        )
+
+    def _open_session(self, readonly: bool) -> tuple[DBSession, ReplicaNode | None]:
+        """Create a session, returning the replica it was routed to (if any) for in-flight accounting."""
+        if readonly and self.replicas:
+            replica = self._choose_replica()
+            if replica is not None:
+                replica.in_flight += 1
+                return replica.session_factory(), replica
+        return self.create_session(readonly), None
+
     # Enhanced abstraction methods
     def create_session(self, readonly: bool = False) -> DBSession:
         """Create a new database session. Client code should use this instead of direct access."""
@@ -452,12 +2192,26 @@ class DatabaseManager(BasePlugin):
             async with db_manager.get_session() as session:
                 result = await session.exec(select(User))
                 users = result.all()
+
+        Inside a `unit_of_work()`, the session is shared with the enclosing database block, if any.
         """
-        session = self.create_session(readonly)
+        token = _held_sessions.set((*_held_sessions.get(), "session"))
         try:
-            yield session
+            unit = self._active_unit_of_work()
+            if unit is not None:
+                async with unit.session(readonly) as session:
+                    yield session
+                return
+
+            session, replica = self._open_session(readonly)
+            try:
+                yield session
+            finally:
+                if replica is not None:
+                    replica.in_flight -= 1
+                await session.close()
         finally:
-            await session.close()
+            _held_sessions.reset(token)
 
     @asynccontextmanager
     async def get_transaction(self, readonly: bool = False) -> AsyncGenerator[DBSession, None]:
@@ -469,18 +2223,75 @@ class DatabaseManager(BasePlugin):
                 user = User(name="John")
                 session.add(user)
                 # Auto-commits on success, auto-rollbacks on exception
+
+        Once a write transaction commits, later readonly sessions in the same request are
+        served by the primary (when `read_your_writes` is enabled).
+
+        Inside a `unit_of_work()`, the block runs in a savepoint of the write transaction of the outermost
+        block enclosing it, and is committed with it.
         """
-        session = self.create_session(readonly)
+        token = _held_sessions.set((*_held_sessions.get(), "transaction"))
         try:
-            async with session.begin():
+            async with self._begin(readonly) as session:
                 yield session
         except Exception as exp:
             msg = f"Transaction failed: {exp}"
             logger.error(msg)
             raise DBError(msg) from exp
         finally:
+            _held_sessions.reset(token)
+
+    @asynccontextmanager
+    async def _begin(self, readonly: bool) -> AsyncGenerator[DBSession, None]:
+        unit = self._active_unit_of_work()
+        if unit is not None:
+            async with unit.transaction(readonly) as session:
+                yield session
+            return
+
+        session, replica = self._open_session(readonly)
+        try:
+            async with session.begin():
+                yield session
+            if not readonly and self.replicas:
+                pin_to_primary()
+        finally:
+            if replica is not None:
+                replica.in_flight -= 1
             await session.close()
 
+    def check_external_io(self, target: str) -> None:
+        """
+        Report a call to an external service made while the current context holds a database session.
+
+        Only active in debug mode (`io_guard`). The session, and the pooled connection behind it, stays
+        checked out for the whole remote round trip, so fetch remote data first and write it afterwards.
+
+        Args:
+            target: The service being called, for the report
+        """
+        if not self.io_guard:
+            return
+        held = _held_sessions.get()
+        unit = _unit_of_work.get()
+        if unit is not None and unit.db_manager is self:
+            if unit._read is not None:  # pyright: ignore[reportPrivateUsage]
+                held = (*held, "request read session")
+            if unit.in_transaction:
+                held = (*held, "request transaction")
+        if held:
+            logger.warning(
+                "External I/O while holding a database session",
+                extra={"target": target, "held": list(held), "stack": "".join(traceback.format_stack(limit=6)[:-1])},
+            )
+
+    def _active_unit_of_work(self) -> "UnitOfWork | None":
+        """The current request's unit of work, if it belongs to this manager and can serve this task."""
+        unit = _unit_of_work.get()
+        if unit is not None and unit.db_manager is self and unit.available():
+            return unit
+        return None
+
     # -----------------------------
     # Init models
     # -----------------------------
@@ -557,35 +2368,42 @@ class DatabaseManager(BasePlugin):
             return True
 
         try:
+            self.pool_config = PoolConfig.from_settings(settings)
+            self.statement_cache_size = settings.database_statement_cache_size
+            self.hot_queries = settings.database_hot_queries
             # Check if this is a D1 connection
             if self._is_d1_url(settings.database_url):
                 self.is_d1_mode = True
-                self.d1_master_client = self._create_d1_client(settings.database_url)
+                self.d1_master_client = self._create_d1_client(
+                    settings.database_url, D1HttpConfig.from_settings(settings)
+                )
                 logger.info("Master D1 client initialized", extra={"url": settings.database_url})
-
-                # TODO: Support replica D1 database if needed
-                # if replica_url and self._is_d1_url(replica_url):
-                #     self.d1_replica_client = self._create_d1_client(replica_url)
-                #     logger.info("Replica D1 client initialized", extra={"url": replica_url})
-
             else:
                 # Traditional database setup
                 self.is_d1_mode = False
-                self.master_engine = self._make_engine(
-                    settings.database_url,
-                    settings.database_pool_size,
-                    settings.database_max_overflow,
-                    settings.database_echo,
-                )
+                if settings.sqlite_profile and self._can_use_sqlite_profile(settings):
+                    self._setup_sqlite_profile(settings)
+                else:
+                    self.master_engine = self._make_engine(
+                        settings.database_url,
+                        settings.database_pool_size,
+                        settings.database_max_overflow,
+                        settings.database_echo,
+                    )
                 self.master_session = async_sessionmaker(self.master_engine, class_=DBSession)
+                self.master_readonly_session = self._readonly_sessionmaker(cast(AsyncEngine, self.master_engine))
                 logger.info("Master DB engine initialized", extra={"url": settings.database_url})
 
-                # TODO : Note: replica_url is not in current Settings, but could be added later
-                # if replica_url:
-                #     self.replica_engine = self._make_engine(replica_url, pool_size, max_overflow, echo)
-                #     self.replica_session = async_sessionmaker(self.replica_engine, class_=DBSession)
-                #     logger.info("Replica DB engine initialized", extra={"url": replica_url})
-
+            self._setup_replicas(settings)
+            self.request_session = settings.database_request_session
+            self.io_guard = settings.is_debug
+            if settings.database_sql_metrics:
+                self._setup_sql_instrumentation(settings)
+            if settings.query_cache_enabled:
+                self._setup_query_cache(settings)
+            await self._warm_up_pools()
+            self.partition_config = PartitionConfig.from_settings(settings)
+            self._start_partition_maintenance()
             self.is_ready = True
             return True
         except Exception as exp:
@@ -594,9 +2412,319 @@ class DatabaseManager(BasePlugin):
             logger.error(msg)
             return False
 
+    def _can_use_sqlite_profile(self, settings: Settings) -> bool:
+        url = settings.database_url or ""
+        if not is_sqlite_file_url(url):
+            if url.startswith("sqlite"):
+                logger.info("SQLite profile skipped: it needs an on-disk database", extra={"url": url})
+            return False
+        if settings.database_replica_urls:
+            logger.warning("SQLite profile skipped: read replicas are configured")
+            return False
+        return True
+
+    def _setup_sqlite_profile(self, settings: Settings) -> None:
+        """Create the single-connection writer engine and the pool of readonly connections."""
+        url = cast(str, settings.database_url)
+        profile = SQLiteProfile.from_settings(settings)
+        self.master_engine = self._make_sqlite_engine(url, profile, settings.database_echo, readonly=False)
+        self.replica_engine = self._make_sqlite_engine(url, profile, settings.database_echo, readonly=True)
+        self.replica_session = self._readonly_sessionmaker(self.replica_engine)
+        logger.info(
+            "SQLite profile enabled",
+            extra={"journal_mode": profile.journal_mode, "readers": max(1, profile.reader_pool_size)},
+        )
+
+    def _setup_replicas(self, settings: Settings) -> None:
+        """Create one pool (or D1 client) per configured read replica."""
+        self.replica_strategy = ReplicaStrategy(settings.database_replica_strategy)
+        self.replica_max_lag = settings.database_replica_max_lag
+        self.read_your_writes = settings.database_read_your_writes
+
+        for index, url in enumerate(settings.database_replica_urls, start=1):
+            if self._is_d1_url(url) != self.is_d1_mode:
+                raise DBError("Replica URLs must use the same kind of database as database_url")
+            if self.is_d1_mode:
+                d1_client = self._create_d1_client(url, D1HttpConfig.from_settings(settings))
+                node = ReplicaNode(
+                    url=url,
+                    session_factory=lambda client=d1_client: D1Session(client, readonly=True),  # type: ignore[misc,arg-type]
+                    d1_client=d1_client,
+                )
+                logger.info("Replica D1 client initialized", extra={"url": url})
+            else:
+                engine = self._make_engine(
+                    url,
+                    settings.database_pool_size,
+                    settings.database_max_overflow,
+                    settings.database_echo,
+                    name=f"replica-{index}",
+                )
+                node = ReplicaNode(url=url, session_factory=self._readonly_sessionmaker(engine), engine=engine)
+                logger.info("Replica DB engine initialized", extra={"url": url})
+            self.replicas.append(node)
+
+        if self.replicas:
+            # Keep the single-replica attributes pointing at the first replica for existing callers.
+            first = self.replicas[0]
+            self.replica_engine = first.engine
+            if first.engine is not None:
+                self.replica_session = cast(async_sessionmaker[DBSession], first.session_factory)
+            self.d1_replica_client = first.d1_client
+            if settings.database_replica_lag_check_interval > 0:
+                self._lag_monitor = asyncio.get_running_loop().create_task(
+                    self._monitor_replica_lag(settings.database_replica_lag_check_interval)
+                )
+
+    def _setup_sql_instrumentation(self, settings: Settings) -> None:
+        """Time the statements of every engine (or D1 client) this manager created."""
+        instrumentation = self.sql_instrumentation = SQLInstrumentation.from_settings(settings)
+        engines = {self.master_engine, self.replica_engine, *(node.engine for node in self.replicas)}
+        for engine in engines - {None}:
+            instrumentation.instrument(cast(AsyncEngine, engine))
+        clients = {self.d1_master_client, *(node.d1_client for node in self.replicas)}
+        for client in clients - {None}:
+            cast(D1Client, client).on_statement = instrumentation.record
+
+    def _setup_query_cache(self, settings: Settings) -> None:
+        """Create the query result cache and invalidate it on every write to the primary."""
+        self.query_cache = QueryCache.from_settings(settings)
+        self._query_cache_channel = settings.query_cache_channel
+        if self.d1_master_client is not None:
+            self.d1_master_client.on_write = self.invalidate_query_cache
+        elif self.master_engine is not None:
+            self._track_query_cache_writes(self.master_engine)
+        logger.info(
+            "Query result cache enabled",
+            extra={"max_entries": settings.query_cache_max_entries, "ttl": settings.query_cache_ttl},
+        )
+
+    def _track_query_cache_writes(self, engine: AsyncEngine) -> None:
+        """
+        Collect the tables each connection writes, and invalidate them when its transaction ends.
+
+        The commit event fires just before the database commits, so entries are dropped then and once more
+        when the connection goes back to the pool; a read that ran in between can't outlive the commit.
+        """
+        sync_engine = engine.sync_engine
+
+        def record_write(conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+            table = written_table(statement)
+            if table is not None:
+                conn.info.setdefault(_WRITTEN_TABLES, set()).add(table)
+
+        def end_transaction(conn: Any) -> None:
+            tables = conn.info.pop(_WRITTEN_TABLES, None)
+            if tables:
+                self.invalidate_query_cache(tables, publish=False)
+                conn.info.setdefault(_ENDED_WRITES, set()).update(tables)
+
+        def checkin(_dbapi_connection: Any, connection_record: Any) -> None:
+            if connection_record is None:
+                return
+            info = connection_record.info
+            tables = info.pop(_ENDED_WRITES, set()) | info.pop(_WRITTEN_TABLES, set())
+            if tables:
+                self.invalidate_query_cache(tables)
+
+        event.listen(sync_engine, "after_cursor_execute", record_write)
+        event.listen(sync_engine, "commit", end_transaction)
+        event.listen(sync_engine, "rollback", end_transaction)
+        event.listen(sync_engine.pool, "checkin", checkin)
+
+    def invalidate_query_cache(self, tables: Iterable[str], publish: bool = True) -> None:
+        """
+        Drop cached reads of these tables, and tell the other workers to do the same.
+
+        Args:
+            tables: Names of the tables that were written
+            publish: Also publish the invalidation on Redis, once `start_query_cache_sync` has run
+        """
+        if self.query_cache is None:
+            return
+        names = sorted({table.lower() for table in tables})
+        _ = self.query_cache.invalidate(names)
+        if publish and self._query_cache_redis is not None:
+            message = json.dumps({"origin": self._query_cache_origin, "tables": names})
+            self._spawn(self._query_cache_redis.publish(self._query_cache_channel, message))
+
+    def start_query_cache_sync(self, redis_client: RedisClient) -> None:
+        """
+        Share query cache invalidations with the other workers over Redis pub/sub.
+
+        Call it once Redis is ready. Invalidations made here are published on `query_cache_channel`, and
+        those published by other workers drop the matching entries here.
+
+        Args:
+            redis_client: Client used to publish and subscribe
+        """
+        if self.query_cache is None or self._query_cache_sync is not None:
+            return
+        self._query_cache_redis = redis_client
+        self._query_cache_sync = asyncio.get_running_loop().create_task(
+            self._listen_query_cache_invalidations(redis_client)
+        )
+
+    async def _listen_query_cache_invalidations(self, redis_client: RedisClient) -> None:
+        while True:
+            try:
+                pubsub = await redis_client.subscribe(self._query_cache_channel)
+                async for message in pubsub.listen():  # pyright: ignore[reportUnknownVariableType]
+                    message_dict = cast(dict[str, Any], message)
+                    if message_dict.get("type") != "message" or self.query_cache is None:
+                        continue
+                    payload = json.loads(message_dict["data"])
+                    if payload.get("origin") != self._query_cache_origin:
+                        _ = self.query_cache.invalidate(payload.get("tables", []), source="remote")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exp:
+                logger.warning(f"Query cache invalidation listener failed, resubscribing: {exp}")
+            # Entries may have missed invalidations while unsubscribed
+            if self.query_cache is not None:
+                self.query_cache.clear()
+            await asyncio.sleep(1.0)
+
+    def _spawn(self, coroutine: Coroutine[Any, Any, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background_tasks.add(task)
+
+        def done(finished: asyncio.Task[Any]) -> None:
+            self._background_tasks.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.warning(f"Query cache invalidation was not published: {finished.exception()}")
+
+        task.add_done_callback(done)
+
+    async def _teardown_query_cache(self) -> None:
+        if self._query_cache_sync is not None:
+            _ = self._query_cache_sync.cancel()
+            _ = await asyncio.gather(self._query_cache_sync, return_exceptions=True)
+            self._query_cache_sync = None
+        if self._background_tasks:
+            _ = await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._query_cache_redis = None
+        self.query_cache = None
+
+    async def _measure_replica_lag(self, node: ReplicaNode) -> float:
+        """Return the replication lag of a replica in seconds."""
+        if node.d1_client is not None:
+            _ = await node.d1_client.execute_query("SELECT 1 as result")
+            return 0.0
+        if node.engine is None:
+            return 0.0
+        query = _REPLICA_LAG_QUERIES.get(node.engine.dialect.name, "SELECT 0")
+        async with node.engine.connect() as conn:
+            result = await conn.execute(text(query))
+            return float(result.scalar() or 0)
+
+    async def refresh_replica_status(self) -> None:
+        """
+        Measure the lag of every replica and update the rotation.
+        A replica that cannot be reached, or lags more than `replica_max_lag` seconds, stops receiving reads
+        until a later check finds it healthy again.
+        """
+        for node in self.replicas:
+            try:
+                node.lag = await self._measure_replica_lag(node)
+                node.last_error = None
+                in_rotation = not self.replica_max_lag or node.lag <= self.replica_max_lag
+            except Exception as exp:
+                node.lag = None
+                node.last_error = str(exp)
+                in_rotation = False
+
+            if in_rotation != node.in_rotation:
+                state = "back in" if in_rotation else "removed from"
+                logger.warning(f"Replica {state} rotation", extra={"url": node.url, "lag": node.lag})
+            node.in_rotation = in_rotation
+
+    async def _monitor_replica_lag(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_replica_status()
+            except Exception as exp:
+                logger.error(f"Replica lag check failed: {exp}")
+
+    def _start_partition_maintenance(self) -> None:
+        engine = self.master_engine
+        config = self.partition_config
+        if engine is None or engine.dialect.name != "postgresql" or not config.tables or config.interval <= 0:
+            return
+        self._partition_monitor = asyncio.get_running_loop().create_task(self._monitor_partitions(config.interval))
+
+    async def maintain_partitions(self, today: date | None = None) -> dict[str, dict[str, list[str]]]:
+        """
+        Run the partition maintenance job once, for each of `database_partitioned_tables`.
+
+        Creates the partitions of the coming months, and archives and drops those past retention (see
+        `MonthlyPartitions.maintain`). Only PostgreSQL tables partitioned by the migration are changed.
+        Workers running it at the same time are serialized by an advisory lock: the ones that don't get it
+        skip the run.
+
+        Args:
+            today: The date partitions are planned from (defaults to today)
+
+        Returns:
+            What was done, by table (empty if nothing could be done)
+        """
+        engine = self.master_engine
+        if engine is None or engine.dialect.name != "postgresql" or not self.partition_config.tables:
+            return {}
+        today = today or date.today()
+        results: dict[str, dict[str, list[str]]] = {}
+        async with engine.connect() as conn:
+            locked = (await conn.execute(text(_PARTITION_LOCK_QUERY.format("try_advisory_lock")))).scalar()
+            await conn.commit()
+            if not locked:
+                return results
+            try:
+                for table in self.partition_config.tables:
+                    results[table] = await MonthlyPartitions(table, self.partition_config).maintain(conn, today)
+                    logger.info("Partitions maintained", extra={"table": table, **results[table]})
+            finally:
+                await conn.rollback()
+                _ = await conn.execute(text(_PARTITION_LOCK_QUERY.format("advisory_unlock")))
+                await conn.commit()
+        return results
+
+    async def _monitor_partitions(self, interval: float) -> None:
+        while True:
+            try:
+                _ = await self.maintain_partitions()
+            except Exception as exp:
+                logger.error(f"Partition maintenance failed: {exp}")
+            await asyncio.sleep(interval)
+
+    async def _teardown_replicas(self) -> None:
+        if self._lag_monitor is not None:
+            _ = self._lag_monitor.cancel()
+            _ = await asyncio.gather(self._lag_monitor, return_exceptions=True)
+            self._lag_monitor = None
+
+        for node in self.replicas:
+            if node.engine is not None:
+                await node.engine.dispose()
+                logger.info("Replica DB engine disposed", extra={"url": node.url})
+            if node.d1_client is not None:
+                await node.d1_client.close()
+                logger.info("Replica D1 client closed", extra={"url": node.url})
+        if self.replicas:
+            self.replica_engine = None
+            self.replica_session = None
+            self.d1_replica_client = None
+        self.replicas = []
+
     async def teardown(self) -> bool:
         """Dispose database engines to cleanup connections."""
         try:
+            if self._partition_monitor is not None:
+                _ = self._partition_monitor.cancel()
+                _ = await asyncio.gather(self._partition_monitor, return_exceptions=True)
+                self._partition_monitor = None
+            await self._teardown_query_cache()
+            await self._teardown_replicas()
             if self.is_d1_mode:
                 # Close D1 clients
                 if self.d1_master_client:
@@ -614,12 +2742,14 @@ class DatabaseManager(BasePlugin):
                     logger.info("Master DB engine disposed")
                     self.master_engine = None
                     self.master_session = None
+                    self.master_readonly_session = None
                 if self.replica_engine:
                     await self.replica_engine.dispose()
                     logger.info("Replica DB engine disposed")
                     self.replica_engine = None
                     self.replica_session = None
 
+            self.pools = {}
             self.is_d1_mode = False
             self.is_ready = False
             return True
@@ -702,11 +2832,31 @@ class DatabaseManager(BasePlugin):
 
         results: dict[str, Any] = {"is_ready": self.is_ready}
 
+        if self.pools:
+            # Before the connectivity probes, which check out connections of their own
+            results["pools"] = {name: pool_status(_queue_pool(engine)) for name, engine in self.pools.items()}
+
         if self.is_d1_mode:
             await self._check_d1_health(results)
         else:
             await self._check_traditional_db_health(results)
 
+        if self.query_cache is not None:
+            results["query_cache"] = self.query_cache.stats()
+
+        if self.replicas:
+            await self.refresh_replica_status()
+            results["replicas"] = [
+                {
+                    "url": re.sub(r"://([^:/]+):([^@]+)@", r"://\1:***@", node.url),
+                    "in_rotation": node.in_rotation,
+                    "lag": node.lag,
+                    "in_flight": node.in_flight,
+                    "error": node.last_error,
+                }
+                for node in self.replicas
+            ]
+
         return results
 
 
@@ -744,6 +2894,436 @@ def generate_ddl(url: str = "sqlite:///:memory:") -> str:
     return ";\n\n".join(ddl_statements) + ";"
 
 
+################################################################################
+# Request Batching
+################################################################################
+
+LoaderKey = TypeVar("LoaderKey", bound=Hashable)
+LoaderValue = TypeVar("LoaderValue")
+
+BatchFunction = Callable[[list[LoaderKey]], Awaitable[Mapping[LoaderKey, LoaderValue]]]
+
+# Loaders shared by everything that runs inside one `batch_loader_scope()`, usually one HTTP request.
+_batch_loaders: ContextVar[dict[Hashable, "BatchLoader[Any, Any]"] | None] = ContextVar("batch_loaders", default=None)
+
+
+class BatchLoader(Generic[LoaderKey, LoaderValue]):
+    """
+    Coalesce the lookups made during one event-loop tick into a single call of a batch function.
+
+    Every `load()` issued before the loop runs its next round of callbacks joins the same batch, so
+    `asyncio.gather` over many lookups (or a middleware and an endpoint asking for the same user) costs one
+    `IN (...)` query. With `cache=True` results are memoized until `clear()`; otherwise keys are only shared
+    while their batch is in flight. Keys missing from the batch result resolve to `default`.
+
+    Example:
+        >>> loader = BatchLoader(load_roles_by_user, default=[])
+        >>> roles_a, roles_b = await asyncio.gather(loader.load("a"), loader.load("b"))  # one query
+    """
+
+    def __init__(
+        self, batch_fn: BatchFunction[LoaderKey, LoaderValue], default: LoaderValue, cache: bool = True
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.default = default
+        self.cache = cache
+        self.loop = asyncio.get_running_loop()
+        self._futures: dict[LoaderKey, asyncio.Future[LoaderValue]] = {}
+        self._pending: list[tuple[LoaderKey, asyncio.Future[LoaderValue]]] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self, key: LoaderKey) -> LoaderValue:
+        """Get the value for `key`, batched with the other keys requested in this tick."""
+        future = self._futures.get(key)
+        if future is None:
+            future = self.loop.create_future()
+            self._futures[key] = future
+            if not self._pending:
+                _ = self.loop.call_soon(self._dispatch)
+            self._pending.append((key, future))
+        # Shield the shared future so one cancelled caller does not fail every other caller of the key
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[LoaderKey]) -> list[LoaderValue]:
+        """Get the values for several keys, in order, within one batch."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, *keys: LoaderKey) -> None:
+        """Forget memoized values for these keys, or for every key when none are given."""
+        if not keys:
+            self._futures = {}
+        for key in keys:
+            _ = self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, []
+        task = self.loop.create_task(self._resolve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: list[tuple[LoaderKey, "asyncio.Future[LoaderValue]"]]) -> None:
+        try:
+            values = await self.batch_fn([key for key, _ in batch])
+        except BaseException as e:
+            # Failures are never memoized: the next load of these keys queries again
+            for key, future in batch:
+                self._forget(key, future)
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key, future in batch:
+            if not self.cache:
+                self._forget(key, future)
+            if not future.done():
+                future.set_result(values.get(key, self.default))
+
+    def _forget(self, key: LoaderKey, future: "asyncio.Future[LoaderValue]") -> None:
+        # Leave a newer load of the same key, started after a clear(), in place
+        if self._futures.get(key) is future:
+            del self._futures[key]
+
+
+@contextlib.contextmanager
+def batch_loader_scope() -> Iterator[None]:
+    """
+    Share memoizing batch loaders between everything running inside this block, typically one request.
+
+    Outside a scope, repositories still batch concurrent lookups but keep nothing once a batch resolves.
+
+    Example:
+        >>> with batch_loader_scope():
+        ...     user = await repo.get_user_by_auth_id_simple("user123")  # queried
+        ...     user = await repo.get_user_by_auth_id_simple("user123")  # memoized
+    """
+    token = _batch_loaders.set({})
+    try:
+        yield
+    finally:
+        _batch_loaders.reset(token)
+
+
+class BatchLoaderMiddleware:
+    """ASGI middleware that opens a `batch_loader_scope()` for each HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with batch_loader_scope():
+            await self.app(scope, receive, send)
+
+
+################################################################################
+# Request Unit of Work
+################################################################################
+
+REQUEST_CONNECTION_CHECKOUTS = Histogram(
+    "db_request_connection_checkouts",
+    "Database connections checked out from the pool per HTTP request",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32),
+)
+
+_unit_of_work: ContextVar["UnitOfWork | None"] = ContextVar("db_unit_of_work", default=None)
+
+# Session.info key marking a unit of work's write session, whose reads may see writes not committed yet
+_UNCOMMITTED_WRITES = "unit_of_work_uncommitted"
+
+
+# Listens on every pool: a checkout counts against whichever unit of work is active in the current context
+@event.listens_for(Pool, "checkout")
+def _count_checkout(*_args: Any) -> None:
+    unit = _unit_of_work.get()
+    if unit is not None:
+        unit.checkouts += 1
+
+
+class UnitOfWork:
+    """
+    The database sessions of one request: a read session and a write transaction, each opened on first use.
+
+    While it is active, `DatabaseManager.get_session()` and `get_transaction()` hand out these two sessions
+    instead of opening one per call, for as long as the outermost block that opened them runs: the session
+    and transaction blocks nested inside it (a repository call inside a service-level transaction, say) reuse
+    them, and every nested write block runs in a savepoint. When the outermost block exits, the write
+    transaction commits (or rolls back if the block raised) and both sessions go back to the pool, so no
+    connection is held between blocks, across remote calls, or until the response starts. Once something
+    has been written, reads inside the block go to the write session too, so they see it.
+
+    A block entered from another task while the sessions are in use (a batch loader, a fire-and-forget task)
+    gets its own session as before, since a session can't be used concurrently. So does every block once the
+    unit of work has completed, and every block in D1 mode, which has no interactive transactions.
+
+    Connections checked out of the pool while it is active are counted in `checkouts`, shared or not, and
+    with SQL instrumentation enabled the statements run in `queries`, `query_seconds` and `statement_counts`.
+    """
+
+    def __init__(self, db_manager: "DatabaseManager", shared: bool = True) -> None:
+        self.db_manager = db_manager
+        self.shared = shared and not db_manager.is_d1_mode
+        self.checkouts = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statement_counts: dict[str, int] = {}
+        self.completed = False
+        self._read: DBSession | None = None
+        self._read_replica: ReplicaNode | None = None
+        self._write: DBSession | None = None
+        self._owner: asyncio.Task[Any] | None = None
+        self._depth = 0
+        self._commit_on_release = True
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the write transaction of the current outermost block is open."""
+        return self._write is not None
+
+    def available(self) -> bool:
+        """Whether blocks of the current task can use the shared sessions right now."""
+        if not self.shared or self.completed:
+            return False
+        return self._owner is None or self._owner is asyncio.current_task()
+
+    @asynccontextmanager
+    async def session(self, readonly: bool = False) -> AsyncGenerator[DBSession, None]:
+        """Use the read session, or the write session once one is open (or for a non-readonly block)."""
+        self._claim()
+        try:
+            session = await self._session_for(readonly)
+            yield session
+        except BaseException:
+            await self._release(commit=False)
+            raise
+        await self._release(commit=True)
+
+    @asynccontextmanager
+    async def transaction(self, readonly: bool = False) -> AsyncGenerator[DBSession, None]:
+        """Run the block in a savepoint of the write transaction; a readonly block just uses `session()`."""
+        self._claim()
+        try:
+            session = await self._session_for(readonly)
+            if readonly:
+                yield session
+            else:
+                async with session.begin_nested():
+                    yield session
+        except BaseException:
+            await self._release(commit=False)
+            raise
+        await self._release(commit=True)
+
+    async def complete(self, commit: bool = True) -> None:
+        """
+        Stop sharing sessions: blocks entered afterwards get their own.
+
+        If a block is still running (a streamed response, another task), its sessions are closed when it
+        leaves, and its write transaction only commits if `commit` is set.
+
+        Raises:
+            DBError: If the commit fails
+        """
+        if self.completed:
+            return
+        self.completed = True
+        if self._depth:
+            self._commit_on_release = commit
+            return
+        await self._finish(commit)
+
+    def _claim(self) -> None:
+        self._owner = asyncio.current_task()
+        self._depth += 1
+
+    async def _release(self, commit: bool) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            await self._finish(commit and self._commit_on_release)
+
+    async def _session_for(self, readonly: bool) -> DBSession:
+        if self._write is None and not readonly:
+            write = self.db_manager.create_session(readonly=False)
+            write.sync_session.expire_on_commit = False
+            write.info[_UNCOMMITTED_WRITES] = True
+            self._write = write
+            connection = await write.connection()
+            if connection.dialect.name == "sqlite":
+                # pysqlite defers BEGIN to the first DML, and releasing a savepoint opened outside a
+                # transaction commits it: begin explicitly so that savepoints nest inside this transaction
+                _ = await connection.exec_driver_sql("BEGIN")
+        if self._write is not None:
+            return self._write
+        if self._read is None:
+            opened = self.db_manager._open_session(readonly=True)  # pyright: ignore[reportPrivateUsage]
+            self._read, self._read_replica = opened
+        return self._read
+
+    async def _finish(self, commit: bool) -> None:
+        write, self._write = self._write, None
+        try:
+            if write is not None:
+                try:
+                    if commit and write.in_transaction():
+                        await write.commit()
+                        if self.db_manager.replicas:
+                            pin_to_primary()
+                except Exception as exp:
+                    msg = f"Transaction failed: {exp}"
+                    logger.error(msg)
+                    raise DBError(msg) from exp
+                finally:
+                    await write.close()
+        finally:
+            await self._close_read()
+
+    async def _close_read(self) -> None:
+        read, self._read = self._read, None
+        replica, self._read_replica = self._read_replica, None
+        if replica is not None:
+            replica.in_flight -= 1
+        if read is not None:
+            await read.close()
+
+
+@asynccontextmanager
+async def unit_of_work(
+    db_manager: DatabaseManager | None = None, shared: bool = True
+) -> AsyncGenerator[UnitOfWork, None]:
+    """
+    Run the block as one unit of work: the session and transaction blocks nested inside each outermost
+    database block share one read session and one write transaction, committed when that outermost block
+    exits normally and rolled back if it raises.
+
+    Args:
+        db_manager: The database manager whose sessions are shared (defaults to the singleton)
+        shared: Only count connection checkouts, leaving every call its own session
+
+    Example:
+        >>> async with unit_of_work() as unit:
+        ...     user = await repo.get_user_by_auth_id("user123")
+        ...     await repo.log_event(...)
+        ...     unit.checkouts
+        2
+    """
+    unit = UnitOfWork(db_manager or DatabaseManager.get_instance(), shared)
+    token = _unit_of_work.set(unit)
+    try:
+        yield unit
+    except BaseException:
+        await unit.complete(commit=False)
+        raise
+    else:
+        await unit.complete()
+    finally:
+        _unit_of_work.reset(token)
+
+
+class UnitOfWorkMiddleware:
+    """
+    ASGI middleware that runs each HTTP request in a `unit_of_work()`.
+
+    Writes commit when their outermost block exits, before the response starts, so a failed commit still turns
+    into an error response. Sharing stops once the response starts; a block still open then (a streamed
+    response) rolls back instead if the response is a server error (5xx).
+
+    The request's connection checkouts are recorded in `db_request_connection_checkouts` and, with SQL
+    instrumentation enabled, its query count and time spent are exported and kept under its correlation ID.
+    """
+
+    def __init__(self, app: ASGIApp, db_manager: DatabaseManager | None = None) -> None:
+        self.app = app
+        self.db_manager = db_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        db_manager = self.db_manager or DatabaseManager.get_instance()
+        if scope["type"] != "http" or not db_manager.is_ready:
+            await self.app(scope, receive, send)
+            return
+
+        async with unit_of_work(db_manager, shared=db_manager.request_session) as unit:
+
+            async def send_after_commit(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    await unit.complete(commit=message["status"] < 500)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_after_commit)
+            finally:
+                REQUEST_CONNECTION_CHECKOUTS.observe(unit.checkouts)
+                # The route template once routing has run, so that requests to one endpoint group together
+                path = str(getattr(scope.get("route"), "path", scope.get("path", "")))
+                usage: dict[str, Any] = {"path": path, "checkouts": unit.checkouts}
+                if db_manager.sql_instrumentation is not None:
+                    usage = db_manager.sql_instrumentation.finish_request(unit, scope.get("method", ""), path)
+                logger.debug("Request database usage", extra=usage)
+
+
+################################################################################
+# External I/O Guard
+################################################################################
+
+# The session and transaction blocks the current context is inside, outermost first
+_held_sessions: ContextVar[tuple[str, ...]] = ContextVar("db_held_sessions", default=())
+
+
+def guard_external_io(target: str) -> None:
+    """
+    Call right before a request to an external service (Supabase, a JWKS endpoint...).
+
+    In debug mode, a warning is logged if the caller is inside a database session or transaction,
+    which would stay open for the whole remote round trip.
+
+    Example:
+        >>> guard_external_io("supabase")
+        >>> response = client.auth.admin.get_user_by_id(user_id)
+    """
+    DatabaseManager.get_instance().check_external_io(target)
+
+
+################################################################################
+# Hot Queries
+################################################################################
+
+
+class HotQuery:
+    """
+    A read on the request hot path that can skip the ORM.
+
+    On PostgreSQL with asyncpg, the statement is compiled once and run directly on the session's asyncpg
+    connection, so no entities are built and nothing goes through the identity map or SQLAlchemy's result
+    processing. asyncpg prepares it once per connection and keeps it in its statement cache
+    (`database_statement_cache_size`). Bound values are passed to asyncpg as they are, so they must be
+    plain values it can encode.
+
+    Example:
+        >>> ROLES = HotQuery(select(UserRole.role).where(UserRole.user_auth_id == bindparam("user_id")))
+        >>> rows = await repo.fetch_hot(session, ROLES, user_id="user123")
+        >>> if rows is None:  # not PostgreSQL: run the ORM query instead
+        ...     rows = (await session.exec(select(UserRole.role).where(...))).all()
+    """
+
+    def __init__(self, statement: SASelect[Any]) -> None:
+        self.statement = statement
+        # Per dialect: the SQL, bind names in positional order, and default values of the bound literals
+        self._compiled: dict[str, tuple[str, tuple[str, ...], dict[str, Any]]] = {}
+
+    def bind(self, dialect: Any, values: Mapping[str, Any]) -> tuple[str, list[Any]]:
+        """The SQL for this dialect and its positional arguments for `values`."""
+        compiled = self._compiled.get(dialect.name)
+        if compiled is None:
+            sql_compiler = self.statement.compile(dialect=dialect)
+            compiled = (sql_compiler.string, tuple(sql_compiler.positiontup or ()), dict(sql_compiler.params))
+            self._compiled[dialect.name] = compiled
+        sql, names, defaults = compiled
+        return sql, [values[name] if name in values else defaults[name] for name in names]
+
+
 ################################################################################
 # Base Repository Class
 ################################################################################
@@ -762,6 +3342,7 @@ class BaseRepository(ABC):
         """
         self.db_manager = db_manager or DatabaseManager.get_instance()
         self._session_factory: Callable[[], DBSession] | None = None
+        self._loaders: dict[str, BatchLoader[Any, Any]] = {}
 
     # Session Management (Abstraction Layer)
     @property
@@ -818,6 +3399,122 @@ class BaseRepository(ABC):
                 await session.flush()
             return entities
 
+    async def bulk_upsert(
+        self,
+        model: type[SQLModel],
+        rows: Sequence[Mapping[str, Any]],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        session: DBSession | D1Session | None = None,
+    ) -> int:
+        """
+        Insert rows, updating `update_cols` on the rows that already exist, without reading them first.
+
+        PostgreSQL and SQLite get one `INSERT ... ON CONFLICT (conflict_cols) DO UPDATE` executed for all
+        rows. On D1 the rows are grouped into multi-row upserts under its bound parameter limit and sent
+        as one batch, which D1 runs as a single transaction.
+
+        Args:
+            model: SQLModel table class to upsert into
+            rows: Column values keyed by model attribute name; every row must have the same keys
+            conflict_cols: Attributes of the unique constraint that identifies an existing row
+            update_cols: Attributes to overwrite on conflict (empty to leave existing rows untouched)
+            session: Optional session to use, if None will create a new transaction
+
+        Returns:
+            Number of rows upserted, after dropping rows with a duplicate conflict key (the last one wins)
+
+        Raises:
+            ValueError: If conflict_cols is empty or rows name unknown or inconsistent attributes
+            DBError: If the database doesn't support upserts or the operation fails
+
+        Example:
+            >>> rows = [{"category": "prefs", "key": 1, "value": "on", "in_used": 1}]
+            >>> await repo.bulk_upsert(SysDict, rows, ["category", "key"], ["value", "in_used"])
+        """
+        if not conflict_cols:
+            raise ValueError("Conflict columns cannot be empty")
+        if not rows:
+            return 0
+        values = self._upsert_values(model, rows, conflict_cols, update_cols)
+        if session is None:
+            async with self.transaction() as new_session:
+                return await self._execute_upsert(model, values, conflict_cols, update_cols, new_session)
+        return await self._execute_upsert(model, values, conflict_cols, update_cols, session)
+
+    async def _execute_upsert(
+        self,
+        model: type[SQLModel],
+        values: list[dict[str, Any]],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        session: DBSession | D1Session,
+    ) -> int:
+        try:
+            if isinstance(session, D1Session):
+                statement = self._upsert_statement(model, conflict_cols, update_cols, "sqlite")
+                cache_key = ("bulk_upsert", self.table_name(model), tuple(conflict_cols), tuple(update_cols))
+                statements = session.d1_client.statement_cache.compile_many(statement, values, cache_key)
+                # Keep pending inserts staged on the session ahead of the upserts
+                await session.flush()
+                if len(statements) == 1:
+                    _ = await session.d1_client.execute_query(*statements[0])
+                else:
+                    _ = await session.d1_client.execute_batch(statements)
+            else:
+                statement = self._upsert_statement(model, conflict_cols, update_cols, session.get_bind().dialect.name)
+                _ = await session.exec(statement, params=values)
+            return len(values)
+        except DBError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to bulk upsert into {self.table_name(model)}: {e}")
+            raise DBError(f"Failed to bulk upsert into {self.table_name(model)}: {e}") from e
+
+    @staticmethod
+    def _upsert_values(
+        model: type[SQLModel],
+        rows: Sequence[Mapping[str, Any]],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        """Validate `bulk_upsert` rows and key them by column, keeping the last row per conflict key."""
+        mapper: Mapper[Any] = sa_inspect(model)
+        attributes = list(rows[0])
+        unknown = [name for name in (*attributes, *conflict_cols, *update_cols) if name not in mapper.columns]
+        if unknown:
+            raise ValueError(f"{model.__name__} has no column attributes {unknown}")
+        if not set(conflict_cols) <= set(attributes) or not set(update_cols) <= set(attributes):
+            raise ValueError("Conflict and update columns must be present in every row")
+
+        # A single statement can't update the same row twice (PostgreSQL rejects it), so keep the last row per key
+        unique_rows: dict[tuple[Any, ...], Mapping[str, Any]] = {}
+        for row in rows:
+            if row.keys() != rows[0].keys():
+                raise ValueError("All rows must have the same keys")
+            unique_rows[tuple(row[name] for name in conflict_cols)] = row
+        return [{mapper.columns[name].key: row[name] for name in attributes} for row in unique_rows.values()]
+
+    @staticmethod
+    def _upsert_statement(
+        model: type[SQLModel], conflict_cols: Sequence[str], update_cols: Sequence[str], dialect_name: str
+    ) -> Any:
+        """Build the `INSERT ... ON CONFLICT` statement for `bulk_upsert`, executed with the rows as parameters."""
+        if dialect_name == "postgresql":
+            insert = postgresql.insert
+        elif dialect_name == "sqlite":
+            insert = sqlite.insert  # type: ignore[assignment]
+        else:
+            raise DBError(f"Bulk upsert is not supported for {dialect_name} databases")
+
+        mapper: Mapper[Any] = sa_inspect(model)
+        statement = insert(cast(Table, mapper.local_table))
+        index_elements = [mapper.columns[name] for name in conflict_cols]
+        if not update_cols:
+            return statement.on_conflict_do_nothing(index_elements=index_elements)
+        set_ = {mapper.columns[name]: statement.excluded[mapper.columns[name].key] for name in update_cols}
+        return statement.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
     async def update(self, entity: object, commit: bool = True) -> object:
         """
         Update an existing entity.
@@ -899,15 +3596,75 @@ class BaseRepository(ABC):
             logger.error(f"Failed to soft delete from {table_name}: {e}")
             raise DBError(f"Failed to soft delete from {table_name}: {e}") from e
 
-    async def execute_query(self, query: Select[Any] | Any, readonly: bool = True) -> Any:
+    async def execute_query(self, query: Select[Any] | Any, readonly: bool = True, cache: bool = False) -> Any:
         """
         Execute a custom SQLModel query.
         Uses SQLModel's exec() method for proper type handling.
+        With `cache=True`, readonly queries go through the query result cache (see `cached_exec`).
         """
         async with self.session(readonly=readonly) as session:
+            if cache and readonly:
+                return await self.cached_exec(session, query)
             result = await session.exec(query)
             return result
 
+    async def cached_exec(self, session: DBSession, query: Select[Any] | Any) -> Any:
+        """
+        Execute a read through the query result cache, when it is enabled (`query_cache_enabled`).
+
+        Results are cached per statement and bound values, and dropped when a table the statement reads
+        is written. Use it on readonly sessions for read-mostly tables, and don't modify returned entities.
+
+        Args:
+            session: The session to run the query on when it is not cached
+            query: The SELECT statement
+
+        Returns:
+            The same kind of result `session.exec(query)` returns
+
+        Example:
+            >>> async with repo.session(readonly=True) as session:
+            ...     roles = (await repo.cached_exec(session, select(SysDict))).all()
+        """
+        query_cache = self.db_manager.query_cache
+        if query_cache is None:
+            return await session.exec(query)
+        return await query_cache.exec(session, query)
+
+    async def fetch_hot(self, session: DBSession, query: HotQuery, **values: Any) -> list[Any] | None:
+        """
+        Run a hot query on the session's raw asyncpg connection.
+
+        It runs inside the session's transaction, so it sees the same data as the session's other queries.
+
+        Args:
+            session: The session whose connection to use
+            query: The query to run
+            **values: Values for the query's bind parameters
+
+        Returns:
+            The rows as asyncpg Records (tuple-like, by index or column name), or None when the session
+            isn't on PostgreSQL with asyncpg (or hot queries are disabled): run the ORM query instead
+
+        Example:
+            >>> async with repo.session(readonly=True) as session:
+            ...     rows = await repo.fetch_hot(session, ROLES, user_id="user123")
+        """
+        if not self.db_manager.hot_queries or isinstance(session, D1Session):
+            return None
+        dialect = session.get_bind().dialect
+        if dialect.driver != "asyncpg":
+            return None
+
+        sql, args = query.bind(dialect, values)
+        connection = await (await session.connection()).get_raw_connection()
+        started_at = time.perf_counter()
+        rows: list[Any] = await connection.driver_connection.fetch(sql, *args)  # type: ignore[union-attr]
+        # Bypasses the engine's cursor events, so report it to the SQL instrumentation directly
+        if self.db_manager.sql_instrumentation is not None:
+            self.db_manager.sql_instrumentation.record(sql, args, time.perf_counter() - started_at)
+        return rows
+
     async def execute_raw_sql(self, sql: str, readonly: bool = True) -> Any:
         """
         Execute raw SQL query.
@@ -936,7 +3693,71 @@ class BaseRepository(ABC):
     def configure_session_factory(self, factory: Callable[[], DBSession]) -> None:
         self._session_factory = factory
 
+    # Request Batching
+    def loader(
+        self, name: str, batch_fn: BatchFunction[LoaderKey, LoaderValue], default: LoaderValue
+    ) -> BatchLoader[LoaderKey, LoaderValue]:
+        """
+        Get the batch loader for one kind of lookup on this repository.
+
+        Inside a `batch_loader_scope()` the loader is shared by the whole scope and memoizes its results;
+        outside one it only coalesces lookups that are in flight at the same time.
+
+        Args:
+            name: Name of the lookup, unique within the repository class
+            batch_fn: Loads many keys at once and returns the found values by key
+            default: Value for keys the batch function did not return
+
+        Returns:
+            The BatchLoader to `load()` keys from
+
+        Example:
+            >>> roles = await self.loader("roles", self._load_roles, default=[]).load(user_id)
+        """
+        scope = _batch_loaders.get()
+        if scope is not None:
+            scope_key = (type(self), id(self.db_manager), name)
+            scoped = scope.get(scope_key)
+            if scoped is None:
+                scoped = scope[scope_key] = BatchLoader(batch_fn, default)
+            return scoped
+
+        shared = self._loaders.get(name)
+        if shared is None or shared.loop is not asyncio.get_running_loop():
+            shared = self._loaders[name] = BatchLoader(batch_fn, default, cache=False)
+        return shared
+
+    def clear_loader(self, name: str, *keys: Hashable) -> None:
+        """
+        Forget values a loader memoized for these keys (or all keys), after writing them.
+
+        Args:
+            name: Name the loader was created with
+            keys: Keys to forget; every key when empty
+        """
+        scope = _batch_loaders.get()
+        scoped = scope.get((type(self), id(self.db_manager), name)) if scope is not None else None
+        if scoped is not None:
+            scoped.clear(*keys)
+
     # Utility Methods
+    @staticmethod
+    def in_list_size(session: DBSession) -> int:
+        """
+        Get how many values a batch query may bind in one IN (...) list on this session's database.
+
+        Args:
+            session: The session the query will run on
+
+        Returns:
+            D1_MAX_BOUND_PARAMETERS on D1, which caps bound parameters per statement, else MAX_IN_LIST_SIZE
+
+        Example:
+            >>> size = repo.in_list_size(session)
+            >>> chunks = [ids[i : i + size] for i in range(0, len(ids), size)]
+        """
+        return D1_MAX_BOUND_PARAMETERS if isinstance(session, D1Session) else MAX_IN_LIST_SIZE
+
     def table_name(self, model_class: type[SQLModel]) -> str:
         """
         Get the table name from a SQLModel class.
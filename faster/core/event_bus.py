@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 import json
@@ -52,13 +54,53 @@ class Event(BaseModel, Generic[T]):
         return dict(data) if hasattr(data, "__dict__") else {}
 
 
+EventHandler = Callable[[Event[Any]], Awaitable[Any]]
+
+
+class OverflowPolicy(Enum):
+    """What the in-process transport does when a handler group's queue is full."""
+
+    BLOCK = "block"  # wait for the worker to free a slot
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued event to make room
+    SPILL = "spill"  # hand the event over to Redis Pub/Sub instead
+
+
+@dataclass
+class _HandlerGroup:
+    """A set of handlers served by one bounded queue and one worker task."""
+
+    name: str
+    channel: str
+    maxsize: int
+    overflow: OverflowPolicy
+    handlers: list[EventHandler] = field(default_factory=list)
+    queue: asyncio.Queue[Event[Any]] | None = None
+    worker: asyncio.Task[None] | None = None
+    delivered: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    failed: int = 0
+
+
 class EventBus:
     """
     An event bus that uses Redis Pub/Sub to decouple event producers and consumers.
+
+    Events that only matter inside the current worker can skip Redis entirely via
+    `dispatch_event`, which hands the `Event` object by reference to the handlers
+    registered with `subscribe` (or the `subscribe_events` decorator).
     """
 
-    def __init__(self, redis_client: RedisClient) -> None:
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        queue_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> None:
         self._redis_client = redis_client
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._groups: dict[str, _HandlerGroup] = {}
 
     async def fire_event(self, event: Event[Any], channel: str | None = None) -> Any:
         """
@@ -90,28 +132,184 @@ class EventBus:
         else:
             logger.warning(f"Failed to subscribe to channel: {channel}")
 
+    ###########################################################################
+    # In-process transport
+    ###########################################################################
+    def subscribe(
+        self,
+        channel: str,
+        handler: EventHandler,
+        group: str | None = None,
+        maxsize: int | None = None,
+        overflow: OverflowPolicy | None = None,
+    ) -> None:
+        """
+        Register an async handler for in-process events on a channel.
+
+        Handlers sharing a group are called in registration order by the same worker task,
+        so they see events in order. Each group has its own bounded queue; `maxsize` and
+        `overflow` only take effect when the group is created.
+        """
+        group_name = group if group else channel
+        handler_group = self._groups.get(group_name)
+        if handler_group is None:
+            handler_group = _HandlerGroup(
+                name=group_name,
+                channel=channel,
+                maxsize=maxsize if maxsize is not None else self._queue_size,
+                overflow=overflow if overflow is not None else self._overflow,
+            )
+            self._groups[group_name] = handler_group
+        elif handler_group.channel != channel:
+            raise ValueError(f"Handler group '{group_name}' is already bound to channel '{handler_group.channel}'.")
+        handler_group.handlers.append(handler)
+
+    def unsubscribe(self, channel: str, handler: EventHandler) -> None:
+        """
+        Remove a handler from every group on the channel. Empty groups are stopped.
+        """
+        for name, handler_group in list(self._groups.items()):
+            if handler_group.channel != channel or handler not in handler_group.handlers:
+                continue
+            handler_group.handlers.remove(handler)
+            if not handler_group.handlers:
+                if handler_group.worker and not handler_group.worker.done():
+                    _ = handler_group.worker.cancel()
+                del self._groups[name]
+
+    async def dispatch_event(self, event: Event[Any], channel: str | None = None) -> int:
+        """
+        Deliver an event to the in-process handler groups of a channel.
+
+        Returns the number of groups that accepted the event (spilled or dropped events do not count).
+        """
+        event_channel = channel if channel else event.event_type
+        if not event_channel:
+            raise ValueError("Cannot dispatch event without a channel or event_type.")
+
+        accepted = 0
+        for handler_group in [g for g in self._groups.values() if g.channel == event_channel]:
+            if await self._enqueue(handler_group, event):
+                accepted += 1
+        return accepted
+
+    async def drain(self) -> None:
+        """
+        Wait until every queued in-process event has been handled.
+        """
+        for handler_group in list(self._groups.values()):
+            if handler_group.queue is not None and handler_group.worker and not handler_group.worker.done():
+                await handler_group.queue.join()
+
+    async def shutdown(self, drain: bool = True) -> None:
+        """
+        Stop all in-process workers, optionally handling the queued events first.
+        """
+        if drain:
+            await self.drain()
+        workers = [g.worker for g in self._groups.values() if g.worker and not g.worker.done()]
+        for worker in workers:
+            _ = worker.cancel()
+        _ = await asyncio.gather(*workers, return_exceptions=True)
+        for handler_group in self._groups.values():
+            handler_group.queue = None
+            handler_group.worker = None
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Return per-group counters for the in-process transport.
+        """
+        return {
+            name: {
+                "channel": g.channel,
+                "handlers": len(g.handlers),
+                "queued": g.queue.qsize() if g.queue is not None else 0,
+                "maxsize": g.maxsize,
+                "overflow": g.overflow.value,
+                "delivered": g.delivered,
+                "dropped": g.dropped,
+                "spilled": g.spilled,
+                "failed": g.failed,
+            }
+            for name, g in self._groups.items()
+        }
+
+    async def _enqueue(self, handler_group: _HandlerGroup, event: Event[Any]) -> bool:
+        queue = self._ensure_worker(handler_group)
+        if not queue.full():
+            queue.put_nowait(event)
+            return True
+
+        if handler_group.overflow == OverflowPolicy.BLOCK:
+            await queue.put(event)
+            return True
+
+        if handler_group.overflow == OverflowPolicy.DROP_OLDEST:
+            _ = queue.get_nowait()
+            queue.task_done()
+            handler_group.dropped += 1
+            queue.put_nowait(event)
+            return True
+
+        handler_group.spilled += 1
+        try:
+            _ = await self._redis_client.publish(handler_group.channel, event.model_dump_json())
+        except Exception as e:
+            handler_group.dropped += 1
+            logger.error(f"Failed to spill event {event.event_id} to Redis channel {handler_group.channel}: {e}")
+        return False
+
+    def _ensure_worker(self, handler_group: _HandlerGroup) -> asyncio.Queue[Event[Any]]:
+        """Start (or restart) the group's worker on the running loop and return its queue."""
+        if handler_group.queue is None or handler_group.worker is None or handler_group.worker.done():
+            handler_group.queue = asyncio.Queue(maxsize=handler_group.maxsize)
+            handler_group.worker = asyncio.get_running_loop().create_task(
+                self._run_worker(handler_group, handler_group.queue), name=f"event-bus:{handler_group.name}"
+            )
+        return handler_group.queue
+
+    async def _run_worker(self, handler_group: _HandlerGroup, queue: asyncio.Queue[Event[Any]]) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                for handler in list(handler_group.handlers):
+                    try:
+                        _ = await handler(event)
+                    except Exception as e:
+                        handler_group.failed += 1
+                        logger.error(f"Event handler {getattr(handler, '__name__', handler)} failed: {e}")
+                handler_group.delivered += 1
+            finally:
+                queue.task_done()
+
 
 # Singleton instance of the EventBus
 event_bus = EventBus(get_redis())
 
 
-# def subscribe_events(channel: str) -> Callable[..., Any]:
-#     """
-#     A decorator to subscribe a function to a Redis Pub/Sub channel.
-#     The decorated function will be called with each event received on the channel.
-
-#     Args:
-#         channel: The Redis Pub/Sub channel to subscribe to.
+def subscribe_events(
+    channel: str,
+    group: str | None = None,
+    maxsize: int | None = None,
+    overflow: OverflowPolicy | None = None,
+) -> Callable[[EventHandler], EventHandler]:
+    """
+    A decorator to register an async function as an in-process handler on the singleton event bus.
+    The decorated function will be called with each event dispatched to the channel via
+    `event_bus.dispatch_event`, and is returned unchanged.
 
-#     Returns:
-#         A decorator that subscribes the function to the specified channel.
-#     """
+    Args:
+        channel: The channel to subscribe to.
+        group: Optional handler group; handlers in one group share a queue and a worker task.
+        maxsize: Queue bound for a newly created group.
+        overflow: Overflow policy for a newly created group.
 
-#     def decorator(func: Callable[[Event[Any]], Any]) -> Callable[..., Any]:
-#         async def wrapper(*args: Any, **kwargs: Any) -> None:
-#             async for event in event_bus.process_events(channel):
-#                 await func(event)
+    Returns:
+        A decorator that subscribes the function to the specified channel.
+    """
 
-#         return wrapper
+    def decorator(func: EventHandler) -> EventHandler:
+        event_bus.subscribe(channel, func, group=group, maxsize=maxsize, overflow=overflow)
+        return func
 
-#     return decorator
+    return decorator
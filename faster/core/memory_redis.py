@@ -0,0 +1,731 @@
+"""
+Embedded in-memory Redis-compatible store for single-worker deployments.
+
+`MemoryRedis` implements the subset of the `redis.asyncio.Redis` API that `RedisClient` and the helpers in
+`redisex` rely on (strings, hashes, lists, sets, HyperLogLogs, TTL, KEYS, pipelines and pub/sub), so it can
+be wrapped by `RedisClient` exactly like a real connection:
+
+    client = RedisClient(MemoryRedis(max_memory=64 * 1024 * 1024))
+    await client.set("key", "value", ex=60)
+
+Expiry is handled twice: lazily when a key is accessed, and actively by a hierarchical timing wheel that is
+advanced on every command, so expired keys are reclaimed without scanning the keyspace. When `max_memory` is
+set, the least recently used keys are evicted once the (approximate) memory usage exceeds the cap.
+
+HyperLogLogs are kept as plain sets, so their counts are exact (and cost memory per element). Pipelines
+just run their commands one after the other: there is nothing to save without a network round trip.
+
+All state lives in the current process; this provider is not shared between workers.
+"""
+
+import asyncio
+import builtins
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Iterator
+import fnmatch
+import math
+import time
+from typing import Any
+
+from redis.exceptions import ResponseError
+
+###############################################################################
+# Timing wheel
+###############################################################################
+
+_WHEEL_BITS = 6
+_WHEEL_SLOTS = 1 << _WHEEL_BITS
+_WHEEL_MASK = _WHEEL_SLOTS - 1
+_WHEEL_LEVELS = 4  # 64^4 ticks (~194 days at one tick per second) before clamping to the top level
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel keyed by integer ticks.
+
+    Level 0 has one slot per tick; each higher level has slots that are 64 times wider. Items in a higher level
+    are cascaded down when the lower level wraps around, so scheduling and advancing are O(1) amortized.
+    Items are `(key, tick)` pairs; the caller decides whether a fired item is still current.
+    """
+
+    def __init__(self, start_tick: int = 0) -> None:
+        self.current_tick = start_tick
+        self._levels: list[list[list[tuple[str, int]]]] = [
+            [[] for _ in range(_WHEEL_SLOTS)] for _ in range(_WHEEL_LEVELS)
+        ]
+        self._level_counts = [0] * _WHEEL_LEVELS
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, key: str, tick: int) -> None:
+        """Schedule `key` to fire at `tick` (ticks in the past fire on the next advance)."""
+        self._place(key, tick)
+        self._count += 1
+
+    def _place(self, key: str, tick: int) -> None:
+        target = max(tick, self.current_tick + 1)
+        delta = target - self.current_tick
+        for level in range(_WHEEL_LEVELS):
+            if delta < 1 << (_WHEEL_BITS * (level + 1)):
+                break
+        else:
+            # Beyond the top level: park the item in the furthest top-level slot, it is re-placed on cascade.
+            target = self.current_tick + (1 << (_WHEEL_BITS * _WHEEL_LEVELS)) - 1
+        slot = (target >> (_WHEEL_BITS * level)) & _WHEEL_MASK
+        self._levels[level][slot].append((key, tick))
+        self._level_counts[level] += 1
+
+    def advance(self, to_tick: int) -> Iterator[tuple[str, int]]:
+        """Advance the wheel to `to_tick`, yielding every item whose slot fires on the way."""
+        while self.current_tick < to_tick:
+            if self._count == 0:
+                self.current_tick = to_tick
+                return
+            # Skip straight to the next cascade boundary when the lower levels hold nothing.
+            level = next(i for i, count in enumerate(self._level_counts) if count)
+            if level > 0:
+                span = 1 << (_WHEEL_BITS * level)
+                boundary = (self.current_tick // span + 1) * span
+                if boundary > to_tick:
+                    self.current_tick = to_tick
+                    return
+                self.current_tick = boundary - 1
+            self.current_tick += 1
+            self._cascade()
+            index = self.current_tick & _WHEEL_MASK
+            slot = self._levels[0][index]
+            if slot:
+                self._levels[0][index] = []
+                self._level_counts[0] -= len(slot)
+                self._count -= len(slot)
+                yield from slot
+
+    def _cascade(self) -> None:
+        tick = self.current_tick
+        for level in range(1, _WHEEL_LEVELS):
+            if tick & ((1 << (_WHEEL_BITS * level)) - 1):
+                break
+            slot_index = (tick >> (_WHEEL_BITS * level)) & _WHEEL_MASK
+            items = self._levels[level][slot_index]
+            if items:
+                self._levels[level][slot_index] = []
+                self._level_counts[level] -= len(items)
+                for key, item_tick in items:
+                    self._place(key, item_tick)
+
+    def clear(self) -> None:
+        for level in self._levels:
+            for slot in level:
+                slot.clear()
+        self._level_counts = [0] * _WHEEL_LEVELS
+        self._count = 0
+
+
+###############################################################################
+# Keyspace
+###############################################################################
+
+_ENTRY_OVERHEAD = 64  # rough per-key bookkeeping cost, in bytes
+_ITEM_OVERHEAD = 16  # rough per-element cost inside hashes, lists and sets
+
+_WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+class _Entry:
+    __slots__ = ("expire_at", "expire_tick", "kind", "size", "value")
+
+    def __init__(self, kind: str, value: Any, size: int) -> None:
+        self.kind = kind
+        self.value = value
+        self.size = size
+        self.expire_at: float | None = None
+        self.expire_tick: int | None = None
+
+
+def _to_str(value: Any) -> str:
+    """Normalize a value the way Redis stores it (everything is a string)."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes | bytearray | memoryview):
+        return bytes(value).decode("utf-8")
+    if isinstance(value, bool):
+        raise ResponseError("Invalid input of type: 'bool'. Convert to a bytes, string, int or float first.")
+    if isinstance(value, int | float):
+        return repr(value)
+    raise ResponseError(
+        f"Invalid input of type: '{type(value).__name__}'. Convert to a bytes, string, int or float first."
+    )
+
+
+class MemoryPubSub:
+    """In-process counterpart of `redis.asyncio.client.PubSub` for `MemoryRedis`."""
+
+    def __init__(self, owner: "MemoryRedis") -> None:
+        self._owner = owner
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels)
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            if channel not in self.channels:
+                self.channels.add(channel)
+                self._owner._subscribers.setdefault(channel, set()).add(self)
+            self._queue.put_nowait(self._message("subscribe", channel, len(self.channels)))
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self.channels):
+            if channel in self.channels:
+                self.channels.discard(channel)
+                subscribers = self._owner._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(self)
+                    if not subscribers:
+                        del self._owner._subscribers[channel]
+            self._queue.put_nowait(self._message("unsubscribe", channel, len(self.channels)))
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0) -> Any:
+        while True:
+            try:
+                if timeout:
+                    message = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    message = self._queue.get_nowait()
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                return None
+            if ignore_subscribe_messages and message["type"] != "message":
+                continue
+            return message
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        while self.subscribed or not self._queue.empty():
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        for channel in tuple(self.channels):
+            subscribers = self._owner._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del self._owner._subscribers[channel]
+        self.channels.clear()
+
+    async def close(self) -> None:
+        await self.aclose()
+
+    def _deliver(self, channel: str, data: Any) -> None:
+        self._queue.put_nowait(self._message("message", channel, data))
+
+    def _message(self, kind: str, channel: str, data: Any) -> dict[str, Any]:
+        return {"type": kind, "pattern": None, "channel": self._owner._out(channel), "data": data}
+
+
+class MemoryPipeline:
+    """Queue of commands run in order on `execute()`, mirroring `redis.asyncio.client.Pipeline`."""
+
+    def __init__(self, owner: "MemoryRedis") -> None:
+        self._owner = owner
+        self._commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if not callable(getattr(self._owner, name, None)):
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        commands, self._commands = self._commands, []
+        results: list[Any] = []
+        for name, args, kwargs in commands:
+            try:
+                results.append(await getattr(self._owner, name)(*args, **kwargs))
+            except ResponseError as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+
+class MemoryRedis:
+    """
+    In-process Redis-compatible keyspace.
+
+    Args:
+        decode_responses: Return `str` values (True) or `bytes` (False), like redis-py.
+        max_memory: Approximate memory cap in bytes; 0 disables eviction.
+        clock: Monotonic time source, overridable for tests.
+    """
+
+    def __init__(
+        self,
+        decode_responses: bool = True,
+        max_memory: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.decode_responses = decode_responses
+        self.max_memory = max_memory
+        self._clock = clock
+        self._data: OrderedDict[str, _Entry] = OrderedDict()
+        self._wheel = TimingWheel(self._now_tick())
+        self._subscribers: dict[str, set[MemoryPubSub]] = {}
+        self.used_memory = 0
+        self.evicted_keys = 0
+        self.expired_keys = 0
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _now_tick(self) -> int:
+        return int(self._clock())
+
+    def _out(self, value: str) -> Any:
+        return value if self.decode_responses else value.encode("utf-8")
+
+    def _tick(self) -> None:
+        """Advance the timing wheel and reclaim keys whose TTL has elapsed."""
+        now_tick = self._now_tick()
+        if now_tick <= self._wheel.current_tick:
+            return
+        now = self._clock()
+        for key, tick in self._wheel.advance(now_tick):
+            entry = self._data.get(key)
+            if (
+                entry is not None
+                and entry.expire_tick == tick
+                and entry.expire_at is not None
+                and entry.expire_at <= now
+            ):
+                self._remove(key)
+                self.expired_keys += 1
+            elif entry is not None and entry.expire_tick == tick:
+                # Fired at the start of the expiry second; keep it until the next tick.
+                self._wheel.schedule(key, tick + 1)
+                entry.expire_tick = tick + 1
+
+    def _lookup(self, key: str, kind: str | None = None) -> _Entry | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.expire_at is not None and entry.expire_at <= self._clock():
+            self._remove(key)
+            self.expired_keys += 1
+            return None
+        if kind is not None and entry.kind != kind:
+            raise ResponseError(_WRONGTYPE)
+        self._data.move_to_end(key)
+        return entry
+
+    def _create(self, key: str, kind: str, value: Any, size: int) -> _Entry:
+        entry = _Entry(kind, value, _ENTRY_OVERHEAD + len(key) + size)
+        self._data[key] = entry
+        self.used_memory += entry.size
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.used_memory -= entry.size
+
+    def _resize(self, entry: _Entry, delta: int) -> None:
+        entry.size += delta
+        self.used_memory += delta
+
+    def _set_expiry(self, key: str, entry: _Entry, seconds: float) -> None:
+        entry.expire_at = self._clock() + seconds
+        entry.expire_tick = math.ceil(entry.expire_at)
+        self._wheel.schedule(key, entry.expire_tick)
+
+    def _evict(self, keep: str | None = None) -> None:
+        """Evict least recently used keys until usage drops under `max_memory`."""
+        if not self.max_memory:
+            return
+        while self.used_memory > self.max_memory and self._data:
+            key = next(iter(self._data))
+            if key == keep:
+                if len(self._data) == 1:
+                    return
+                self._data.move_to_end(key)
+                continue
+            self._remove(key)
+            self.evicted_keys += 1
+
+    def _drop_if_empty(self, key: str, entry: _Entry) -> None:
+        if not entry.value:
+            self._remove(key)
+
+    # -----------------------------
+    # Generic commands
+    # -----------------------------
+    async def ping(self) -> bool:
+        self._tick()
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self._tick()
+        deleted = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                self._remove(key)
+                deleted += 1
+        return deleted
+
+    async def exists(self, *keys: str) -> int:
+        self._tick()
+        return sum(1 for key in keys if self._lookup(key) is not None)
+
+    async def expire(self, key: str, time: int) -> bool:
+        self._tick()
+        entry = self._lookup(key)
+        if entry is None:
+            return False
+        if time <= 0:
+            self._remove(key)
+            return True
+        self._set_expiry(key, entry, time)
+        return True
+
+    async def ttl(self, key: str) -> int:
+        self._tick()
+        entry = self._lookup(key)
+        if entry is None:
+            return -2
+        if entry.expire_at is None:
+            return -1
+        return max(0, round(entry.expire_at - self._clock()))
+
+    async def keys(self, pattern: str = "*") -> list[Any]:
+        self._tick()
+        now = self._clock()
+        return [
+            self._out(key)
+            for key, entry in self._data.items()
+            if (entry.expire_at is None or entry.expire_at > now) and fnmatch.fnmatchcase(key, pattern)
+        ]
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._wheel.clear()
+        self.used_memory = 0
+        return True
+
+    async def dbsize(self) -> int:
+        self._tick()
+        return len(self._data)
+
+    async def close(self) -> None:
+        """Nothing to release; the keyspace lives as long as the instance."""
+
+    async def aclose(self) -> None:
+        await self.close()
+
+    # -----------------------------
+    # Strings
+    # -----------------------------
+    async def get(self, key: str) -> Any:
+        self._tick()
+        entry = self._lookup(key, "string")
+        return None if entry is None else self._out(entry.value)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ex: int | None = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> bool | None:
+        self._tick()
+        existing = self._lookup(key)
+        if (nx and existing is not None) or (xx and existing is None):
+            return None
+        if existing is not None:
+            self._remove(key)
+        text = _to_str(value)
+        entry = self._create(key, "string", text, len(text))
+        if ex is not None:
+            self._set_expiry(key, entry, ex)
+        self._evict(keep=key)
+        return True
+
+    async def incr(self, name: str, amount: int = 1) -> int:
+        return await self.incrby(name, amount)
+
+    async def incrby(self, name: str, amount: int = 1) -> int:
+        self._tick()
+        entry = self._lookup(name, "string")
+        if entry is None:
+            entry = self._create(name, "string", "0", 1)
+        try:
+            number = int(entry.value) + amount
+        except ValueError as e:
+            raise ResponseError("value is not an integer or out of range") from e
+        text = str(number)
+        self._resize(entry, len(text) - len(entry.value))
+        entry.value = text
+        self._evict(keep=name)
+        return number
+
+    async def decr(self, name: str, amount: int = 1) -> int:
+        return await self.incrby(name, -amount)
+
+    # -----------------------------
+    # Hashes
+    # -----------------------------
+    async def hget(self, name: str, key: str) -> Any:
+        self._tick()
+        entry = self._lookup(name, "hash")
+        if entry is None:
+            return None
+        value = entry.value.get(key)
+        return None if value is None else self._out(value)
+
+    async def hset(
+        self, name: str, key: str | None = None, value: Any = None, mapping: dict[str, Any] | None = None
+    ) -> int:
+        self._tick()
+        items: dict[str, Any] = dict(mapping) if mapping else {}
+        if key is not None:
+            items[key] = value
+        if not items:
+            raise ResponseError("'hset' with no key value pairs")
+        entry = self._lookup(name, "hash")
+        if entry is None:
+            entry = self._create(name, "hash", {}, 0)
+        added = 0
+        for field_name, field_value in items.items():
+            field_key = _to_str(field_name)
+            text = _to_str(field_value)
+            previous = entry.value.get(field_key)
+            if previous is None:
+                added += 1
+                self._resize(entry, _ITEM_OVERHEAD + len(field_key) + len(text))
+            else:
+                self._resize(entry, len(text) - len(previous))
+            entry.value[field_key] = text
+        self._evict(keep=name)
+        return added
+
+    async def hgetall(self, name: str) -> dict[Any, Any]:
+        self._tick()
+        entry = self._lookup(name, "hash")
+        if entry is None:
+            return {}
+        return {self._out(k): self._out(v) for k, v in entry.value.items()}
+
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        self._tick()
+        entry = self._lookup(name, "hash")
+        if entry is None:
+            entry = self._create(name, "hash", {}, 0)
+        previous = entry.value.get(key)
+        try:
+            number = int(previous or 0) + amount
+        except ValueError as e:
+            raise ResponseError("hash value is not an integer") from e
+        text = str(number)
+        if previous is None:
+            self._resize(entry, _ITEM_OVERHEAD + len(key) + len(text))
+        else:
+            self._resize(entry, len(text) - len(previous))
+        entry.value[key] = text
+        self._evict(keep=name)
+        return number
+
+    async def hdel(self, name: str, *keys: str) -> int:
+        self._tick()
+        entry = self._lookup(name, "hash")
+        if entry is None:
+            return 0
+        deleted = 0
+        for key in keys:
+            previous = entry.value.pop(key, None)
+            if previous is not None:
+                deleted += 1
+                self._resize(entry, -(_ITEM_OVERHEAD + len(key) + len(previous)))
+        self._drop_if_empty(name, entry)
+        return deleted
+
+    # -----------------------------
+    # Lists
+    # -----------------------------
+    def _push(self, name: str, values: tuple[Any, ...], left: bool) -> int:
+        self._tick()
+        entry = self._lookup(name, "list")
+        if entry is None:
+            entry = self._create(name, "list", deque(), 0)
+        for value in values:
+            text = _to_str(value)
+            if left:
+                entry.value.appendleft(text)
+            else:
+                entry.value.append(text)
+            self._resize(entry, _ITEM_OVERHEAD + len(text))
+        self._evict(keep=name)
+        return len(entry.value)
+
+    def _pop(self, name: str, left: bool) -> Any:
+        self._tick()
+        entry = self._lookup(name, "list")
+        if entry is None:
+            return None
+        text = entry.value.popleft() if left else entry.value.pop()
+        self._resize(entry, -(_ITEM_OVERHEAD + len(text)))
+        self._drop_if_empty(name, entry)
+        return self._out(text)
+
+    async def lpush(self, name: str, *values: Any) -> int:
+        return self._push(name, values, left=True)
+
+    async def rpush(self, name: str, *values: Any) -> int:
+        return self._push(name, values, left=False)
+
+    async def lpop(self, name: str) -> Any:
+        return self._pop(name, left=True)
+
+    async def rpop(self, name: str) -> Any:
+        return self._pop(name, left=False)
+
+    async def llen(self, name: str) -> int:
+        self._tick()
+        entry = self._lookup(name, "list")
+        return 0 if entry is None else len(entry.value)
+
+    async def lrange(self, name: str, start: int, end: int) -> list[Any]:
+        self._tick()
+        entry = self._lookup(name, "list")
+        if entry is None:
+            return []
+        items = list(entry.value)
+        stop = None if end == -1 else end + 1
+        return [self._out(item) for item in items[start:stop]]
+
+    # -----------------------------
+    # Sets
+    # -----------------------------
+    async def sadd(self, name: str, *values: Any) -> int:
+        self._tick()
+        entry = self._lookup(name, "set")
+        if entry is None:
+            entry = self._create(name, "set", builtins.set(), 0)
+        added = 0
+        for value in values:
+            text = _to_str(value)
+            if text not in entry.value:
+                entry.value.add(text)
+                added += 1
+                self._resize(entry, _ITEM_OVERHEAD + len(text))
+        self._evict(keep=name)
+        return added
+
+    async def srem(self, name: str, *values: Any) -> int:
+        self._tick()
+        entry = self._lookup(name, "set")
+        if entry is None:
+            return 0
+        removed = 0
+        for value in values:
+            text = _to_str(value)
+            if text in entry.value:
+                entry.value.discard(text)
+                removed += 1
+                self._resize(entry, -(_ITEM_OVERHEAD + len(text)))
+        self._drop_if_empty(name, entry)
+        return removed
+
+    async def smembers(self, name: str) -> builtins.set[Any]:
+        self._tick()
+        entry = self._lookup(name, "set")
+        if entry is None:
+            return builtins.set()
+        return {self._out(item) for item in entry.value}
+
+    async def sismember(self, name: str, value: Any) -> bool:
+        self._tick()
+        entry = self._lookup(name, "set")
+        return entry is not None and _to_str(value) in entry.value
+
+    # -----------------------------
+    # HyperLogLogs (exact, see module docstring)
+    # -----------------------------
+    async def pfadd(self, name: str, *values: Any) -> int:
+        self._tick()
+        entry = self._lookup(name, "hll")
+        created = entry is None
+        if entry is None:
+            entry = self._create(name, "hll", builtins.set(), 0)
+        before = len(entry.value)
+        for value in values:
+            text = _to_str(value)
+            if text not in entry.value:
+                entry.value.add(text)
+                self._resize(entry, _ITEM_OVERHEAD + len(text))
+        self._evict(keep=name)
+        return int(created or len(entry.value) > before)
+
+    async def pfcount(self, *names: str) -> int:
+        self._tick()
+        union: builtins.set[str] = builtins.set()
+        for name in names:
+            entry = self._lookup(name, "hll")
+            if entry is not None:
+                union |= entry.value
+        return len(union)
+
+    async def pfmerge(self, dest: str, *sources: str) -> bool:
+        self._tick()
+        union: builtins.set[str] = builtins.set()
+        for name in (dest, *sources):
+            entry = self._lookup(name, "hll")
+            if entry is not None:
+                union |= entry.value
+        entry = self._lookup(dest, "hll")
+        if entry is None:
+            entry = self._create(dest, "hll", builtins.set(), 0)
+        self._resize(entry, sum(_ITEM_OVERHEAD + len(text) for text in union - entry.value))
+        entry.value = union
+        self._evict(keep=dest)
+        return True
+
+    # -----------------------------
+    # Pipelines
+    # -----------------------------
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+    # -----------------------------
+    # Pub/Sub
+    # -----------------------------
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._subscribers.get(channel)
+        if not subscribers:
+            return 0
+        data = self._out(_to_str(message))
+        for pubsub in tuple(subscribers):
+            pubsub._deliver(channel, data)
+        return len(subscribers)
+
+    def pubsub(self) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    # -----------------------------
+    # Introspection
+    # -----------------------------
+    def info(self) -> dict[str, Any]:
+        """Return memory and keyspace statistics, loosely following the Redis INFO fields."""
+        return {
+            "keys": len(self._data),
+            "used_memory": self.used_memory,
+            "maxmemory": self.max_memory,
+            "evicted_keys": self.evicted_keys,
+            "expired_keys": self.expired_keys,
+            "pending_expirations": len(self._wheel),
+        }
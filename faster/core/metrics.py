@@ -0,0 +1,130 @@
+"""
+HTTP request metrics for Prometheus, recorded by `HttpMetricsMiddleware` and served by `/metrics`.
+
+Under a server with several workers each process has its own registry, so a scrape only sees the worker
+that answered it. To aggregate all of them, point `PROMETHEUS_MULTIPROC_DIR` at an empty directory in the
+environment the server is started with (not in `.env`: prometheus_client chooses where to keep values when
+the first metric is created, at import time). Every worker then writes its metrics there, and
+`generate_metrics()` reads them all. With gunicorn, also drop the in-flight gauge of exited workers from
+its config file:
+
+    from prometheus_client import multiprocess
+
+    def child_exit(server, worker):
+        multiprocess.mark_process_dead(worker.pid)
+"""
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .auth.router_info import RouterInfo
+from .auth.services import AuthService
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to answer an HTTP request, by route template", ["method", "route"]
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of HTTP response bodies, by route template",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being answered", multiprocess_mode="livesum")
+
+# Route label of requests matching no route, so that arbitrary paths don't create new series
+UNMATCHED_ROUTE = "<unmatched>"
+# Method label of any other method
+OTHER_METHOD = "OTHER"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def is_multiprocess() -> bool:
+    """Whether prometheus_client runs in multiprocess mode, sharing the metrics of all workers."""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ or "prometheus_multiproc_dir" in os.environ
+
+
+def generate_metrics() -> bytes:
+    """
+    The metrics in the Prometheus text format: of every worker in multiprocess mode, of this process otherwise.
+
+    Returns:
+        The exposition body for `/metrics`
+    """
+    if not is_multiprocess():
+        return generate_latest()
+    registry = CollectorRegistry()
+    _ = MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return generate_latest(registry)
+
+
+class HttpMetricsMiddleware:
+    """
+    ASGI middleware recording the latency, response size and status code of each HTTP request, labelled with
+    its route's path template, and the number of requests in flight.
+
+    The template is the route recorded by routing or, for a request answered before routing (one denied by
+    AuthMiddleware), the one `RouterInfo` finds for it. The labelled metrics are looked up once per method,
+    route and status and then reused, so a request costs a few observations.
+    """
+
+    def __init__(self, app: ASGIApp, router_info: RouterInfo | None = None) -> None:
+        self.app = app
+        self.router_info = router_info or AuthService.get_instance().get_router_info()
+        self._children: dict[tuple[str, str, int], tuple[Any, Any, Any]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # An exception before the response starts is answered with a 500 by the server
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            self._observe(scope, status, elapsed, size)
+
+    def _observe(self, scope: Scope, status: int, elapsed: float, size: int) -> None:
+        method = scope["method"] if scope["method"] in HTTP_METHODS else OTHER_METHOD
+        route = self._route(scope)
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = (
+                HTTP_REQUEST_DURATION.labels(method, route),
+                HTTP_RESPONSE_SIZE.labels(method, route),
+                HTTP_REQUESTS.labels(method, route, str(status)),
+            )
+            self._children[key] = children
+        duration, response_size, requests = children
+        duration.observe(elapsed)
+        response_size.observe(size)
+        requests.inc()
+
+    def _route(self, scope: Scope) -> str:
+        template = getattr(scope.get("route"), "path", None)
+        if template is None:
+            template = self.router_info.find_path_template(scope["method"], scope["path"])
+        return str(template) if template else UNMATCHED_ROUTE
@@ -24,7 +24,7 @@ Usage:
 
 from abc import ABC, abstractmethod
 import builtins
-from collections.abc import AsyncIterator, Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from contextlib import asynccontextmanager
 from enum import Enum
 from functools import wraps
@@ -40,6 +40,7 @@ from redis.typing import FieldT
 from .config import Settings
 from .exceptions import AppError
 from .logger import get_logger
+from .memory_redis import MemoryRedis
 from .plugins import BasePlugin
 
 logger = get_logger(__name__)
@@ -58,6 +59,7 @@ class RedisProvider(str, Enum):
     LOCAL = "local"
     UPSTASH = "upstash"
     FAKE = "fake"
+    MEMORY = "memory"
 
 
 class RedisConnectionError(Exception):
@@ -321,6 +323,10 @@ class RedisInterface(ABC):
     async def hdel(self, name: str, *keys: str) -> int:
         """Delete hash fields."""
 
+    @abstractmethod
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        """Increment hash field value."""
+
     @abstractmethod
     async def lpush(self, name: str, *values: str) -> int:
         """Push values to list head."""
@@ -365,6 +371,22 @@ class RedisInterface(ABC):
     async def decr(self, name: str, amount: int = 1) -> int:
         """Decrement key value."""
 
+    @abstractmethod
+    async def pfadd(self, name: str, *values: str) -> int:
+        """Add elements to a HyperLogLog."""
+
+    @abstractmethod
+    async def pfcount(self, *names: str) -> int:
+        """Approximate number of distinct elements in the union of HyperLogLogs."""
+
+    @abstractmethod
+    async def pfmerge(self, dest: str, *sources: str) -> bool:
+        """Merge HyperLogLogs into `dest`."""
+
+    @abstractmethod
+    async def pipeline(self, commands: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        """Run commands in one round trip."""
+
     @abstractmethod
     async def ping(self) -> bool:
         """Test connection."""
@@ -388,7 +410,7 @@ class RedisInterface(ABC):
 class RedisClient(RedisInterface):
     """Redis client wrapper implementing the RedisInterface."""
 
-    def __init__(self, client: redis.Redis | fakeredis.aioredis.FakeRedis):
+    def __init__(self, client: redis.Redis | fakeredis.aioredis.FakeRedis | MemoryRedis):
         self.client = client
         self._is_fake = isinstance(client, fakeredis.aioredis.FakeRedis)
 
@@ -495,6 +517,14 @@ class RedisClient(RedisInterface):
             logger.error(f"Redis HDEL operation failed for hash '{name}', keys {keys}: {e}")
             raise RedisOperationError(f"HDEL operation failed: {e}") from e
 
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        try:
+            result = self.client.hincrby(name, key, amount)
+            return int(await result if isinstance(result, Awaitable) else result)
+        except (RedisError, Exception) as e:
+            logger.error(f"Redis HINCRBY operation failed for hash '{name}', key '{key}': {e}")
+            raise RedisOperationError(f"HINCRBY operation failed: {e}") from e
+
     async def lpush(self, name: str, *values: str) -> int:
         try:
             if not values:
@@ -601,6 +631,53 @@ class RedisClient(RedisInterface):
             logger.error(f"Redis DECR operation failed for key '{name}': {e}")
             raise RedisOperationError(f"DECR operation failed: {e}") from e
 
+    async def pfadd(self, name: str, *values: str) -> int:
+        try:
+            return int(await self.client.pfadd(name, *values))
+        except (RedisError, Exception) as e:
+            logger.error(f"Redis PFADD operation failed for key '{name}': {e}")
+            raise RedisOperationError(f"PFADD operation failed: {e}") from e
+
+    async def pfcount(self, *names: str) -> int:
+        try:
+            if not names:
+                return 0
+            return int(await self.client.pfcount(*names))
+        except (RedisError, Exception) as e:
+            logger.error(f"Redis PFCOUNT operation failed for keys {names}: {e}")
+            raise RedisOperationError(f"PFCOUNT operation failed: {e}") from e
+
+    async def pfmerge(self, dest: str, *sources: str) -> bool:
+        try:
+            return bool(await self.client.pfmerge(dest, *sources))
+        except (RedisError, Exception) as e:
+            logger.error(f"Redis PFMERGE operation failed for key '{dest}': {e}")
+            raise RedisOperationError(f"PFMERGE operation failed: {e}") from e
+
+    async def pipeline(self, commands: Sequence[tuple[str, Sequence[Any]]]) -> list[Any]:
+        """
+        Run commands in one round trip (a pipeline without MULTI/EXEC).
+
+        Args:
+            commands: (command, arguments) pairs, the command being a redis-py method name
+
+        Returns:
+            The result of each command, in order
+
+        Example:
+            await client.pipeline([("hincrby", ("counts", "login", 1)), ("expire", ("counts", 60))])
+        """
+        try:
+            if not commands:
+                return []
+            pipe = self.client.pipeline(transaction=False)
+            for command, args in commands:
+                _ = getattr(pipe, command)(*args)
+            return await pipe.execute()
+        except (RedisError, Exception) as e:
+            logger.error(f"Redis pipeline of {len(commands)} commands failed: {e}")
+            raise RedisOperationError(f"Pipeline failed: {e}") from e
+
     async def ping(self) -> bool:
         try:
             result = await self.client.ping()
@@ -665,7 +742,7 @@ class RedisClient(RedisInterface):
             pubsub = self.client.pubsub()
             await pubsub.subscribe(*channels)
             logger.debug(f"Created subscription to channels: {channels}")
-            return pubsub
+            return cast(PubSub, pubsub)
         except (RedisError, Exception) as e:
             logger.error(f"Redis SUBSCRIBE operation failed for channels {channels}: {e}")
             raise RedisOperationError(f"SUBSCRIBE operation failed: {e}") from e
@@ -697,13 +774,14 @@ class RedisManager(BasePlugin):
         max_connections: int | None = None,
         decode_responses: bool = True,
         fallback_to_fake: bool = True,
+        max_memory: int = 0,
         **kwargs: Any,
     ) -> None:
         """
         Initialize Redis client with specified provider and parameters.
 
         Args:
-            provider: Redis provider type ('local', 'upstash', or 'fake')
+            provider: Redis provider type ('local', 'upstash', 'fake' or 'memory')
             redis_url: Redis connection URL (e.g., 'redis://localhost:6379/0' or Upstash URL)
                       If not provided for local provider, will construct from host/port/password/db
             host: Redis server host (used only if redis_url not provided for local)
@@ -715,6 +793,7 @@ class RedisManager(BasePlugin):
             max_connections: Maximum number of connections in connection pool
             decode_responses: Whether to decode responses to strings
             fallback_to_fake: Whether to fallback to fake Redis on connection failure
+            max_memory: Memory cap in bytes for the 'memory' provider (0 = unlimited)
             **kwargs: Additional connection parameters (ssl_cert_reqs, ssl_ca_certs, etc.)
 
         Examples:
@@ -730,6 +809,9 @@ class RedisManager(BasePlugin):
             # Fake Redis for testing
             await manager.setup(provider="fake")
 
+            # Embedded in-process store for single-worker deployments
+            await manager.setup(provider="memory", max_memory=64 * 1024 * 1024)
+
         Raises:
             RedisConnectionError: If connection fails and fallback is disabled
             ValueError: If invalid provider or missing required parameters
@@ -755,6 +837,8 @@ class RedisManager(BasePlugin):
                 )
             elif provider == RedisProvider.FAKE:
                 await self._setup_fake(decode_responses=decode_responses)
+            elif provider == RedisProvider.MEMORY:
+                await self._setup_memory(decode_responses=decode_responses, max_memory=max_memory)
             elif redis_url:
                 await self._setup_from_url(
                     url=redis_url,
@@ -837,6 +921,11 @@ class RedisManager(BasePlugin):
         self._client = RedisClient(redis_client)
         logger.debug("Initialized fake Redis client")
 
+    async def _setup_memory(self, decode_responses: bool, max_memory: int = 0) -> None:
+        """Initialize the embedded in-process Redis-compatible store."""
+        self._client = RedisClient(MemoryRedis(decode_responses=decode_responses, max_memory=max_memory))
+        logger.debug(f"Initialized in-memory Redis client (max_memory={max_memory or 'unlimited'})")
+
     def get_client(self) -> RedisClient:
         """Get the Redis client instance."""
         if not self._client:
@@ -872,6 +961,7 @@ class RedisManager(BasePlugin):
                 max_connections=settings.redis_max_connections,
                 decode_responses=settings.redis_decode_responses,
                 fallback_to_fake=settings.is_debug,  # Use debug mode to determine fallback
+                max_memory=settings.redis_max_memory,
             )
             return self.is_ready
         except Exception as e:
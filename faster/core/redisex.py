@@ -30,6 +30,8 @@ class KeyPrefix(Enum):
     SYS_DICT = "sys:dict"
     SYS_MAP = "sys:map"
     JWKS_KEY = "jwks:key"
+    AUDIT_ROLLUP = "audit:rollup"
+    AUDIT_UNIQUE = "audit:uniq"
 
     def __str__(self) -> str:  # no need in Python 3.11+
         return self.value
@@ -105,8 +105,8 @@ class AppRepository(BaseRepository):
                 # Order by the N_ORDER column
                 query = query.order_by(SysMap.order)  # type: ignore[arg-type]
 
-                # Execute query using SQLModel exec() method
-                result = await session.exec(query)
+                # Execute query, served from the query result cache when enabled
+                result = await self.cached_exec(session, query)
                 rows: Sequence[SysMap] = result.all()
 
                 data: dict[str, dict[str, list[str]]] = {}
@@ -156,37 +156,27 @@ class AppRepository(BaseRepository):
                 # Soft-delete: mark all existing entries as inactive using BaseRepository method
                 _ = await self.soft_delete(self.table_name(SysMap), {"C_CATEGORY": category}, session)
 
-                # Create/update entries for each left_value -> right_value mapping
-                for left_value, right_values in values.items():
-                    if not right_values:  # Skip empty lists
-                        continue
-
-                    for right_value in right_values:
-                        # Query for existing record by category, left_value, and right_value
-                        query = select(SysMap).where(
-                            SysMap.category == category,
-                            SysMap.left_value == left_value,
-                            SysMap.right_value == right_value,
-                        )
-                        result = await session.exec(query)
-                        existing_map = result.first()
-
-                        if existing_map:
-                            # Update existing record
-                            existing_map.in_used = True
-                            existing_map.order = 0
-                            existing_map.updated_at = datetime.now()
-                        else:
-                            # Create new record for each left-right pair
-                            new_map = SysMap(
-                                category=category,
-                                left_value=left_value,
-                                right_value=right_value,
-                                order=0,
-                                in_used=True,
-                            )
-                            session.add(new_map)
-
+                # Reactivate existing entries and insert new ones in one upsert
+                now = datetime.now()
+                rows = [
+                    {
+                        "category": category,
+                        "left_value": left_value,
+                        "right_value": right_value,
+                        "order": 0,
+                        "in_used": 1,
+                        "updated_at": now,
+                    }
+                    for left_value, right_values in values.items()
+                    for right_value in right_values
+                ]
+                _ = await self.bulk_upsert(
+                    SysMap,
+                    rows,
+                    conflict_cols=["category", "left_value", "right_value"],
+                    update_cols=["order", "in_used", "updated_at"],
+                    session=session,
+                )
                 await session.flush()
                 return True
 
@@ -239,8 +229,8 @@ class AppRepository(BaseRepository):
                 # Order by the N_ORDER column
                 query = query.order_by(SysDict.order)  # type: ignore[arg-type]
 
-                # Execute query using SQLModel exec() method
-                result = await session.exec(query)
+                # Execute query, served from the query result cache when enabled
+                result = await self.cached_exec(session, query)
                 rows: Sequence[SysDict] = result.all()
 
                 data: dict[str, dict[int, str]] = {}
@@ -287,29 +277,19 @@ class AppRepository(BaseRepository):
                 # Soft-delete: mark all existing entries as inactive using BaseRepository method
                 _ = await self.soft_delete(self.table_name(SysDict), {"C_CATEGORY": category}, session)
 
-                # Create/update entries with new values (skip if values is empty - delete operation)
-                for dict_key, dict_value in values.items():
-                    # Query for existing record by category and key (not by primary key)
-                    query = select(SysDict).where(SysDict.category == category, SysDict.key == dict_key)
-                    result = await session.exec(query)
-                    existing_dict = result.first()
-
-                    if existing_dict:
-                        # Update existing record
-                        existing_dict.value = dict_value
-                        existing_dict.in_used = True
-                        existing_dict.updated_at = datetime.now()
-                    else:
-                        # Create new record
-                        new_dict = SysDict(
-                            category=category,
-                            key=dict_key,
-                            value=dict_value,
-                            in_used=True,
-                            updated_at=datetime.now(),
-                        )
-                        session.add(new_dict)
-
+                # Reactivate/update existing entries and insert new ones in one upsert
+                now = datetime.now()
+                rows = [
+                    {"category": category, "key": dict_key, "value": dict_value, "in_used": 1, "updated_at": now}
+                    for dict_key, dict_value in values.items()
+                ]
+                _ = await self.bulk_upsert(
+                    SysDict,
+                    rows,
+                    conflict_cols=["category", "key"],
+                    update_cols=["value", "in_used", "updated_at"],
+                    session=session,
+                )
                 await session.flush()
                 return True
 
@@ -356,8 +336,8 @@ class AppRepository(BaseRepository):
                 # Order by category, then by key
                 query = query.order_by(SysDict.category, SysDict.key)  # type: ignore[arg-type]
 
-                # Execute query
-                result = await session.exec(query)
+                # Execute query, served from the query result cache when enabled
+                result = await self.cached_exec(session, query)
                 rows = result.all()
 
                 # Convert to list of dictionaries
@@ -415,8 +395,8 @@ class AppRepository(BaseRepository):
                 # Order by category, then by left_value, then by right_value
                 query = query.order_by(SysMap.category, SysMap.left_value, SysMap.right_value)
 
-                # Execute query
-                result = await session.exec(query)
+                # Execute query, served from the query result cache when enabled
+                result = await self.cached_exec(session, query)
                 rows = result.all()
 
                 # Convert to list of dictionaries
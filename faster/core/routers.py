@@ -4,12 +4,14 @@ from uuid import uuid4
 
 from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import FileResponse
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from .auth.routers import get_auth_service
 from .auth.services import AuthService
 from .client_generator import ClientConfig, ClientGenerator
+from .database import DatabaseManager
 from .logger import get_logger
+from .metrics import generate_metrics
 from .models import (
     AppResponseDict,
     SysDictAdjustRequest,
@@ -81,6 +83,17 @@ async def request_state(request: Request) -> AppResponseDict:
     )
 
 
+@dev_router.get("/sql_stats", response_model=None)
+async def sql_stats(top: int = 50) -> AppResponseDict:
+    """
+    Returns SQL statement timings (slowest in total first) and the query counts of recent requests.
+    """
+    instrumentation = DatabaseManager.get_instance().sql_instrumentation
+    if instrumentation is None:
+        return AppResponseDict(status="error", message="SQL instrumentation is disabled", data={})
+    return AppResponseDict(data=instrumentation.snapshot(top=top))
+
+
 @dev_router.get("/rbac", response_model=None, tags=["public"])
 async def rbac_data(
     request: Request,
@@ -483,7 +496,7 @@ async def metrics(request: Request) -> Response:
         return Response("Metrics endpoint disabled", status_code=404)
 
     try:
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        return Response(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
     except ImportError:
         logger.warning("prometheus_client not installed, metrics endpoint disabled")
         return Response("Metrics not available - prometheus_client not installed", status_code=503)
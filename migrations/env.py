@@ -7,6 +7,7 @@ import re
 from typing import Any
 
 from alembic import context
+from alembic.runtime.environment import NameFilterParentNames, NameFilterType
 from alembic.runtime.migration import MigrationContext
 from sqlalchemy import engine_from_config, pool
 from sqlalchemy.engine import Engine
@@ -37,6 +38,18 @@ except ImportError as e:
 # Target metadata for 'autogenerate'
 target_metadata = SQLModel.metadata
 
+# Monthly partitions of tables partitioned by a migration (AUTH_USER_ACTION_202601, ..._default)
+PARTITION_TABLE = re.compile(r"^(?P<parent>.+)_(\d{6}|default)$")
+
+
+def include_name(name: str | None, type_: NameFilterType, parent_names: NameFilterParentNames) -> bool:
+    """Leave the partitions of a partitioned model table out of autogenerate's comparison."""
+    if type_ == "table" and name is not None:
+        match = PARTITION_TABLE.match(name)
+        if match and match["parent"] in target_metadata.tables:
+            return False
+    return True
+
 
 # --------------------- Post-process migration scripts -----------------------
 def process_revision_directives(
@@ -77,6 +90,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
         process_revision_directives=process_revision_directives,
     )
     with context.begin_transaction():
@@ -95,6 +109,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_name=include_name,
             process_revision_directives=process_revision_directives,
         )
         with context.begin_transaction():
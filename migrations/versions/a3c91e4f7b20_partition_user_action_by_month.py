@@ -0,0 +1,128 @@
+"""partition user action by month
+
+Revision ID: a3c91e4f7b20
+Revises: 5f36e6c0eb24
+Create Date: 2026-10-18 23:50:12.418305
+
+Optional: the table is only rebuilt when asked for, since it copies every row under an exclusive lock:
+
+    alembic -x partition_user_action=true upgrade head
+    (or DATABASE_PARTITION_USER_ACTION=true alembic upgrade head)
+
+Without it the revision is recorded but changes nothing. To partition later, step back over it and run it
+again with the option: `alembic downgrade 5f36e6c0eb24` leaves an unpartitioned table as it is.
+
+On PostgreSQL, AUTH_USER_ACTION becomes a table range-partitioned by month on D_TIMESTAMP, with a
+partition per month from its oldest row up to three months ahead, and a default partition for rows outside
+them. Later partitions are created, and expired ones archived and dropped, by the partition maintenance
+job (`DatabaseManager.maintain_partitions`). The primary key becomes (id, D_TIMESTAMP), since a
+partitioned table's keys must include the partition column; ids still come from the same sequence. The
+`UserAction` model keeps `id` as its only primary key: autogenerate doesn't compare primary keys, and
+migrations/env.py leaves the partitions out of its comparison.
+
+Other databases are left unchanged.
+"""
+
+from collections.abc import Sequence
+from datetime import date
+import logging
+import os
+
+from alembic import context, op
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+# Revision identifiers, used by Alembic.
+revision: str = "a3c91e4f7b20"
+down_revision: str | None = "5f36e6c0eb24"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "AUTH_USER_ACTION"
+# The table being replaced, while its rows are copied
+STAGING = "AUTH_USER_ACTION_STAGING"
+MONTHS_AHEAD = 3
+OPT_IN = "partition_user_action"
+INDEXES = [
+    ("idx_user_action_event_name", ["C_EVENT_NAME"]),
+    ("idx_user_action_event_type", ["C_EVENT_TYPE"]),
+    ("idx_user_action_session_id", ["C_SESSION_ID"]),
+    ("idx_user_action_source", ["C_EVENT_SOURCE"]),
+    ("idx_user_action_timestamp", ["D_TIMESTAMP"]),
+    ("idx_user_action_trace_id", ["C_TRACE_ID"]),
+    ("idx_user_action_type_time", ["C_EVENT_TYPE", "D_TIMESTAMP"]),
+    ("idx_user_action_user_auth_id", ["C_USER_AUTH_ID"]),
+    ("idx_user_action_user_time", ["C_USER_AUTH_ID", "D_TIMESTAMP"]),
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def _replace_table(partitioned: bool, primary_key: str) -> None:
+    """Move the rows of TABLE to a new TABLE with the same columns, sequence and indexes."""
+    op.execute(text(f'ALTER TABLE "{TABLE}" RENAME TO "{STAGING}"'))
+    op.execute(text(f'ALTER TABLE "{STAGING}" RENAME CONSTRAINT "{TABLE}_pkey" TO "{STAGING}_pkey"'))
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name=STAGING)
+
+    partition_by = ' PARTITION BY RANGE ("D_TIMESTAMP")' if partitioned else ""
+    op.execute(text(f'CREATE TABLE "{TABLE}" (LIKE "{STAGING}" INCLUDING DEFAULTS){partition_by}'))
+    op.execute(text(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY ({primary_key})'))
+    # Keep the id sequence when the old table is dropped
+    op.execute(text(f'ALTER SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id'))
+
+    if partitioned:
+        oldest = op.get_bind().execute(text(f'SELECT min("D_TIMESTAMP") FROM "{STAGING}"')).scalar()
+        current = date.today().replace(day=1)
+        month = min(oldest.date().replace(day=1), current) if oldest is not None else current
+        while month <= _add_months(current, MONTHS_AHEAD):
+            op.execute(
+                text(
+                    f'CREATE TABLE "{TABLE}_{month:%Y%m}" PARTITION OF "{TABLE}" '
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+                )
+            )
+            month = _add_months(month, 1)
+        op.execute(text(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT'))
+
+    for name, columns in INDEXES:
+        op.create_index(name, TABLE, columns, unique=False)
+    op.execute(text(f'INSERT INTO "{TABLE}" SELECT * FROM "{STAGING}"'))
+    op.execute(text(f'DROP TABLE "{STAGING}"'))
+
+
+def _opted_in() -> bool:
+    value = context.get_x_argument(as_dictionary=True).get(OPT_IN, os.getenv(f"DATABASE_{OPT_IN.upper()}", ""))
+    return value.strip().lower() in {"1", "true", "yes"}
+
+
+def _is_partitioned() -> bool:
+    query = text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+    )
+    return op.get_bind().execute(query, {"table": TABLE}).first() is not None
+
+
+def upgrade() -> None:
+    """Partition AUTH_USER_ACTION by month (PostgreSQL only, when opted in)."""
+    if op.get_bind().dialect.name != "postgresql":
+        logger.info(f"Skipping {TABLE} partitioning: only supported on PostgreSQL")
+        return
+    if not _opted_in():
+        logger.info(f"Skipping {TABLE} partitioning: run with -x {OPT_IN}=true to rebuild the table")
+        return
+    if _is_partitioned():
+        return
+    _replace_table(partitioned=True, primary_key='id, "D_TIMESTAMP"')
+
+
+def downgrade() -> None:
+    """Turn AUTH_USER_ACTION back into a plain table (PostgreSQL only, if it was partitioned)."""
+    if op.get_bind().dialect.name != "postgresql" or not _is_partitioned():
+        return
+    # Dropping the partitioned table drops its partitions
+    _replace_table(partitioned=False, primary_key="id")
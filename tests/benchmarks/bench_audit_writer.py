@@ -0,0 +1,91 @@
+"""
+Benchmark audit event logging with file-backed SQLite: one INSERT per event in the request (direct) versus
+queueing the event on the AuditWriter, which writes multi-row batches in the background (write-behind),
+either into the database or appended to segment files (SegmentStore, fsync per batch).
+
+Concurrent tasks stand in for requests, each logging one event per call. Reports the latency a caller sees
+per call and the events stored per second, counted until every event is written.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_audit_writer.py [--tasks 32] [--events 200] [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+
+from faster.core.auth.audit import AuditSink, AuditWriter, AuditWriterConfig
+from faster.core.auth.repositories import AuthRepository
+from faster.core.auth.schemas import UserAction
+from faster.core.auth.segments import SegmentStore, SegmentStoreConfig
+from faster.core.config import Settings
+from faster.core.database import DatabaseManager
+
+
+def _event(task: int, i: int) -> dict[str, object]:
+    return {
+        "event_type": "auth",
+        "event_name": "login",
+        "event_source": "api",
+        "user_auth_id": f"auth-{task}",
+        "event_payload": {"attempt": i},
+    }
+
+
+async def _run(mode: str, args: argparse.Namespace) -> tuple[list[float], float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager()
+        assert await manager.setup(Settings(database_url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"))
+        assert manager.master_engine is not None
+        async with manager.master_engine.begin() as conn:
+            table = UserAction.__table__  # type: ignore[attr-defined]
+            await conn.run_sync(lambda sync_conn: SQLModel.metadata.create_all(sync_conn, tables=[table]))
+        repo = AuthRepository(db_manager=manager)
+        store = SegmentStore(SegmentStoreConfig(directory=str(Path(tmp) / "segments")))
+        sink: AuditSink = store if mode == "segments" else repo
+        writer = AuditWriter(sink, AuditWriterConfig(batch_size=args.batch_size, max_queue=args.tasks * args.events))
+        writer.start()
+        latencies: list[float] = []
+
+        async def request(task: int) -> None:
+            for i in range(args.events):
+                start = time.perf_counter()
+                if mode != "direct":
+                    assert writer.enqueue(_event(task, i))
+                    await asyncio.sleep(0)  # let the other requests (and the writer) run, as an endpoint would
+                else:
+                    assert await repo.log_event(**_event(task, i))  # type: ignore[arg-type]
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        _ = await asyncio.gather(*(request(task) for task in range(args.tasks)))
+        await writer.close()
+        elapsed = time.perf_counter() - start
+        await store.close()
+        _ = await manager.teardown()
+        return latencies, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--tasks", type=int, default=32, help="concurrent requests")
+    _ = parser.add_argument("--events", type=int, default=200, help="events logged per request")
+    _ = parser.add_argument("--batch-size", type=int, default=100, help="events per write-behind batch")
+    args = parser.parse_args()
+
+    total = args.tasks * args.events
+    print(f"{args.tasks} tasks x {args.events} events, batches of {args.batch_size}")
+    print(f"{'mode':<14}{'mean (us)':>12}{'p99 (us)':>12}{'events/s':>12}")
+    for name in ("direct", "write-behind", "segments"):
+        latencies, elapsed = await _run(name, args)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{name:<14}{statistics.mean(latencies) * 1e6:>12.0f}{p99 * 1e6:>12.0f}{total / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Benchmark upserting SYS_DICT rows: the previous "select existing row, then update or insert" loop versus
+BaseRepository.bulk_upsert, on in-memory SQLite and on D1 (HTTP API stub).
+
+Half of the rows already exist and get updated; the other half are inserted.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_bulk_upsert.py [--sizes 10 1000 100000] [--loop-max 1000]
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import time
+from typing import Any
+
+from sqlalchemy import insert, update
+from sqlmodel import SQLModel, select
+
+from faster.core.config import Settings
+from faster.core.database import D1Session, DatabaseManager, DBSession
+from faster.core.repositories import AppRepository
+from faster.core.schemas import SysDict
+from tests.core.d1_stub import D1HttpStub
+
+CATEGORY = "bench"
+D1_SCHEMA = """
+CREATE TABLE SYS_DICT (
+    id INTEGER PRIMARY KEY, C_CATEGORY TEXT NOT NULL, N_KEY INTEGER NOT NULL, C_VALUE TEXT NOT NULL,
+    N_ORDER INTEGER NOT NULL DEFAULT 0, N_IN_USED INTEGER NOT NULL DEFAULT 1,
+    D_CREATED_AT DATETIME DEFAULT CURRENT_TIMESTAMP, D_UPDATED_AT DATETIME DEFAULT CURRENT_TIMESTAMP,
+    D_DELETED_AT DATETIME, UNIQUE (C_CATEGORY, N_KEY)
+)
+"""
+
+
+def _rows(size: int, start: int, value: str) -> list[dict[str, Any]]:
+    now = datetime.now()
+    return [
+        {"category": CATEGORY, "key": key, "value": value, "in_used": 1, "updated_at": now}
+        for key in range(start, start + size)
+    ]
+
+
+async def _loop(repo: AppRepository, session: DBSession | D1Session, rows: list[dict[str, Any]]) -> None:
+    """Previous behaviour: one SELECT per row, then update the loaded entity or add a new one."""
+    for row in rows:
+        query = select(SysDict).where(SysDict.category == row["category"], SysDict.key == row["key"])
+        existing = (await session.exec(query)).first()
+        if existing:
+            existing.value = row["value"]
+            existing.in_used = 1
+            existing.updated_at = row["updated_at"]
+        else:
+            session.add(SysDict(**row))
+    await session.flush()
+
+
+async def _d1_loop(repo: AppRepository, session: DBSession | D1Session, rows: list[dict[str, Any]]) -> None:
+    """The same loop on D1, where every SELECT, UPDATE and INSERT is its own request."""
+    assert isinstance(session, D1Session)
+    client = session.d1_client
+    for row in rows:
+        query = select(SysDict).where(SysDict.category == row["category"], SysDict.key == row["key"])
+        values = {"value": row["value"], "in_used": 1, "updated_at": row["updated_at"]}
+        if (await session.exec(query)).first():
+            where = (SysDict.category == row["category"]) & (SysDict.key == row["key"])
+            statement: Any = update(SysDict).where(where).values(**values)
+        else:
+            statement = insert(SysDict).values(**row, order=0)
+        _ = await client.execute_query(*client.statement_cache.compile(statement))
+
+
+async def _bulk(repo: AppRepository, session: DBSession | D1Session, rows: list[dict[str, Any]]) -> None:
+    _ = await repo.bulk_upsert(SysDict, rows, ["category", "key"], ["value", "in_used", "updated_at"], session)
+    await session.flush()
+
+
+Upsert = Callable[[AppRepository, DBSession | D1Session, list[dict[str, Any]]], Awaitable[None]]
+
+
+async def _sqlite(upsert: Upsert, size: int) -> float:
+    manager = DatabaseManager()
+    assert await manager.setup(Settings(database_url="sqlite+aiosqlite:///:memory:"))
+    assert manager.master_engine is not None
+    async with manager.master_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    repo = AppRepository(db_manager=manager)
+    _ = await repo.bulk_upsert(SysDict, _rows(size // 2, 0, "old"), ["category", "key"], ["value"])
+
+    start = time.perf_counter()
+    async with manager.get_transaction() as session:
+        await upsert(repo, session, _rows(size, size // 2, "new"))
+    elapsed = time.perf_counter() - start
+    _ = await manager.teardown()
+    return elapsed
+
+
+async def _d1(upsert: Upsert, size: int) -> tuple[float, int]:
+    stub = D1HttpStub()
+    stub.execute_script(D1_SCHEMA)
+    repo = AppRepository(db_manager=DatabaseManager())
+    session = D1Session(stub.make_client(), validate_rows=False)
+    _ = await repo.bulk_upsert(SysDict, _rows(size // 2, 0, "old"), ["category", "key"], ["value"], session)
+    stub.requests.clear()
+
+    start = time.perf_counter()
+    await upsert(repo, session, _rows(size, size // 2, "new"))
+    return time.perf_counter() - start, len(stub.requests)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    _ = parser.add_argument("--loop-max", type=int, default=1000, help="skip the row-by-row loop above this size")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'backend':<8}{'loop (ms)':>12}{'bulk (ms)':>12}{'speedup':>10}{'requests':>16}")
+    for size in args.sizes:
+        run_loop = size <= args.loop_max
+        loop = await _sqlite(_loop, size) if run_loop else None
+        bulk = await _sqlite(_bulk, size)
+        speedup = f"{loop / bulk:.1f}x" if loop else "-"
+        loop_ms = f"{loop * 1000:.1f}" if loop else "-"
+        print(f"{size:>8}  {'sqlite':<8}{loop_ms:>12}{bulk * 1000:>12.1f}{speedup:>10}")
+
+        d1_loop, loop_requests = await _d1(_d1_loop, size) if run_loop else (None, None)
+        d1_bulk, bulk_requests = await _d1(_bulk, size)
+        speedup = f"{d1_loop / d1_bulk:.1f}x" if d1_loop else "-"
+        loop_ms = f"{d1_loop * 1000:.1f}" if d1_loop else "-"
+        requests = f"{loop_requests or '-'} -> {bulk_requests}"
+        print(f"{size:>8}  {'d1':<8}{loop_ms:>12}{d1_bulk * 1000:>12.1f}{speedup:>10}{requests:>16}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
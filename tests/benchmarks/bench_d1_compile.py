@@ -0,0 +1,81 @@
+"""
+Benchmark compiling AuthRepository queries for D1: literal-bound SQL per call versus the
+`?`-parameterized statement cache.
+
+Each query is rebuilt with fresh values on every iteration, as the repository does per request.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_d1_compile.py [--iterations 2000]
+"""
+
+import argparse
+from collections.abc import Callable
+import time
+from typing import Any
+
+from sqlmodel import select
+
+from faster.core.auth.schemas import User, UserMetadata, UserProfile, UserRole
+from faster.core.database import D1StatementCache
+
+QUERIES: dict[str, Callable[[int], Any]] = {
+    "get_user_by_auth_id": lambda i: select(User).where(User.auth_id == f"auth-{i}").where(User.in_used == 1),
+    "get_user_by_email": lambda i: select(User).where(User.email == f"user{i}@example.com").where(User.in_used == 1),
+    "get_roles": lambda i: select(UserRole.role).where(UserRole.user_auth_id == f"auth-{i}", UserRole.in_used == 1),
+    "check_profile_exists": lambda i: select(UserProfile).where(UserProfile.user_auth_id == f"auth-{i}"),
+    "is_user_banned": lambda i: (
+        select(UserMetadata)
+        .where(UserMetadata.user_auth_id == f"auth-{i}")
+        .where(UserMetadata.metadata_type == "system")
+        .where(UserMetadata.key == "banned")
+        .where(UserMetadata.in_used == 1)
+    ),
+    "disabled_role_lookup": lambda i: (
+        select(UserRole)
+        .where(UserRole.user_auth_id == f"auth-{i}")
+        .where(UserRole.role == "admin")
+        .where(UserRole.in_used == 0)
+    ),
+}
+
+
+def _literal(build: Callable[[int], Any], iterations: int) -> float:
+    """Previous behaviour: render values inline on every call."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        _ = str(build(i).compile(compile_kwargs={"literal_binds": True}))
+    return time.perf_counter() - start
+
+
+def _cached(build: Callable[[int], Any], iterations: int) -> float:
+    cache = D1StatementCache()
+    start = time.perf_counter()
+    for i in range(iterations):
+        _ = cache.compile(build(i))
+    return time.perf_counter() - start
+
+
+def _build_only(build: Callable[[int], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        _ = build(i)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    print(f"{n} compilations per query; µs per query, statement construction excluded")
+    print(f"{'query':<24}{'literal':>12}{'cached':>12}{'speedup':>10}")
+    for name, build in QUERIES.items():
+        baseline = _build_only(build, n)
+        literal = (_literal(build, n) - baseline) / n * 1e6
+        cached = (_cached(build, n) - baseline) / n * 1e6
+        print(f"{name:<24}{literal:>12.1f}{cached:>12.1f}{literal / cached:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark D1 result handling on a large `select(User)`: D1's object row format mapped eagerly with
+validation, versus the raw array format mapped lazily by D1Result.
+
+Reports response size and the CPU time to decode the JSON and build the rows that get used.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_d1_results.py [--rows 10000]
+"""
+
+import argparse
+from collections.abc import Callable
+import json
+import time
+from typing import Any
+
+from sqlalchemy import Boolean, DateTime, Integer
+from sqlmodel import select
+
+from faster.core.auth.schemas import User
+from faster.core.database import D1Result, D1RowPlan
+
+STATEMENT = select(User)
+
+
+def _value(column: Any, i: int) -> Any:
+    if isinstance(column.type, DateTime):
+        return f"2024-01-{1 + i % 28:02d} 12:00:00.000000"
+    if isinstance(column.type, (Integer, Boolean)):
+        return i if column.name == "id" else 1
+    return f"{column.name.lower()}-{i}"
+
+
+def _responses(rows: int) -> tuple[str, str]:
+    columns = list(STATEMENT.selected_columns)
+    data = [[_value(column, i) for column in columns] for i in range(rows)]
+    names = [column.name for column in columns]
+    meta = {"changes": 0, "rows_read": rows}
+
+    objects = [dict(zip(names, row, strict=True)) for row in data]
+    object_body = {"success": True, "result": [{"success": True, "results": objects, "meta": meta}]}
+    raw_body = {"success": True, "result": [{"success": True, "results": {"columns": names, "rows": data}, "meta": meta}]}
+    return json.dumps(object_body), json.dumps(raw_body)
+
+
+def _eager_objects(body: str) -> int:
+    """Previous behaviour: object rows, every row validated into a model up front."""
+    plan = D1RowPlan.for_statement(STATEMENT)
+    assert plan is not None
+    keys = plan.segments[0].keys
+    results = json.loads(body)["result"][0]["results"]
+    users = [User.model_validate(dict(zip(keys, row.values(), strict=True))) for row in results]
+    return len(users)
+
+
+def _raw(consume: Callable[[D1Result], Any], validate: bool) -> Callable[[str], Any]:
+    def run(body: str) -> Any:
+        plan = D1RowPlan.for_statement(STATEMENT)
+        statement = json.loads(body)["result"][0]
+        results = statement["results"]
+        return consume(D1Result(results["rows"], results["columns"], statement["meta"], plan, validate))
+
+    return run
+
+
+def _timed(run: Callable[[str], Any], body: str) -> float:
+    start = time.perf_counter()
+    _ = run(body)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    object_body, raw_body = _responses(args.rows)
+    print(f"{args.rows} rows of {len(STATEMENT.selected_columns)} columns")
+    print(f"response size: objects {len(object_body) / 1024:.0f} KiB, raw {len(raw_body) / 1024:.0f} KiB "
+          f"({1 - len(raw_body) / len(object_body):.0%} smaller)")
+
+    cases: list[tuple[str, Callable[[str], Any], str]] = [
+        ("objects, validate all", _eager_objects, object_body),
+        ("raw, validate all", _raw(lambda r: r.all(), validate=True), raw_body),
+        ("raw, skip validation", _raw(lambda r: r.all(), validate=False), raw_body),
+        ("raw, first() only", _raw(lambda r: r.first(), validate=True), raw_body),
+    ]
+    print(f"{'mode':<24}{'cpu (ms)':>12}")
+    for name, run, body in cases:
+        print(f"{name:<24}{_timed(run, body) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark D1Session.flush: one request per row versus grouped multi-row INSERTs in a single batch.
+
+Runs against the local D1 HTTP stub with a simulated network round trip.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_d1_writes.py [--rows 1000] [--rtt-ms 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlmodel import Field, SQLModel
+
+from faster.core.database import D1Session
+from tests.core.d1_stub import D1HttpStub
+
+
+class BenchEvent(SQLModel, table=True):
+    __tablename__ = "bench_d1_events"
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: str
+    event_type: str
+    event_name: str
+
+
+DDL = "CREATE TABLE bench_d1_events (id INTEGER PRIMARY KEY, user_id TEXT, event_type TEXT, event_name TEXT)"
+
+
+def _rows(count: int) -> list[BenchEvent]:
+    return [BenchEvent(user_id=f"user-{i % 50}", event_type="auth", event_name="login") for i in range(count)]
+
+
+async def _per_row(rows: int, rtt: float) -> tuple[int, float]:
+    """Previous behaviour: one INSERT request per pending entity."""
+    stub = D1HttpStub(latency=rtt)
+    stub.execute_script(DDL)
+    client = stub.make_client()
+    start = time.perf_counter()
+    for entity in _rows(rows):
+        values = D1Session._insert_values(entity)  # pyright: ignore[reportPrivateUsage]
+        sql = f"INSERT INTO bench_d1_events ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})"
+        _ = await client.execute_query(sql, list(values.values()))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return len(stub.requests), elapsed
+
+
+async def _batched(rows: int, rtt: float) -> tuple[int, float]:
+    stub = D1HttpStub(latency=rtt)
+    stub.execute_script(DDL)
+    client = stub.make_client()
+    session = D1Session(client)
+    start = time.perf_counter()
+    session.add_all(_rows(rows))
+    await session.flush()
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return len(stub.requests), elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--rows", type=int, default=1000)
+    _ = parser.add_argument("--rtt-ms", type=float, default=20.0, help="simulated round trip per request")
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+
+    print(f"{args.rows} inserts, {args.rtt_ms:.0f} ms simulated round trip")
+    print(f"{'mode':<12}{'round trips':>14}{'wall time (s)':>16}")
+    for name, runner in (("per-row", _per_row), ("batched", _batched)):
+        requests, elapsed = await runner(args.rows, rtt)
+        print(f"{name:<12}{requests:>14}{elapsed:>16.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
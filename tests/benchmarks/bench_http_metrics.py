@@ -0,0 +1,96 @@
+"""
+Benchmark the overhead of HttpMetricsMiddleware per request, calling a minimal ASGI endpoint directly (no
+server, no routing) with and without the middleware around it.
+
+Two cases: the route template already in the scope, as set by routing, and a request answered before routing,
+whose template is found through RouterInfo. Metrics are kept in process by default; to measure multiprocess
+mode, start the benchmark with PROMETHEUS_MULTIPROC_DIR pointing at an empty directory.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_http_metrics.py [--requests 100000]
+    PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) PYTHONPATH=. python tests/benchmarks/bench_http_metrics.py
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.types import Message, Receive, Scope, Send
+
+from faster.core.auth.router_info import RouterInfo
+from faster.core.metrics import HttpMetricsMiddleware, is_multiprocess
+
+ROUTE = "/bench/items/{item_id}"
+BODY = b'{"item_id": 1}'
+
+
+class _Route:
+    path = ROUTE
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def unrouted_endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send({"type": "http.response.start", "status": 403, "headers": []})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def _receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message: Message) -> None:
+    pass
+
+
+def _router_info() -> RouterInfo:
+    app = FastAPI()
+
+    @app.get(ROUTE)
+    async def get_item(item_id: int) -> dict[str, int]:
+        return {"item_id": item_id}
+
+    router_info = RouterInfo()
+    asyncio.run(router_info.refresh_data(app))
+    _ = router_info.create_route_finder(app)
+    return router_info
+
+
+async def _time(app: Callable[[Scope, Receive, Send], Any], requests: int) -> float:
+    """Mean seconds per request."""
+    scope: Scope = {"type": "http", "method": "GET", "path": "/bench/items/1"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - start) / requests
+
+
+async def _run(requests: int, router_info: RouterInfo) -> None:
+    print(f"{'case':<16}{'bare (us)':>12}{'metrics (us)':>14}{'overhead (us)':>15}")
+    for name, app in (("routed", endpoint), ("before routing", unrouted_endpoint)):
+        wrapped = HttpMetricsMiddleware(app, router_info=router_info)
+        _ = await _time(wrapped, 1000)  # warm up the label and route caches
+        bare = await _time(app, requests)
+        measured = await _time(wrapped, requests)
+        print(f"{name:<16}{bare * 1e6:>12.2f}{measured * 1e6:>14.2f}{(measured - bare) * 1e6:>15.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--requests", type=int, default=100000, help="requests timed per case")
+    args = parser.parse_args()
+
+    router_info = _router_info()
+    print(f"{args.requests} requests, {'multiprocess' if is_multiprocess() else 'single process'} metrics")
+    asyncio.run(_run(args.requests, router_info))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the per-lookup overhead of the AuthRepository read methods with file-backed SQLite, using the
+previous write-style sessions (expire on commit, autoflush) versus the tuned read-only sessions.
+
+Every lookup opens its own session, so the numbers are dominated by session setup and teardown rather
+than by the query itself. Reports microseconds per lookup.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_readonly_sessions.py [--users 200] [--rounds 5]
+"""
+
+# pyright: reportPrivateUsage=false
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+
+from faster.core.auth.repositories import AuthRepository
+from faster.core.auth.schemas import User, UserMetadata, UserProfile, UserRole
+from faster.core.config import Settings
+from faster.core.database import DatabaseManager
+
+AUTH_TABLES = [User.__table__, UserMetadata.__table__, UserProfile.__table__, UserRole.__table__]  # type: ignore[attr-defined]
+
+
+async def _seed(manager: DatabaseManager, users: int) -> list[str]:
+    assert manager.master_engine is not None
+    async with manager.master_engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: SQLModel.metadata.create_all(sync_conn, tables=AUTH_TABLES))
+    user_ids = [f"auth-{i}" for i in range(users)]
+    async with manager.get_transaction() as session:
+        for i, user_id in enumerate(user_ids):
+            session.add(User(auth_id=user_id, aud="authenticated", role="authenticated", email=f"u{i}@example.com"))
+            session.add(UserMetadata(user_auth_id=user_id, metadata_type="user", key="name", value=f'"User {i}"'))
+            session.add(UserRole(user_auth_id=user_id, role="user"))
+    return user_ids
+
+
+Lookup = Callable[[AuthRepository, str], Awaitable[object]]
+
+LOOKUPS: list[tuple[str, Lookup]] = [
+    ("get_user_info", lambda repo, user_id: repo.get_user_info(user_id)),
+    ("get_user_by_auth_id", lambda repo, user_id: repo.get_user_by_auth_id_simple(user_id)),
+    ("profile_exists", lambda repo, user_id: repo.check_user_profile_exists(user_id)),
+    ("load_roles", lambda repo, user_id: repo._load_roles([user_id])),
+]
+
+
+async def _us_per_lookup(repo: AuthRepository, lookup: Lookup, user_ids: list[str], rounds: int) -> float:
+    for user_id in user_ids[:10]:  # warm up the connection pool
+        _ = await lookup(repo, user_id)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for user_id in user_ids:
+            _ = await lookup(repo, user_id)
+    return (time.perf_counter() - start) / (rounds * len(user_ids)) * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--users", type=int, default=200)
+    _ = parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager()
+        assert await manager.setup(Settings(database_url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"))
+        try:
+            user_ids = await _seed(manager, args.users)
+            repo = AuthRepository(db_manager=manager)
+            readonly_factory = manager.master_readonly_session
+            print(f"{args.users} users x {args.rounds} rounds")
+            print(f"{'lookup':<22}{'write-style (us)':>18}{'read-only (us)':>16}{'saved':>8}")
+            for name, lookup in LOOKUPS:
+                manager.master_readonly_session = None  # readonly sessions fall back to the master factory
+                before = await _us_per_lookup(repo, lookup, user_ids, args.rounds)
+                manager.master_readonly_session = readonly_factory
+                after = await _us_per_lookup(repo, lookup, user_ids, args.rounds)
+                print(f"{name:<22}{before:>18.1f}{after:>16.1f}{1 - after / before:>8.0%}")
+        finally:
+            _ = await manager.teardown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
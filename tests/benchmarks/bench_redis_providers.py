@@ -0,0 +1,92 @@
+"""
+Benchmark the Redis providers behind RedisClient: embedded memory store, fakeredis and a local Redis.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_redis_providers.py [--ops 20000] [--redis-url redis://localhost:6379/15]
+
+The local Redis run is skipped when the server is not reachable. Note that it flushes the selected database.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+
+import fakeredis.aioredis
+import redis.asyncio as redis
+
+from faster.core.memory_redis import MemoryRedis
+from faster.core.redis import RedisClient
+
+Workload = Callable[[RedisClient, int], Awaitable[None]]
+
+
+async def _strings(client: RedisClient, i: int) -> None:
+    _ = await client.set(f"bench:str:{i % 1000}", "x" * 64, ex=300)
+    _ = await client.get(f"bench:str:{i % 1000}")
+
+
+async def _hashes(client: RedisClient, i: int) -> None:
+    _ = await client.hset(f"bench:hash:{i % 100}", {"field": str(i), "other": "value"})
+    _ = await client.hgetall(f"bench:hash:{i % 100}")
+
+
+async def _sets(client: RedisClient, i: int) -> None:
+    _ = await client.sadd(f"bench:set:{i % 100}", str(i % 10))
+    _ = await client.smembers(f"bench:set:{i % 100}")
+
+
+async def _counters(client: RedisClient, i: int) -> None:
+    _ = await client.incr(f"bench:counter:{i % 10}")
+
+
+WORKLOADS: dict[str, Workload] = {
+    "set+get": _strings,
+    "hset+hgetall": _hashes,
+    "sadd+smembers": _sets,
+    "incr": _counters,
+}
+
+
+async def _run(client: RedisClient, ops: int) -> dict[str, float]:
+    results: dict[str, float] = {}
+    _ = await client.flushdb()
+    for name, workload in WORKLOADS.items():
+        start = time.perf_counter()
+        for i in range(ops):
+            await workload(client, i)
+        elapsed = time.perf_counter() - start
+        results[name] = ops / elapsed
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--ops", type=int, default=20000, help="iterations per workload")
+    _ = parser.add_argument("--redis-url", default="redis://localhost:6379/15", help="local Redis to compare against")
+    args = parser.parse_args()
+
+    providers: dict[str, RedisClient] = {
+        "memory": RedisClient(MemoryRedis()),
+        "fakeredis": RedisClient(fakeredis.aioredis.FakeRedis(decode_responses=True)),
+    }
+    local = RedisClient(redis.Redis.from_url(args.redis_url, decode_responses=True))
+    try:
+        _ = await local.ping()
+        providers["local"] = local
+    except Exception as e:
+        print(f"(skipping local Redis at {args.redis_url}: {e})")
+
+    table: dict[str, dict[str, float]] = {}
+    for name, client in providers.items():
+        table[name] = await _run(client, args.ops)
+        await client.close()
+
+    names = list(providers)
+    print(f"{'workload':<16}" + "".join(f"{name + ' ops/s':>20}" for name in names))
+    for workload in WORKLOADS:
+        print(f"{workload:<16}" + "".join(f"{table[name][workload]:>20,.0f}" for name in names))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
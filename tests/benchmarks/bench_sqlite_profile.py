@@ -0,0 +1,99 @@
+"""
+Benchmark concurrent reads and writes on the auth tables with file-backed SQLite, using the default
+engine versus the SQLite profile (WAL, tuned pragmas, a readonly pool and a single writer).
+
+Readers look up a user and its roles; writers record a UserAction.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_sqlite_profile.py [--tasks 32] [--ops 200] [--write-ratio 0.2]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from pathlib import Path
+import random
+import tempfile
+import time
+
+from sqlmodel import SQLModel, select
+
+from faster.core.auth.schemas import User, UserAction, UserRole
+from faster.core.config import Settings
+from faster.core.database import DatabaseManager
+
+USERS = 500
+AUTH_TABLES = [User.__table__, UserRole.__table__, UserAction.__table__]  # type: ignore[attr-defined]
+
+
+async def _seed(manager: DatabaseManager) -> None:
+    assert manager.master_engine is not None
+    async with manager.master_engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: SQLModel.metadata.create_all(sync_conn, tables=AUTH_TABLES))
+    async with manager.get_transaction() as session:
+        for i in range(USERS):
+            session.add(User(auth_id=f"auth-{i}", aud="authenticated", role="authenticated", email=f"u{i}@example.com"))
+            session.add(UserRole(user_auth_id=f"auth-{i}", role="user"))
+
+
+async def _read(manager: DatabaseManager, rng: random.Random) -> None:
+    auth_id = f"auth-{rng.randrange(USERS)}"
+    async with manager.get_session(readonly=True) as session:
+        _ = (await session.exec(select(User).where(User.auth_id == auth_id))).first()
+        _ = (await session.exec(select(UserRole.role).where(UserRole.user_auth_id == auth_id))).all()
+
+
+async def _write(manager: DatabaseManager, rng: random.Random) -> None:
+    async with manager.get_transaction() as session:
+        session.add(
+            UserAction(
+                user_auth_id=f"auth-{rng.randrange(USERS)}",
+                event_type="auth",
+                event_name="login",
+                event_source="bench",
+                timestamp=datetime.now(),
+            )
+        )
+
+
+async def _run(profile: bool, tasks: int, ops: int, write_ratio: float) -> tuple[float, int, int, int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager()
+        settings = Settings(database_url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", sqlite_profile=profile)
+        assert await manager.setup(settings)
+        await _seed(manager)
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+
+        async def worker(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(ops):
+                is_write = rng.random() < write_ratio
+                try:
+                    await (_write if is_write else _read)(manager, rng)
+                    counts["writes" if is_write else "reads"] += 1
+                except Exception:
+                    counts["errors"] += 1
+
+        start = time.perf_counter()
+        _ = await asyncio.gather(*(worker(i) for i in range(tasks)))
+        elapsed = time.perf_counter() - start
+        _ = await manager.teardown()
+        return elapsed, counts["reads"], counts["writes"], counts["errors"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--tasks", type=int, default=32, help="concurrent clients")
+    _ = parser.add_argument("--ops", type=int, default=200, help="operations per client")
+    _ = parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.tasks} clients x {args.ops} ops, {args.write_ratio:.0%} writes")
+    print(f"{'engine':<10}{'ops/s':>10}{'reads':>10}{'writes':>10}{'errors':>10}")
+    for name, profile in (("default", False), ("profile", True)):
+        elapsed, reads, writes, errors = await _run(profile, args.tasks, args.ops, args.write_ratio)
+        print(f"{name:<10}{(reads + writes) / elapsed:>10.0f}{reads:>10}{writes:>10}{errors:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
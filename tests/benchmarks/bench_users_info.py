@@ -0,0 +1,100 @@
+"""
+Benchmark loading user profiles with AuthRepository on file-backed SQLite: the previous two queries per
+user, the joined single-query get_user_info, and the batched get_users_info.
+
+Every user has two app and two user metadata entries. Reports per-user latency for each batch size.
+
+Usage:
+    PYTHONPATH=. python tests/benchmarks/bench_users_info.py [--batch-sizes 1 100 10000]
+"""
+
+# pyright: reportPrivateUsage=false
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+
+from faster.core.auth.repositories import AuthRepository
+from faster.core.auth.schemas import User, UserMetadata
+from faster.core.config import Settings
+from faster.core.database import DatabaseManager
+
+AUTH_TABLES = [User.__table__, UserMetadata.__table__]  # type: ignore[attr-defined]
+
+
+async def _seed(manager: DatabaseManager, users: int) -> list[str]:
+    assert manager.master_engine is not None
+    async with manager.master_engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: SQLModel.metadata.create_all(sync_conn, tables=AUTH_TABLES))
+    user_ids = [f"auth-{i}" for i in range(users)]
+    async with manager.get_transaction() as session:
+        for i, user_id in enumerate(user_ids):
+            session.add(User(auth_id=user_id, aud="authenticated", role="authenticated", email=f"u{i}@example.com"))
+            for metadata_type, key, value in (
+                ("app", "provider", '"email"'),
+                ("app", "providers", '["email", "google"]'),
+                ("user", "name", f'"User {i}"'),
+                ("user", "locale", '"en"'),
+            ):
+                session.add(UserMetadata(user_auth_id=user_id, metadata_type=metadata_type, key=key, value=value))
+    return user_ids
+
+
+async def _two_queries(repo: AuthRepository, user_ids: list[str]) -> int:
+    """Previous behaviour: a query for the user and another for its metadata, per user."""
+    loaded = 0
+    async with repo.session(readonly=True) as session:
+        for user_id in user_ids:
+            user = await repo._get_base_user(session, user_id)
+            if user is not None:
+                app_metadata, user_metadata = await repo._get_user_metadata_simple(session, user_id)
+                _ = repo._to_user_profile(user, app_metadata, user_metadata)
+                loaded += 1
+    return loaded
+
+
+async def _joined(repo: AuthRepository, user_ids: list[str]) -> int:
+    async with repo.session(readonly=True) as session:
+        return sum([await repo.get_user_info(user_id, session) is not None for user_id in user_ids])
+
+
+async def _batched(repo: AuthRepository, user_ids: list[str]) -> int:
+    return len(await repo.get_users_info(user_ids))
+
+
+Loader = Callable[[AuthRepository, list[str]], Awaitable[int]]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager()
+        assert await manager.setup(Settings(database_url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"))
+        user_ids = await _seed(manager, max(args.batch_sizes))
+        repo = AuthRepository(db_manager=manager)
+
+        loaders: list[tuple[str, Loader]] = [("two queries", _two_queries), ("joined", _joined), ("batched", _batched)]
+        for _, load in loaders:  # warm up statement caches and the connection pool
+            _ = await load(repo, user_ids[:10])
+        print(f"{'batch':>8}" + "".join(f"{name + ' (µs/user)':>24}" for name, _ in loaders))
+        for size in args.batch_sizes:
+            batch = user_ids[:size]
+            timings = []
+            for _, load in loaders:
+                start = time.perf_counter()
+                assert await load(repo, batch) == size
+                timings.append((time.perf_counter() - start) / size * 1e6)
+            print(f"{size:>8}" + "".join(f"{timing:>24.0f}" for timing in timings))
+        _ = await manager.teardown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Cloudflare D1 HTTP query API, backed by an in-memory sqlite3 database.
+
+It answers `POST .../d1/database/{id}/query` (and `/raw`, which returns rows as arrays) with the same
+envelope as the real API, for both single
+statements (`{"sql", "params"}`) and batches (`{"batch": [...]}`, run in one transaction), and counts
+requests so tests and benchmarks can assert on round trips. Throttling can be injected either as a queue of
+canned error statuses or as a concurrency ceiling above which requests get a 429, like Cloudflare's rate limiter.
+
+Usage:
+    stub = D1HttpStub()
+    stub.execute_script("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    client = stub.make_client()
+    await client.execute_query("SELECT * FROM t")
+"""
+
+import asyncio
+from collections import deque
+import json
+import sqlite3
+from typing import Any
+
+import httpx
+
+from faster.core.database import D1Client, D1HttpConfig, parse_d1_url
+
+STUB_D1_URL = "d1+aiosqlite://stub-database?account_id=stub-account&api_token=stub-token"
+
+
+class D1HttpStub:
+    """In-process D1 HTTP API served through `httpx.MockTransport`."""
+
+    def __init__(self, latency: float = 0.0, max_concurrent: int = 0) -> None:
+        self.latency = latency
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttled = 0
+        self._faults: deque[tuple[int, dict[str, str]]] = deque()
+        self.connection = sqlite3.connect(":memory:", isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.requests: list[dict[str, Any]] = []
+        self.statement_count = 0
+
+    # -----------------------------
+    # Helpers for tests
+    # -----------------------------
+    def execute_script(self, script: str) -> None:
+        self.connection.executescript(script)
+
+    def rows(self, sql: str, params: list[Any] | None = None) -> list[dict[str, Any]]:
+        return [dict(row) for row in self.connection.execute(sql, params or [])]
+
+    def inject_faults(self, *status_codes: int, retry_after: float | None = None) -> None:
+        """Answer the next requests with these HTTP statuses, in order, without running them."""
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self._faults.extend((status, headers) for status in status_codes)
+
+    def make_client(self, http_config: D1HttpConfig | None = None) -> D1Client:
+        """Create a D1Client in HTTP mode whose requests are answered by this stub."""
+        client = D1Client(parse_d1_url(STUB_D1_URL), http_config)
+        headers = client.http_client.headers if client.http_client else {}
+        client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler), headers=headers)
+        return client
+
+    # -----------------------------
+    # Transport
+    # -----------------------------
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self._faults:
+                status, headers = self._faults.popleft()
+                return self._error_response(status, headers)
+            if self.max_concurrent and self.in_flight > self.max_concurrent:
+                return self._error_response(429, {})
+            return self._answer(json.loads(request.content), raw=request.url.path.endswith("/raw"))
+        finally:
+            self.in_flight -= 1
+
+    def _error_response(self, status: int, headers: dict[str, str]) -> httpx.Response:
+        if status == 429:
+            self.throttled += 1
+        error = {"code": status, "message": "Too many requests" if status == 429 else "Internal error"}
+        return httpx.Response(status, headers=headers, json={"success": False, "errors": [error]})
+
+    def _answer(self, payload: dict[str, Any], raw: bool = False) -> httpx.Response:
+        self.requests.append(payload)
+
+        try:
+            if "batch" in payload:
+                result = self._run_batch(payload["batch"], raw)
+            else:
+                result = [self._run_statement(payload["sql"], payload.get("params") or [], raw)]
+        except sqlite3.Error as e:
+            return httpx.Response(200, json={"success": False, "errors": [{"code": 7500, "message": str(e)}]})
+        return httpx.Response(200, json={"success": True, "errors": [], "messages": [], "result": result})
+
+    def _run_batch(self, statements: list[dict[str, Any]], raw: bool) -> list[dict[str, Any]]:
+        _ = self.connection.execute("BEGIN")
+        try:
+            results = [self._run_statement(item["sql"], item.get("params") or [], raw) for item in statements]
+        except sqlite3.Error:
+            _ = self.connection.execute("ROLLBACK")
+            raise
+        _ = self.connection.execute("COMMIT")
+        return results
+
+    def _run_statement(self, sql: str, params: list[Any], raw: bool = False) -> dict[str, Any]:
+        self.statement_count += 1
+        cursor = self.connection.execute(sql, params)
+        fetched = cursor.fetchall()
+        results: Any
+        if raw:
+            columns = [column[0] for column in cursor.description or []]
+            results = {"columns": columns, "rows": [list(row) for row in fetched]}
+        else:
+            results = [dict(row) for row in fetched]
+        return {
+            "success": True,
+            "results": results,
+            "meta": {"changes": cursor.rowcount if cursor.rowcount > 0 else 0, "last_row_id": cursor.lastrowid},
+        }
@@ -0,0 +1,270 @@
+import asyncio
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+import uuid
+
+from prometheus_client import REGISTRY
+import pytest
+from sqlmodel import select
+
+from faster.core.auth.audit import (
+    MAX_REPLAY_ATTEMPTS,
+    REPLAY_ATTEMPTS_FIELD,
+    AuditOverflowPolicy,
+    AuditWriter,
+    AuditWriterConfig,
+)
+from faster.core.auth.repositories import AuthRepository
+from faster.core.auth.schemas import UserAction
+from faster.core.database import DatabaseManager
+from faster.core.exceptions import DBError
+
+
+def _event(user_id: str, i: int) -> dict[str, Any]:
+    return {
+        "event_type": "auth",
+        "event_name": f"event-{i}",
+        "event_source": "system",
+        "user_auth_id": user_id,
+        "event_payload": {"i": i},
+    }
+
+
+def _sample(outcome: str) -> float:
+    return REGISTRY.get_sample_value("auth_audit_events_total", {"outcome": outcome}) or 0.0
+
+
+def _repository(side_effect: Any = None) -> MagicMock:
+    repository = MagicMock(spec=AuthRepository)
+    repository.log_events = AsyncMock(side_effect=side_effect or len)
+    return repository
+
+
+class TestAuditWriter:
+    """Tests for the write-behind audit event buffer."""
+
+    @pytest.mark.asyncio
+    async def test_writes_queued_events_as_one_batch(self, db_manager: DatabaseManager) -> None:
+        """Events are kept in memory, then inserted together with the time they were queued."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        writer = AuditWriter(AuthRepository(db_manager=db_manager), AuditWriterConfig(batch_size=10))
+        queued_at = datetime(2024, 1, 1, 12)
+        assert writer.enqueue({**_event(user_id, 0), "timestamp": queued_at})
+        assert writer.enqueue(_event(user_id, 1))
+        assert writer.queued == 2
+
+        assert await writer.flush() == 2
+        assert writer.queued == 0
+        async with db_manager.get_session(readonly=True) as session:
+            actions = (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all()
+        assert sorted(action.event_name for action in actions) == ["event-0", "event-1"]
+        assert {action.event_payload for action in actions} == {'{"i": 0}', '{"i": 1}'}
+        assert queued_at in {action.timestamp for action in actions}
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_size_is_reached(self) -> None:
+        """A full batch is written at once, without waiting for the flush interval."""
+        repository = _repository()
+        writer = AuditWriter(repository, AuditWriterConfig(batch_size=3, flush_interval=60))
+        writer.start()
+        try:
+            for i in range(3):
+                _ = writer.enqueue(_event("user", i))
+            await asyncio.sleep(0.05)
+            repository.log_events.assert_awaited_once()
+            assert len(repository.log_events.await_args.args[0]) == 3
+        finally:
+            await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_flush_interval(self) -> None:
+        """A partial batch is written flush_interval seconds after its first event was queued."""
+        repository = _repository()
+        writer = AuditWriter(repository, AuditWriterConfig(batch_size=100, flush_interval=0.05))
+        writer.start()
+        try:
+            _ = writer.enqueue(_event("user", 0))
+            await asyncio.sleep(0.01)
+            repository.log_events.assert_not_awaited()
+            await asyncio.sleep(0.1)
+            repository.log_events.assert_awaited_once()
+        finally:
+            await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_writes_queued_events(self) -> None:
+        """Closing the writer writes what is still queued, in batches of batch_size."""
+        repository = _repository()
+        writer = AuditWriter(repository, AuditWriterConfig(batch_size=2, flush_interval=60))
+        writer.start()
+        for i in range(5):
+            _ = writer.enqueue(_event("user", i))
+
+        await writer.close()
+
+        assert writer.queued == 0
+        assert sum(len(call.args[0]) for call in repository.log_events.await_args_list) == 5
+
+    @pytest.mark.asyncio
+    async def test_counts_written_batches_in_the_rollups(self) -> None:
+        """With rollups, each written batch is counted in one call, at the time its events were queued."""
+        writer = AuditWriter(_repository(), AuditWriterConfig(batch_size=2, rollups=True))
+        queued_at = datetime(2024, 1, 1, 12)
+        for i in range(3):
+            _ = writer.enqueue({**_event("user", i), "timestamp": queued_at})
+
+        with patch("faster.core.auth.audit.record_rollups", new_callable=AsyncMock, return_value=True) as record:
+            assert await writer.flush() == 3
+
+        assert [len(call.args[0]) for call in record.await_args_list] == [2, 1]
+        assert {event["timestamp"] for call in record.await_args_list for event in call.args[0]} == {queued_at}
+
+    @pytest.mark.asyncio
+    async def test_drops_events_beyond_max_queue(self) -> None:
+        """With the drop policy, events that don't fit in the queue are discarded."""
+        writer = AuditWriter(_repository(), AuditWriterConfig(batch_size=10, max_queue=2))
+        assert writer.enqueue(_event("user", 0))
+        assert writer.enqueue(_event("user", 1))
+        assert writer.enqueue(_event("user", 2)) is False
+        assert writer.queued == 2
+
+    @pytest.mark.asyncio
+    async def test_spills_overflow_and_failed_writes_then_replays_them(self, tmp_path: Path) -> None:
+        """With the spill policy, overflow and failed batches go to disk and are written on a later flush."""
+        spill_path = tmp_path / f"audit_spill.{os.getpid()}.ndjson"
+        repository = _repository(side_effect=DBError("database is down"))
+        config = AuditWriterConfig(
+            batch_size=10,
+            max_queue=1,
+            overflow_policy=AuditOverflowPolicy.SPILL,
+            spill_path=str(tmp_path / "audit_spill.ndjson"),
+        )
+        writer = AuditWriter(repository, config)
+        assert writer.enqueue(_event("user", 0))
+        assert writer.enqueue(_event("user", 1))  # spilled: the queue is full
+        assert len(spill_path.read_text().splitlines()) == 1
+
+        assert await writer.flush() == 0  # the write fails, and so does the replay: both are spilled again
+        assert len(spill_path.read_text().splitlines()) == 2
+
+        repository.log_events.side_effect = len
+        assert await writer.flush() == 2
+        assert not spill_path.exists()
+        replayed = repository.log_events.await_args.args[0]
+        assert {event["event_name"] for event in replayed} == {"event-0", "event-1"}
+        assert all(isinstance(event["timestamp"], datetime) for event in replayed)
+
+    @pytest.mark.asyncio
+    async def test_replays_leftover_and_orphaned_spill_files_only(self, tmp_path: Path) -> None:
+        """Files left by an earlier replay or by a dead process are replayed; a live worker's file is not."""
+
+        def spill(name: str, event_name: str) -> None:
+            event = {**_event("user", 0), "event_name": event_name, "timestamp": datetime(2024, 1, 1).isoformat()}
+            _ = (tmp_path / name).write_text(json.dumps(event) + "\n")
+
+        dead_pid = 2**22 + 1  # above Linux's pid_max: never a running process
+        spill(f"audit_spill.{os.getpid()}.0a1b2c3d.ndjson.replaying", "leftover")
+        spill(f"audit_spill.{dead_pid}.ndjson", "orphaned")
+        spill(f"audit_spill.{os.getppid()}.ndjson", "live")
+        repository = _repository()
+        config = AuditWriterConfig(
+            overflow_policy=AuditOverflowPolicy.SPILL, spill_path=str(tmp_path / "audit_spill.ndjson")
+        )
+        writer = AuditWriter(repository, config)
+
+        assert await writer.flush() == 2
+        replayed = [event["event_name"] for call in repository.log_events.await_args_list for event in call.args[0]]
+        assert sorted(replayed) == ["leftover", "orphaned"]
+        assert [path.name for path in tmp_path.iterdir()] == [f"audit_spill.{os.getppid()}.ndjson"]
+
+    @pytest.mark.asyncio
+    async def test_a_rejected_event_does_not_take_its_batch_with_it(self) -> None:
+        """A failed batch is written in halves, and only the event the sink keeps rejecting is dropped."""
+
+        async def log_events(events: list[dict[str, Any]]) -> int:
+            if any(event["event_name"] == "event-2" for event in events):
+                raise DBError("value too long")
+            return len(events)
+
+        writer = AuditWriter(_repository(side_effect=log_events), AuditWriterConfig(batch_size=8))
+        for i in range(8):
+            _ = writer.enqueue(_event("user", i))
+        dropped = _sample("dropped")
+
+        assert await writer.flush() == 7
+        assert _sample("dropped") == dropped + 1
+
+    @pytest.mark.asyncio
+    async def test_replay_skips_a_truncated_line_and_counts_events_once(self, tmp_path: Path) -> None:
+        """A line torn by a crash is skipped; replayed events are counted as replayed, not also as written."""
+        event = {**_event("user", 0), "timestamp": datetime(2024, 1, 1).isoformat()}
+        spill_path = tmp_path / f"audit_spill.{os.getpid()}.ndjson"
+        _ = spill_path.write_text(json.dumps(event) + "\n" + json.dumps(event)[:20])
+        config = AuditWriterConfig(
+            overflow_policy=AuditOverflowPolicy.SPILL, spill_path=str(tmp_path / "audit_spill.ndjson")
+        )
+        writer = AuditWriter(_repository(), config)
+        before = {outcome: _sample(outcome) for outcome in ("written", "replayed", "malformed")}
+
+        assert await writer.flush() == 1
+
+        assert list(tmp_path.iterdir()) == []
+        after = {outcome: _sample(outcome) - count for outcome, count in before.items()}
+        assert after == {"written": 0, "replayed": 1, "malformed": 1}
+        assert await writer.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_an_event_that_always_fails_is_dead_lettered(self, tmp_path: Path) -> None:
+        """Once its replay was rejected MAX_REPLAY_ATTEMPTS times while others were written, an event is set aside."""
+
+        async def log_events(events: list[dict[str, Any]]) -> int:
+            if any(event["event_name"] == "bad" for event in events):
+                raise DBError("violates check constraint")
+            return len(events)
+
+        config = AuditWriterConfig(
+            overflow_policy=AuditOverflowPolicy.SPILL, spill_path=str(tmp_path / "audit_spill.ndjson")
+        )
+        writer = AuditWriter(_repository(side_effect=log_events), config)
+        _ = writer.enqueue({**_event("user", 0), "event_name": "bad"})
+        spill_path = tmp_path / f"audit_spill.{os.getpid()}.ndjson"
+        dead_letter = tmp_path / f"audit_spill.dead-letter.{os.getpid()}.ndjson"
+
+        for i in range(MAX_REPLAY_ATTEMPTS):
+            assert not dead_letter.exists()
+            _ = writer.enqueue(_event("user", i))
+            assert await writer.flush() == 1
+
+        assert not spill_path.exists()
+        [dead] = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+        assert dead["event_name"] == "bad"
+        assert dead[REPLAY_ATTEMPTS_FIELD] == MAX_REPLAY_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_replays_while_the_sink_is_down_are_not_counted(self, tmp_path: Path) -> None:
+        """Events are spilled again without using up attempts when nothing at all can be written."""
+        config = AuditWriterConfig(
+            overflow_policy=AuditOverflowPolicy.SPILL, spill_path=str(tmp_path / "audit_spill.ndjson")
+        )
+        writer = AuditWriter(_repository(side_effect=DBError("database is down")), config)
+        _ = writer.enqueue(_event("user", 0))
+
+        for _ in range(MAX_REPLAY_ATTEMPTS + 1):
+            assert await writer.flush() == 0
+
+        [spilled] = [
+            json.loads(line) for line in (tmp_path / f"audit_spill.{os.getpid()}.ndjson").read_text().splitlines()
+        ]
+        assert spilled[REPLAY_ATTEMPTS_FIELD] == 0
+
+    def test_events_are_timestamped_in_utc_like_the_column_default(self) -> None:
+        writer = AuditWriter(_repository(), AuditWriterConfig())
+        before = datetime.now(timezone.utc).replace(tzinfo=None)
+        assert writer.enqueue(_event("user", 0))
+        queued_at = writer._queue[0]["timestamp"]  # pyright: ignore[reportPrivateUsage]
+        assert queued_at.tzinfo is None
+        assert before <= queued_at <= datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,23 +1,35 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
 import contextlib
 from datetime import datetime
 import logging
 import random
 import string
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 import uuid
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import delete
+from sqlalchemy import create_engine, delete, event
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateTable
 from sqlmodel import select
 
 from faster.core.auth.models import UserProfileData
 from faster.core.auth.repositories import AuthRepository
-from faster.core.auth.schemas import User, UserIdentity, UserProfile, UserRole
+from faster.core.auth.schemas import User, UserAction, UserIdentity, UserProfile, UserRole
 from faster.core.auth.schemas import UserMetadata as UserMetadataSchema
-from faster.core.database import DatabaseManager, DBSession
+from faster.core.database import (
+    D1Session,
+    DatabaseManager,
+    DBSession,
+    HotQuery,
+    batch_loader_scope,
+    unit_of_work,
+)
 from faster.core.exceptions import DBError
+from tests.core.d1_stub import D1HttpStub
 
 logger = logging.getLogger(__name__)
 
@@ -300,11 +312,14 @@ class TestAuthRepository:
         self, auth_repository: AuthRepository, mock_session: MagicMock
     ) -> None:
         """Test _get_user_info_impl returns None when user not found."""
-        with patch.object(auth_repository, "_get_base_user", AsyncMock(return_value=None)) as mock_base_user:
-            result = await auth_repository._get_user_info_impl(mock_session, "non-existent-user")  # type: ignore[reportPrivateUsage, unused-ignore]
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        mock_session.exec = AsyncMock(return_value=mock_result)
 
-            assert result is None
-            mock_base_user.assert_awaited_once_with(mock_session, "non-existent-user")
+        result = await auth_repository._get_user_info_impl(mock_session, "non-existent-user")  # type: ignore[reportPrivateUsage, unused-ignore]
+
+        assert result is None
+        mock_session.exec.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_get_base_user_found(
@@ -891,6 +906,278 @@ class TestAuthRepository:
 
         logger.info("Test completed successfully - edge cases handled correctly")
 
+    @staticmethod
+    @contextlib.contextmanager
+    def _count_statements(db_manager: DatabaseManager) -> Iterator[list[str]]:
+        assert db_manager.master_engine is not None
+        engine = db_manager.master_engine.sync_engine
+        statements: list[str] = []
+
+        def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            statements.append(statement.split(maxsplit=1)[0])
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    @pytest.mark.asyncio
+    async def test_set_roles_for_users_applies_one_diff(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Roles of several users are reconciled with one select, one update and one insert."""
+        user_a, user_b, user_c = (f"test-user-{uuid.uuid4()}" for _ in range(3))
+        assert await auth_repository.set_roles(user_a, ["admin", "user"])
+        assert await auth_repository.set_roles(user_b, ["user", "old"])
+        assert await auth_repository.set_roles(user_b, ["user"])
+
+        with self._count_statements(db_manager) as statements:
+            result = await auth_repository.set_roles_for_users(
+                {user_a: ["admin", "editor"], user_b: ["user", "old"], user_c: ["viewer", "viewer"]}
+            )
+        assert result is True
+        assert statements == ["SELECT", "UPDATE", "INSERT"]
+
+        assert set(await auth_repository.get_roles(user_a)) == {"admin", "editor"}
+        assert set(await auth_repository.get_roles(user_b)) == {"user", "old"}
+        assert await auth_repository.get_roles(user_c) == ["viewer"]
+
+        # Nothing to change: only the current rows are read
+        with self._count_statements(db_manager) as statements:
+            assert await auth_repository.set_roles_for_users({user_a: ["admin", "editor"]})
+        assert statements == ["SELECT"]
+
+    @pytest.mark.asyncio
+    async def test_set_roles_for_users_keeps_others_when_asked(self, auth_repository: AuthRepository) -> None:
+        user_a = f"test-user-{uuid.uuid4()}"
+        assert await auth_repository.set_roles(user_a, ["admin"])
+
+        assert await auth_repository.set_roles_for_users({user_a: ["user"]}, disable_others=False)
+        assert set(await auth_repository.get_roles(user_a)) == {"admin", "user"}
+
+        assert await auth_repository.set_roles_for_users({}) is True
+        with pytest.raises(ValueError, match="User ID cannot be empty"):
+            _ = await auth_repository.set_roles_for_users({" ": ["user"]})
+
+    @staticmethod
+    def _profile(user_id: str, index: int) -> UserProfileData:
+        return UserProfileData(
+            id=user_id,
+            aud="authenticated",
+            role="authenticated",
+            email=f"user{index}@example.com",
+            created_at=datetime.now(),
+            app_metadata={"provider": "email", "index": index},
+            user_metadata={"name": f"User {index}"} if index % 2 else {},
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_user_info_loads_user_and_metadata_in_one_query(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        user_id = f"test-user-{uuid.uuid4()}"
+        assert await auth_repository.set_user_info(self._profile(user_id, 1))
+
+        with self._count_statements(db_manager) as statements:
+            profile = await auth_repository.get_user_info(user_id)
+        assert statements == ["SELECT"]
+        assert profile is not None
+        assert profile.email == "user1@example.com"
+        assert profile.app_metadata == {"provider": "email", "index": 1}
+        assert profile.user_metadata == {"name": "User 1"}
+
+        # A user without active metadata still loads through the outer join
+        async with auth_repository.transaction() as session:
+            _ = await auth_repository.soft_delete("AUTH_USER_METADATA", {"C_USER_AUTH_ID": user_id}, session)
+        profile = await auth_repository.get_user_info(user_id)
+        assert profile is not None
+        assert (profile.app_metadata, profile.user_metadata) == ({}, {})
+
+    @pytest.mark.asyncio
+    async def test_hot_user_info_matches_orm_path(self, auth_repository: AuthRepository) -> None:
+        user_id = f"test-user-{uuid.uuid4()}"
+        assert await auth_repository.set_user_info(self._profile(user_id, 1))
+        expected = await auth_repository.get_user_info(user_id)
+
+        # Run the hot query's statement through the session, as asyncpg would run its compiled SQL
+        async def fetch_hot(session: DBSession, query: HotQuery, **values: Any) -> list[Any]:
+            return list((await session.execute(query.statement, values)).all())  # pyright: ignore[reportDeprecated]
+
+        with patch.object(auth_repository, "fetch_hot", side_effect=fetch_hot) as mock_fetch:
+            assert await auth_repository.get_user_info(user_id) == expected
+            assert await auth_repository.get_user_info("missing-user") is None
+        assert mock_fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hot_roles_query_is_used_without_query_cache(self, auth_repository: AuthRepository) -> None:
+        rows = [("user-1", "admin"), ("user-1", "user"), ("user-2", "user")]
+        with patch.object(auth_repository, "fetch_hot", AsyncMock(return_value=rows)) as mock_fetch:
+            roles = await auth_repository._load_roles(["user-1", "user-2"])  # type: ignore[reportPrivateUsage, unused-ignore]
+        assert roles == {"user-1": ["admin", "user"], "user-2": ["user"]}
+        assert mock_fetch.await_args is not None
+        assert mock_fetch.await_args.kwargs == {"user_ids": ["user-1", "user-2"]}
+
+    @pytest.mark.asyncio
+    async def test_get_users_info_batches_into_two_queries(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        user_ids = [f"test-user-{uuid.uuid4()}" for _ in range(5)]
+        for index, user_id in enumerate(user_ids):
+            assert await auth_repository.set_user_info(self._profile(user_id, index))
+        missing = f"missing-{uuid.uuid4()}"
+
+        with self._count_statements(db_manager) as statements:
+            profiles = await auth_repository.get_users_info([user_ids[3], missing, *user_ids, user_ids[0]])
+        assert statements == ["SELECT", "SELECT"]
+
+        assert list(profiles) == [user_ids[3], user_ids[0], user_ids[1], user_ids[2], user_ids[4]]
+        for index, user_id in enumerate(user_ids):
+            assert profiles[user_id] == await auth_repository.get_user_info(user_id)
+            assert profiles[user_id].app_metadata["index"] == index
+
+        assert await auth_repository.get_users_info([]) == {}
+        with pytest.raises(ValueError, match="User ID cannot be empty"):
+            _ = await auth_repository.get_users_info([user_ids[0], ""])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_are_batched(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Lookups gathered in one tick share one IN (...) query per kind."""
+        user_ids = [f"test-user-{uuid.uuid4()}" for _ in range(3)]
+        for index, user_id in enumerate(user_ids):
+            assert await auth_repository.set_user_info(self._profile(user_id, index))
+            assert await auth_repository.set_roles(user_id, ["user", f"role-{index}"])
+        missing = f"missing-{uuid.uuid4()}"
+
+        with self._count_statements(db_manager) as statements:
+            roles = await asyncio.gather(*(auth_repository.get_roles(u) for u in [*user_ids, missing, user_ids[0]]))
+            users = await asyncio.gather(*(auth_repository.get_user_by_auth_id_simple(u) for u in [*user_ids, missing]))
+        assert statements == ["SELECT", "SELECT"]
+
+        assert [set(r) for r in roles] == [
+            {"user", "role-0"},
+            {"user", "role-1"},
+            {"user", "role-2"},
+            set(),
+            {"user", "role-0"},
+        ]
+        assert [user.auth_id if user else None for user in users] == [*user_ids, None]
+
+        # Outside a loader scope nothing is kept once the batch resolves
+        with self._count_statements(db_manager) as statements:
+            _ = await auth_repository.get_roles(user_ids[0])
+        assert statements == ["SELECT"]
+
+    @pytest.mark.asyncio
+    async def test_loader_scope_memoizes_until_write(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Within a request scope repeated lookups hit the memo, and writes drop the affected users."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        assert await auth_repository.set_user_info(self._profile(user_id, 1))
+        assert await auth_repository.set_roles(user_id, ["user"])
+
+        with batch_loader_scope():
+            with self._count_statements(db_manager) as statements:
+                for _ in range(3):
+                    assert await auth_repository.get_roles(user_id) == ["user"]
+                    user = await auth_repository.get_user_by_auth_id_simple(user_id)
+                    assert user is not None
+            assert statements == ["SELECT", "SELECT"]
+
+            roles = await auth_repository.get_roles(user_id)
+            roles.append("mutated")
+            assert await auth_repository.get_roles(user_id) == ["user"]
+
+            assert await auth_repository.set_roles(user_id, ["admin"])
+            assert await auth_repository.get_roles(user_id) == ["admin"]
+            assert await auth_repository.ban_user(user_id, "admin-user")
+            assert await auth_repository.get_user_by_auth_id_simple(user_id) is None
+
+    async def _request_flow(self, auth_repository: AuthRepository, user_id: str) -> None:
+        """The repository calls of one authenticated request."""
+        _ = await auth_repository.check_user_profile_exists(user_id)
+        _ = await auth_repository.should_update_user_in_db(user_id)
+        assert await auth_repository.get_user_info(user_id) is not None
+        assert await auth_repository.get_roles(user_id) == ["user"]
+        assert await auth_repository.log_event("auth", "login", "test", user_auth_id=user_id)
+        assert await auth_repository.log_event("auth", "refresh", "test", user_auth_id=user_id)
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_shares_one_checkout_per_block(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Calls nested in one block share its transaction, instead of a checkout per call."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        assert await auth_repository.set_user_info(self._profile(user_id, 1))
+        assert await auth_repository.set_roles(user_id, ["user"])
+
+        async with unit_of_work(db_manager, shared=False) as per_call:
+            await self._request_flow(auth_repository, user_id)
+        async with unit_of_work(db_manager) as shared:
+            await self._request_flow(auth_repository, user_id)
+            before = shared.checkouts
+            async with db_manager.get_transaction() as session:
+                assert await auth_repository.log_event("auth", "login", "test", user_auth_id=user_id)
+                assert await auth_repository.set_roles(user_id, ["user", "admin"])
+                # Reads after a write go to the write transaction and see it
+                async with db_manager.get_session(readonly=True) as read:
+                    assert read is session
+                assert shared.in_transaction
+            assert not shared.in_transaction
+
+        assert per_call.checkouts >= 6
+        assert shared.checkouts - before == 1
+        async with db_manager.get_session(readonly=True) as session:
+            actions = (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all()
+        assert len(actions) == 5
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_commits_per_block_and_rolls_back_on_error(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """A failed nested block only undoes its own savepoint; a failed outermost block undoes itself."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        async with unit_of_work(db_manager), db_manager.get_transaction():
+            assert await auth_repository.set_user_info(self._profile(user_id, 1))
+            with pytest.raises(DBError):
+                async with db_manager.get_transaction() as session:
+                    session.add(UserRole(user_auth_id=user_id, role="doomed"))
+                    await session.flush()
+                    raise RuntimeError("boom")
+            assert await auth_repository.set_roles(user_id, ["user"])
+        assert await auth_repository.get_roles(user_id) == ["user"]
+
+        other_id = f"test-user-{uuid.uuid4()}"
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(db_manager):
+                assert await auth_repository.set_user_info(self._profile(other_id, 2))  # committed on its own
+                with pytest.raises(DBError):
+                    async with db_manager.get_transaction():
+                        assert await auth_repository.set_roles(other_id, ["admin"])
+                        raise RuntimeError("block failed")
+                raise RuntimeError("request failed")
+        assert await auth_repository.get_user_by_auth_id_simple(other_id) is not None
+        assert "admin" not in await auth_repository.get_roles(other_id)
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_is_not_shared_across_tasks(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Concurrent tasks get their own sessions, and blocks after completion run as before."""
+        user_ids = [f"test-user-{uuid.uuid4()}" for _ in range(3)]
+        for index, user_id in enumerate(user_ids):
+            assert await auth_repository.set_user_info(self._profile(user_id, index))
+
+        async with unit_of_work(db_manager) as unit:
+            infos = await asyncio.gather(*(auth_repository.get_user_info(u) for u in user_ids))
+            assert [info.id if info else None for info in infos] == user_ids
+            await unit.complete()
+            assert await auth_repository.log_event("auth", "logout", "test", user_auth_id=user_ids[0])
+        assert unit.completed
+
     @pytest.mark.asyncio
     async def test_set_user_info_ensures_default_role(
         self, auth_repository: AuthRepository, db_session: DBSession
@@ -960,3 +1247,101 @@ class TestAuthRepository:
         assert len(roles) == 2
 
         logger.info(f"User {user_id} preserved existing roles: {roles}")
+
+    @pytest.mark.asyncio
+    async def test_log_events_inserts_all_events_in_one_transaction(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """log_events writes the whole batch, serializing payloads like log_event does."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        events: list[dict[str, Any]] = [
+            {"event_type": "auth", "event_name": f"event-{i}", "event_source": "system", "user_auth_id": user_id}
+            for i in range(3)
+        ]
+        events[0]["event_payload"] = {"k": "v"}
+
+        assert await auth_repository.log_events([]) == 0
+        assert await auth_repository.log_events(events) == 3
+
+        async with db_manager.get_session(readonly=True) as session:
+            actions = (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all()
+        assert sorted(action.event_name for action in actions) == ["event-0", "event-1", "event-2"]
+        assert sorted(str(action.event_payload) for action in actions) == ["None", "None", '{"k": "v"}']
+        assert all(action.processing_status == "pending" for action in actions)
+
+    async def _seed_actions(self, db_manager: DatabaseManager, user_id: str) -> list[tuple[datetime, int]]:
+        """Six actions over three timestamps (two per timestamp), returned as (timestamp, id) in export order."""
+        async with db_manager.get_transaction() as session:
+            session.add_all(
+                [
+                    UserAction(
+                        user_auth_id=user_id,
+                        event_type="auth" if i % 3 else "admin",
+                        event_name=f"event-{i}",
+                        event_source="test",
+                        timestamp=datetime(2024, 1, 3 - i // 2),
+                    )
+                    for i in range(6)
+                ]
+            )
+        async with db_manager.get_session(readonly=True) as session:
+            actions = (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all()
+        return sorted((action.timestamp, cast(int, action.id)) for action in actions)
+
+    @pytest.mark.asyncio
+    async def test_stream_user_actions_in_keyset_order_and_resumes(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """Actions stream in (timestamp, id) order, filtered, and resume strictly after the given key."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        keys = await self._seed_actions(db_manager, user_id)
+
+        streamed = [
+            (action.timestamp, action.id)
+            async for action in auth_repository.stream_user_actions(user_auth_id=user_id, batch_size=2)
+        ]
+        assert streamed == keys
+
+        resumed = [
+            (action.timestamp, action.id)
+            async for action in auth_repository.stream_user_actions(user_auth_id=user_id, after=keys[2])
+        ]
+        assert resumed == keys[3:]
+
+        filtered = [
+            action.event_name
+            async for action in auth_repository.stream_user_actions(
+                user_auth_id=user_id, event_type="auth", since=datetime(2024, 1, 2), until=datetime(2024, 1, 3)
+            )
+        ]
+        assert filtered == ["event-2"]
+
+    @pytest.mark.asyncio
+    async def test_stream_user_actions_pages_by_keyset_on_d1(
+        self, auth_repository: AuthRepository, db_manager: DatabaseManager
+    ) -> None:
+        """D1 has no cursors: the export is read in keyset pages of batch_size rows instead."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        keys = await self._seed_actions(db_manager, user_id)
+        stub = D1HttpStub()
+        table = CreateTable(UserAction.__table__)  # type: ignore[attr-defined]
+        stub.execute_script(str(table.compile(dialect=create_engine("sqlite://").dialect)))
+        async with db_manager.get_session(readonly=True) as session:
+            for action in (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all():
+                stub.connection.execute(
+                    'INSERT INTO "AUTH_USER_ACTION" (id, "C_USER_AUTH_ID", "C_EVENT_TYPE", "C_EVENT_NAME", '
+                    '"C_EVENT_SOURCE", "D_TIMESTAMP") VALUES (?, ?, ?, ?, ?, ?)',
+                    [action.id, user_id, action.event_type, action.event_name, "test", action.timestamp.isoformat(" ")],
+                )
+
+        @contextlib.asynccontextmanager
+        async def d1_session(readonly: bool = False) -> AsyncIterator[D1Session]:
+            yield D1Session(stub.make_client(), readonly=readonly)
+
+        with patch.object(auth_repository, "session", d1_session):
+            streamed = [
+                (action.timestamp, action.id) async for action in auth_repository.stream_user_actions(batch_size=4)
+            ]
+
+        assert streamed == keys
+        assert len(stub.requests) == 2
@@ -0,0 +1,124 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+import pytest
+
+from faster.core.auth.rollups import (
+    MAX_QUERY_BUCKETS,
+    RollupResolution,
+    compact_rollups,
+    compact_rollups_periodically,
+    count_unique_users,
+    query_rollups,
+    record_rollup,
+    record_rollups,
+)
+from faster.core.memory_redis import MemoryRedis
+from faster.core.redis import RedisClient
+
+DAY = datetime(2024, 3, 10)
+
+
+@pytest.fixture(params=["memory", "fake"])
+def redis(request: pytest.FixtureRequest) -> Iterator[RedisClient]:
+    """A private keyspace for each test, on both the memory provider and fakeredis (real HyperLogLogs)."""
+    store = MemoryRedis() if request.param == "memory" else fakeredis.aioredis.FakeRedis(decode_responses=True)
+    client = RedisClient(store)
+    with patch("faster.core.auth.rollups.get_redis", return_value=client):
+        yield client
+
+
+async def _record_day() -> None:
+    """Logins of three users at 09:00-09:01, one admin action at 15:30, on DAY."""
+    for minute, user_id in ((0, "alice"), (0, "bob"), (1, "alice"), (1, "carol")):
+        at = DAY + timedelta(hours=9, minutes=minute, seconds=30)
+        assert await record_rollup("auth", "login", "supabase", user_id, at=at)
+    at = DAY + timedelta(hours=15, minutes=30)
+    assert await record_rollup("admin", "user_banned", "admin_action", "alice", at=at)
+
+
+@pytest.mark.asyncio
+class TestAuditRollups:
+    """Tests for the Redis rollups of audit events."""
+
+    async def test_counts_per_minute_and_hour_with_filters(self, redis: RedisClient) -> None:
+        await _record_day()
+
+        minutes = await query_rollups(DAY + timedelta(hours=9), DAY + timedelta(hours=9, minutes=3))
+        assert [bucket["count"] for bucket in minutes] == [2, 2, 0]
+        assert minutes[0]["start"] == DAY + timedelta(hours=9)
+        assert minutes[0]["events"] == {"auth|login|supabase": 2}
+
+        hours = await query_rollups(DAY, DAY + timedelta(days=1), RollupResolution.HOUR, event_type="admin")
+        assert len(hours) == 24
+        assert [(bucket["start"].hour, bucket["count"]) for bucket in hours if bucket["count"]] == [(15, 1)]
+
+    async def test_counts_unique_users(self, redis: RedisClient) -> None:
+        await _record_day()
+
+        assert await count_unique_users(DAY, DAY + timedelta(days=1), "auth") == 3
+        assert await count_unique_users(DAY, DAY + timedelta(days=1), "auth", "logout") == 0
+        assert await count_unique_users(DAY + timedelta(hours=10), DAY + timedelta(days=1), "admin") == 1
+
+    async def test_compacts_hours_into_days(self, redis: RedisClient) -> None:
+        await _record_day()
+        # Before compaction, a day is summed from its hours
+        days = await query_rollups(DAY, DAY + timedelta(days=1), RollupResolution.DAY)
+        assert [bucket["count"] for bucket in days] == [5]
+
+        compacted = await compact_rollups(today=DAY + timedelta(days=1, hours=2))
+        assert RollupResolution.DAY.bucket(DAY) in compacted
+        assert await compact_rollups(today=DAY + timedelta(days=1, hours=3)) == []
+
+        # Once compacted, days are read from their own buckets, even when the hours are gone
+        _ = await redis.delete(*(await redis.client.keys("audit:*:hour:*")))
+        days = await query_rollups(DAY - timedelta(days=1), DAY + timedelta(days=1), RollupResolution.DAY)
+        assert [bucket["count"] for bucket in days] == [0, 5]
+        assert days[1]["events"]["admin|user_banned|admin_action"] == 1
+        assert await count_unique_users(DAY, DAY + timedelta(days=1), "auth") == 3
+        assert await count_unique_users(DAY, DAY + timedelta(days=1), "auth", "login") == 3
+
+    async def test_records_a_batch_in_one_call(self, redis: RedisClient) -> None:
+        """A batch of events is counted at each event's own timestamp, in one pipelined call."""
+        events = [
+            {
+                "event_type": "auth",
+                "event_name": "login",
+                "event_source": "supabase",
+                "user_auth_id": user_id,
+                "timestamp": at,
+            }
+            for user_id, at in (("alice", DAY), ("bob", DAY), ("alice", DAY + timedelta(hours=2)))
+        ]
+        with patch.object(redis, "pipeline", wraps=redis.pipeline) as pipeline:
+            assert await record_rollups(events)
+        pipeline.assert_awaited_once()
+
+        hours = await query_rollups(DAY, DAY + timedelta(hours=3), RollupResolution.HOUR)
+        assert [bucket["count"] for bucket in hours] == [2, 0, 1]
+        assert await count_unique_users(DAY, DAY + timedelta(hours=3), "auth", "login") == 2
+
+    async def test_rejects_too_many_buckets(self, redis: RedisClient) -> None:
+        with pytest.raises(ValueError, match="buckets requested"):
+            _ = await query_rollups(DAY, DAY + timedelta(minutes=MAX_QUERY_BUCKETS + 1))
+        with pytest.raises(ValueError, match="buckets requested"):
+            _ = await count_unique_users(DAY, DAY + timedelta(hours=MAX_QUERY_BUCKETS + 1), "auth")
+        assert await count_unique_users(DAY, DAY + timedelta(hours=MAX_QUERY_BUCKETS), "auth") == 0
+
+    async def test_one_worker_compacts_per_interval(self, redis: RedisClient) -> None:
+        """Workers running the periodic compaction together compact once per interval, not once each."""
+        with patch("faster.core.auth.rollups.compact_rollups", new_callable=AsyncMock) as compact:
+            workers = [asyncio.create_task(compact_rollups_periodically(0.05)) for _ in range(3)]
+            await asyncio.sleep(0.12)
+            for worker in workers:
+                _ = worker.cancel()
+            _ = await asyncio.gather(*workers, return_exceptions=True)
+
+        compact.assert_awaited_once()
+
+    async def test_redis_errors_are_not_raised(self) -> None:
+        with patch("faster.core.auth.rollups.get_redis", side_effect=RuntimeError("no redis")):
+            assert await record_rollup("auth", "login", "supabase", "alice") is False
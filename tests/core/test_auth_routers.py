@@ -1,5 +1,9 @@
-from datetime import datetime
-from typing import cast
+from collections.abc import AsyncGenerator
+import csv
+from datetime import datetime, timedelta
+import io
+import json
+from typing import Any, cast
 from unittest.mock import AsyncMock, patch
 
 from fastapi import FastAPI, Request, status
@@ -8,7 +12,9 @@ import pytest
 
 from faster.core.auth.middlewares import get_current_user
 from faster.core.auth.models import UserProfileData
-from faster.core.auth.routers import router
+from faster.core.auth.rollups import RollupResolution
+from faster.core.auth.routers import EXPORT_CHUNK_ROWS, router
+from faster.core.auth.schemas import UserAction
 from faster.core.auth.services import AuthService
 
 
@@ -1025,3 +1031,105 @@ class TestAuthRouters:
                 assert isinstance(data["data"], dict)
                 assert data["data"]["user_id"] == "user-123"
                 assert data["data"]["email"] == "test@example.com"
+
+    def _actions(self, count: int) -> list[UserAction]:
+        return [
+            UserAction(
+                id=i + 1,
+                user_auth_id="user-123",
+                event_type="auth",
+                event_name="login",
+                event_source="test",
+                timestamp=datetime(2024, 1, 1) + timedelta(seconds=i),
+            )
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_export_user_actions_streams_ndjson_and_csv(self, client: TestClient) -> None:
+        """The export is streamed in chunks, and the stream is closed once the response is written."""
+        mock_user = self.create_mock_user()
+        cast(FastAPI, client.app).dependency_overrides[get_current_user] = lambda: mock_user
+        closed: list[bool] = []
+
+        def stream(**kwargs: Any) -> AsyncGenerator[UserAction, None]:
+            async def actions() -> AsyncGenerator[UserAction, None]:
+                try:
+                    for action in self._actions(EXPORT_CHUNK_ROWS + 2):
+                        yield action
+                finally:
+                    closed.append(True)
+
+            return actions()
+
+        service = AuthService.get_instance()
+        with (
+            patch.object(service, "stream_user_actions", side_effect=stream) as mock_stream,
+            patch("faster.core.auth.routers.log_event", new_callable=AsyncMock),
+        ):
+            response = client.get(
+                "/auth/actions/export",
+                params={"user_id": "user-123", "after_timestamp": "2024-01-01T00:00:00", "after_id": 1},
+            )
+            csv_response = client.get("/auth/actions/export", params={"format": "csv"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == EXPORT_CHUNK_ROWS + 2
+        assert lines[-1]["id"] == EXPORT_CHUNK_ROWS + 2
+        assert lines[0]["timestamp"] == "2024-01-01T00:00:00"
+        assert mock_stream.call_args_list[0].kwargs["after"] == (datetime(2024, 1, 1), 1)
+
+        assert csv_response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(csv_response.text)))
+        assert len(rows) == EXPORT_CHUNK_ROWS + 2
+        assert rows[1]["event_name"] == "login"
+        assert closed == [True, True]
+
+    @pytest.mark.asyncio
+    async def test_export_user_actions_requires_complete_cursor(self, client: TestClient) -> None:
+        """Resuming needs both the timestamp and the id of the last row received."""
+        mock_user = self.create_mock_user()
+        cast(FastAPI, client.app).dependency_overrides[get_current_user] = lambda: mock_user
+
+        response = client.get("/auth/actions/export", params={"after_id": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_get_user_action_rollups(self, client: TestClient) -> None:
+        """Counts per bucket come from the rollups, with unique users when an event type is given."""
+        mock_user = self.create_mock_user()
+        cast(FastAPI, client.app).dependency_overrides[get_current_user] = lambda: mock_user
+        buckets = [
+            {"start": datetime(2024, 1, 1, 9), "count": 3, "events": {"auth|login|supabase": 3}},
+            {"start": datetime(2024, 1, 1, 10), "count": 1, "events": {"auth|login|supabase": 1}},
+        ]
+
+        with (
+            patch("faster.core.auth.routers.query_rollups", new_callable=AsyncMock, return_value=buckets) as query,
+            patch("faster.core.auth.routers.count_unique_users", new_callable=AsyncMock, return_value=2),
+        ):
+            response = client.get(
+                "/auth/actions/rollups",
+                params={
+                    "since": "2024-01-01T09:00:00",
+                    "until": "2024-01-01T11:00:00",
+                    "resolution": "hour",
+                    "event_type": "auth",
+                },
+            )
+
+        data = response.json()["data"]
+        assert data["total"] == 4
+        assert data["unique_users"] == 2
+        assert data["buckets"][0]["start"] == "2024-01-01T09:00:00"
+        assert query.await_args is not None
+        assert query.await_args.args[2] == RollupResolution.HOUR
+
+        response = client.get(
+            "/auth/actions/rollups", params={"since": "2024-01-01T09:00:00", "until": "2024-01-01T08:00:00"}
+        )
+        assert response.json()["status"] == "failed"
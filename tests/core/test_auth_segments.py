@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from faster.core.auth.repositories import AuthRepository
+from faster.core.auth.schemas import UserAction
+from faster.core.auth.segments import (
+    CHECKPOINT_SUFFIX,
+    INDEX_SUFFIX,
+    SEGMENT_PREFIX,
+    SEGMENT_SUFFIX,
+    FrameIndex,
+    SegmentStore,
+    SegmentStoreConfig,
+)
+from faster.core.database import DatabaseManager
+
+START = datetime(2024, 1, 1)
+
+
+def _events(user_id: str, first: int, count: int) -> list[dict[str, Any]]:
+    """`count` events of `user_id`, one minute apart from START + `first` minutes."""
+    return [
+        {
+            "event_type": "auth",
+            "event_name": f"event-{i}",
+            "event_source": "api",
+            "user_auth_id": user_id,
+            "event_payload": {"i": i},
+            "timestamp": START + timedelta(minutes=i),
+        }
+        for i in range(first, first + count)
+    ]
+
+
+async def _store(tmp_path: Path, **config: Any) -> SegmentStore:
+    store = SegmentStore(SegmentStoreConfig(directory=str(tmp_path), fsync=False, **config))
+    await store.open()
+    return store
+
+
+class TestSegmentStore:
+    """Tests for the append-only segment file sink of user actions."""
+
+    @pytest.mark.asyncio
+    async def test_scan_filters_by_time_range_and_user(self, tmp_path: Path) -> None:
+        """Frames are selected from the sidecar index, and their events filtered by time and user."""
+        store = await _store(tmp_path)
+        assert await store.log_events(_events("alice", 0, 5)) == 5
+        assert await store.log_events(_events("bob", 5, 5)) == 5
+
+        assert len(await store.query()) == 10
+        in_range = await store.query(since=START + timedelta(minutes=3), until=START + timedelta(minutes=7))
+        assert [event["event_name"] for event in in_range] == ["event-3", "event-4", "event-5", "event-6"]
+        bob = await store.query(user_auth_id="bob", limit=2)
+        assert [event["event_name"] for event in bob] == ["event-5", "event-6"]
+        assert bob[0]["timestamp"] == START + timedelta(minutes=5)
+        assert bob[0]["event_payload"] == {"i": 5}
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_rotates_segments_at_max_bytes(self, tmp_path: Path) -> None:
+        """A segment reaching max_bytes is sealed and the next frame starts a new one."""
+        store = await _store(tmp_path, max_bytes=1)
+        for first in range(0, 9, 3):
+            _ = await store.log_events(_events("alice", first, 3))
+        await store.close()
+
+        # Three sealed segments, and the empty one started after the last frame
+        assert len(store.segments()) == 4
+        assert len(await store.query(user_auth_id="alice")) == 9
+
+    @pytest.mark.asyncio
+    async def test_open_truncates_a_torn_frame_and_rebuilds_the_index(self, tmp_path: Path) -> None:
+        """After a crash, the last segment keeps its complete frames and a new segment is started."""
+        store = await _store(tmp_path)
+        _ = await store.log_events(_events("alice", 0, 3))
+        _ = await store.log_events(_events("alice", 3, 3))
+        await store.close()
+        segment = store.segments()[-1]
+        size = segment.stat().st_size
+        with segment.open("ab") as file:
+            _ = file.write(b"UAF1\x00\x00\x10\x00torn")
+        segment.with_suffix(INDEX_SUFFIX).unlink()
+
+        reopened = await _store(tmp_path)
+
+        assert segment.stat().st_size == size
+        assert len(segment.with_suffix(INDEX_SUFFIX).read_text().splitlines()) == 2
+        assert len(reopened.segments()) == 2
+        assert len(await reopened.query()) == 6
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_compact_loads_sealed_segments_into_the_database(
+        self, tmp_path: Path, db_manager: DatabaseManager
+    ) -> None:
+        """Sealed segments are inserted into AUTH_USER_ACTION and deleted; the active one is left alone."""
+        user_id = f"test-user-{uuid.uuid4()}"
+        store = await _store(tmp_path, max_bytes=1)
+        _ = await store.log_events(_events(user_id, 0, 3))
+        _ = await store.log_events(_events(user_id, 3, 2))
+
+        assert await store.compact(AuthRepository(db_manager=db_manager)) == 5
+
+        assert len(store.segments()) == 1  # the active segment
+        assert await store.query() == []
+        async with db_manager.get_session(readonly=True) as session:
+            actions = (await session.exec(select(UserAction).where(UserAction.user_auth_id == user_id))).all()
+        assert sorted(action.timestamp for action in actions) == [START + timedelta(minutes=i) for i in range(5)]
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_compact_resumes_after_the_checkpoint(self, tmp_path: Path) -> None:
+        """Frames before the checkpoint of an interrupted load are not loaded twice."""
+        store = await _store(tmp_path)
+        _ = await store.log_events(_events("alice", 0, 3))
+        _ = await store.log_events(_events("alice", 3, 2))
+        await store.close()
+        segment = store.segments()[0]
+        first_frame = FrameIndex.from_line(segment.with_suffix(INDEX_SUFFIX).read_text().splitlines()[0])
+        _ = segment.with_suffix(CHECKPOINT_SUFFIX).write_text(str(first_frame.offset + first_frame.length))
+        repository = MagicMock(spec=AuthRepository)
+        repository.log_events = AsyncMock(side_effect=len)
+
+        store = await _store(tmp_path)
+        assert await store.compact(repository) == 2
+
+        loaded = repository.log_events.await_args.args[0]
+        assert [event["event_name"] for event in loaded] == ["event-3", "event-4"]
+        assert not segment.exists()
+        assert not segment.with_suffix(CHECKPOINT_SUFFIX).exists()
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_stores_sharing_a_directory_leave_each_others_active_segment_alone(self, tmp_path: Path) -> None:
+        """A second store (another worker) neither recovers nor compacts the segment the first is appending to."""
+        first = await _store(tmp_path)
+        _ = await first.log_events(_events("alice", 0, 3))
+        active = first.segments()[0]
+        size = active.stat().st_size
+        repository = MagicMock(spec=AuthRepository)
+        repository.log_events = AsyncMock(side_effect=len)
+
+        second = await _store(tmp_path)
+        assert await second.compact(repository) == 0
+
+        assert active.exists() and active.stat().st_size == size
+        _ = await first.log_events(_events("alice", 3, 2))
+        await first.close()
+        assert await second.compact(repository) == 5
+        assert not active.exists()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_open_recovers_the_last_segment_of_every_stopped_writer(self, tmp_path: Path) -> None:
+        """Torn frames are truncated from the last segment of each writer that no longer holds it."""
+        store = await _store(tmp_path)
+        _ = await store.log_events(_events("alice", 0, 2))
+        await store.close()
+        segment = store.segments()[0]
+        # The same segment, as written by another worker
+        other = segment.with_name(f"{SEGMENT_PREFIX}00000000-1{SEGMENT_SUFFIX}")
+        _ = other.write_bytes(segment.read_bytes())
+        _ = other.with_suffix(INDEX_SUFFIX).write_text(segment.with_suffix(INDEX_SUFFIX).read_text())
+        size = segment.stat().st_size
+        for path in (segment, other):
+            with path.open("ab") as file:
+                _ = file.write(b"torn")
+
+        reopened = await _store(tmp_path)
+
+        assert segment.stat().st_size == other.stat().st_size == size
+        assert len(await reopened.query()) == 4
+        await reopened.close()
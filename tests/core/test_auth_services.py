@@ -1,4 +1,5 @@
 from datetime import datetime
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -29,6 +30,15 @@ def mock_settings() -> Settings:
     settings.jwks_cache_ttl_seconds = 3600
     settings.user_cache_ttl_seconds = 3600
     settings.is_debug = False
+    settings.audit_write_behind = False
+    settings.audit_batch_size = 100
+    settings.audit_flush_interval = 1.0
+    settings.audit_max_queue = 10000
+    settings.audit_overflow_policy = "drop"
+    settings.audit_spill_path = "./logs/audit_spill.ndjson"
+    settings.audit_sink = "database"
+    settings.audit_rollups = False
+    settings.audit_rollup_compact_interval = 0
     return settings
 
 
@@ -786,11 +796,13 @@ class TestAuthServiceBackgroundTasks:
             mock_transaction.return_value.__aenter__.return_value = mock_session
 
             with (
-                patch.object(auth_service, "get_user_by_id", return_value=mock_user_profile),
+                patch.object(auth_service, "get_user_by_id", return_value=mock_user_profile) as mock_fetch,
                 patch.object(auth_service, "_save_user_profile_to_database_with_session", create=True) as mock_save,
             ):
                 await auth_service.background_update_user_info(TEST_TOKEN, TEST_USER_ID)
 
+                # Fetched without a session, and without a write of its own, before the transaction opens
+                _ = mock_fetch.assert_awaited_once_with(TEST_USER_ID, from_cache=False, persist=False)
                 _ = mock_save.assert_awaited_once_with(mock_session, mock_user_profile)
 
     @pytest.mark.asyncio
@@ -864,3 +876,74 @@ class TestAuthServiceEventLogging:
             result = await log_event(event_type="auth", event_name="login", event_source="supabase")
 
             assert result is False
+
+    @pytest.mark.asyncio
+    async def test_log_event_write_behind(self, mock_settings: MagicMock, mock_repository: AsyncMock) -> None:
+        """Without a session, events are queued on the audit writer and written in batches on teardown."""
+        mock_settings.audit_write_behind = True
+        mock_repository.log_events.return_value = 2
+        service = AuthService()
+        with (
+            patch("faster.core.auth.services.AuthProxy"),
+            patch("faster.core.auth.services.AuthRepository", return_value=mock_repository),
+        ):
+            assert await service.setup(mock_settings) is True
+
+        for name in ("login", "logout"):
+            assert await service.log_event_raw(event_type="auth", event_name=name, event_source="supabase") is True
+        mock_repository.log_event.assert_not_awaited()
+
+        assert await service.teardown() is True
+        mock_repository.log_events.assert_awaited_once()
+        events = mock_repository.log_events.await_args.args[0]
+        assert [event["event_name"] for event in events] == ["login", "logout"]
+
+    @pytest.mark.asyncio
+    async def test_segments_sink_without_compaction_warns(
+        self, mock_settings: MagicMock, mock_repository: AsyncMock, tmp_path: Path
+    ) -> None:
+        """Choosing the segments sink with compaction disabled is reported: its events never reach the table."""
+        mock_settings.audit_write_behind = True
+        mock_settings.audit_sink = "segments"
+        mock_settings.audit_segment_dir = str(tmp_path)
+        mock_settings.audit_segment_max_bytes = 1024
+        mock_settings.audit_segment_fsync = False
+        mock_settings.audit_segment_compact_interval = 0
+        service = AuthService()
+        with (
+            patch("faster.core.auth.services.AuthProxy"),
+            patch("faster.core.auth.services.AuthRepository", return_value=mock_repository),
+            patch("faster.core.auth.services.logger") as logger,
+        ):
+            assert await service.setup(mock_settings) is True
+
+        assert any("compaction is disabled" in call.args[0] for call in logger.warning.call_args_list)
+        assert await service.teardown() is True
+
+    @pytest.mark.asyncio
+    async def test_log_event_write_behind_counts_rollups_per_batch(
+        self, mock_settings: MagicMock, mock_repository: AsyncMock
+    ) -> None:
+        """Queued events are counted in the rollups by the audit writer, not on the request."""
+        mock_settings.audit_write_behind = True
+        mock_settings.audit_rollups = True
+        mock_repository.log_events.return_value = 2
+        service = AuthService()
+        with (
+            patch("faster.core.auth.services.AuthProxy"),
+            patch("faster.core.auth.services.AuthRepository", return_value=mock_repository),
+        ):
+            assert await service.setup(mock_settings) is True
+
+        with (
+            patch("faster.core.auth.services.record_rollup", new_callable=AsyncMock) as record_one,
+            patch("faster.core.auth.audit.record_rollups", new_callable=AsyncMock) as record_batch,
+        ):
+            for name in ("login", "logout"):
+                assert await service.log_event_raw(event_type="auth", event_name=name, event_source="api") is True
+            record_one.assert_not_awaited()
+
+            assert await service.teardown() is True
+            record_batch.assert_awaited_once()
+            events = [event for call in record_batch.await_args_list for event in call.args[0]]
+            assert [event["event_name"] for event in events] == ["login", "logout"]
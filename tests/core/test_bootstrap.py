@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Generator
 import signal
 import sys
@@ -11,6 +12,7 @@ from starlette.routing import Route
 
 from faster.core import bootstrap
 from faster.core.config import Settings
+from faster.core.event_bus import Event, EventBus
 
 # Individual tests are marked with @pytest.mark.asyncio as needed
 
@@ -191,6 +193,30 @@ def test_create_app_lifespan(mock_settings: Settings) -> None:
         close_mock.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_teardown_handles_queued_events_before_plugins(mock_plugin_mgr: MagicMock) -> None:
+    """Teardown drains the in-process event bus and stops its workers, then tears down the plugins."""
+    bus = EventBus(MagicMock())
+    handled: list[str] = []
+
+    async def handler(event: Event[Any]) -> None:
+        await asyncio.sleep(0.01)
+        mock_plugin_mgr.teardown.assert_not_awaited()
+        handled.append(event.event_id)
+
+    bus.subscribe("bootstrap-test", handler)
+    for _ in range(3):
+        _ = await bus.dispatch_event(Event[Any](), channel="bootstrap-test")
+
+    with patch("faster.core.bootstrap.event_bus", bus):
+        await bootstrap._teardown_all(FastAPI())  # pyright: ignore[reportPrivateUsage]
+
+    assert len(handled) == 3
+    assert bus.get_stats()["bootstrap-test"]["queued"] == 0
+    assert bus._groups["bootstrap-test"].worker is None  # pyright: ignore[reportPrivateUsage]
+    mock_plugin_mgr.teardown.assert_awaited_once()
+
+
 def test_create_app_lifespan_plugin_setup_failure(mock_settings: Settings) -> None:
     """Test that create_app handles plugin setup failures gracefully."""
     app = bootstrap.create_app(settings=mock_settings)
@@ -235,8 +261,9 @@ def test_create_app_with_routers_and_middlewares(mock_settings: Settings) -> Non
         middlewares=[CustomMiddleware],
     )
 
-    # Gzip, TrustedHost, Auth, CORS, Custom, CorrelationIdMiddleware, SentryAsgiMiddleware
-    assert len(app.user_middleware) == 7
+    # Gzip, TrustedHost, Auth, BatchLoader, UnitOfWork, CORS, Custom, CorrelationIdMiddleware, SentryAsgiMiddleware,
+    # HttpMetrics
+    assert len(app.user_middleware) == 10
 
     # Check if the custom route exists in the app's routes
     route_paths = [route.path for route in app.routes if isinstance(route, Route)]
@@ -16,7 +16,7 @@ import uuid
 from pydantic import BaseModel
 import pytest
 
-from faster.core.event_bus import Event, EventStatus, event_bus
+from faster.core.event_bus import Event, EventBus, EventStatus, OverflowPolicy, event_bus, subscribe_events
 
 # Constants for testing
 TEST_CHANNEL = "test_channel"
@@ -294,3 +294,182 @@ class TestEventBus:
         # Assert
         assert result == []
         mock_logger.warning.assert_called_once_with(f"Failed to subscribe to channel: {TEST_CHANNEL}")
+
+
+@pytest.mark.asyncio
+class TestInProcessDispatch:
+    """Tests for the in-process transport of the EventBus."""
+
+    def _make_bus(self, **kwargs: Any) -> tuple[EventBus, MagicMock]:
+        redis_client = MagicMock()
+        redis_client.publish = AsyncMock(return_value=1)
+        return EventBus(redis_client, **kwargs), redis_client
+
+    async def test_dispatch_delivers_event_by_reference(self) -> None:
+        bus, redis_client = self._make_bus()
+        received: list[Event[Any]] = []
+
+        async def handler(event: Event[Any]) -> None:
+            received.append(event)
+
+        bus.subscribe(TEST_CHANNEL, handler)
+        event = Event[dict[str, Any]](payload={"a": 1})
+
+        assert await bus.dispatch_event(event, TEST_CHANNEL) == 1
+        await bus.drain()
+
+        assert received == [event]
+        assert received[0] is event
+        redis_client.publish.assert_not_called()
+        await bus.shutdown()
+
+    async def test_dispatch_fans_out_to_groups_and_keeps_order_within_group(self) -> None:
+        bus, _ = self._make_bus()
+        calls: list[str] = []
+
+        async def first(event: Event[Any]) -> None:
+            calls.append(f"first:{event.payload}")
+
+        async def second(event: Event[Any]) -> None:
+            calls.append(f"second:{event.payload}")
+
+        async def other(event: Event[Any]) -> None:
+            calls.append(f"other:{event.payload}")
+
+        bus.subscribe(TEST_CHANNEL, first, group="g1")
+        bus.subscribe(TEST_CHANNEL, second, group="g1")
+        bus.subscribe(TEST_CHANNEL, other, group="g2")
+
+        assert await bus.dispatch_event(Event[int](payload=1), TEST_CHANNEL) == 2
+        await bus.drain()
+
+        g1_calls = [c for c in calls if not c.startswith("other")]
+        assert g1_calls == ["first:1", "second:1"]
+        assert "other:1" in calls
+        assert bus.get_stats()["g1"]["delivered"] == 1
+        await bus.shutdown()
+
+    async def test_dispatch_uses_event_type_as_default_channel(self) -> None:
+        bus, _ = self._make_bus()
+        handler = AsyncMock()
+        bus.subscribe("MyLocalEvent", handler)
+
+        event = Event[dict[str, Any]](event_type="MyLocalEvent")
+        assert await bus.dispatch_event(event) == 1
+        await bus.drain()
+
+        handler.assert_awaited_once_with(event)
+        await bus.shutdown()
+
+    async def test_dispatch_without_channel_raises(self) -> None:
+        bus, _ = self._make_bus()
+        event = Event[dict[str, Any]]()
+        event.event_type = None
+        with pytest.raises(ValueError, match="Cannot dispatch event"):
+            _ = await bus.dispatch_event(event)
+
+    async def test_handler_failure_does_not_stop_worker(self) -> None:
+        bus, _ = self._make_bus()
+        good = AsyncMock()
+        bad = AsyncMock(side_effect=RuntimeError("boom"))
+        bus.subscribe(TEST_CHANNEL, bad, group="g")
+        bus.subscribe(TEST_CHANNEL, good, group="g")
+
+        _ = await bus.dispatch_event(Event[int](payload=1), TEST_CHANNEL)
+        _ = await bus.dispatch_event(Event[int](payload=2), TEST_CHANNEL)
+        await bus.drain()
+
+        assert good.await_count == 2
+        assert bus.get_stats()["g"]["failed"] == 2
+        await bus.shutdown()
+
+    async def test_drop_oldest_policy_discards_oldest_event(self) -> None:
+        bus, _ = self._make_bus()
+        gate = asyncio.Event()
+        seen: list[Any] = []
+
+        async def slow(event: Event[Any]) -> None:
+            await gate.wait()
+            seen.append(event.payload)
+
+        bus.subscribe(TEST_CHANNEL, slow, maxsize=2, overflow=OverflowPolicy.DROP_OLDEST)
+        _ = await bus.dispatch_event(Event[int](payload=0), TEST_CHANNEL)
+        await asyncio.sleep(0)  # let the worker pick up event 0 and block on the gate
+        for i in range(1, 4):
+            _ = await bus.dispatch_event(Event[int](payload=i), TEST_CHANNEL)
+
+        gate.set()
+        await bus.drain()
+
+        assert seen == [0, 2, 3]
+        assert bus.get_stats()[TEST_CHANNEL]["dropped"] == 1
+        await bus.shutdown()
+
+    async def test_spill_policy_publishes_to_redis(self) -> None:
+        bus, redis_client = self._make_bus(queue_size=1, overflow=OverflowPolicy.SPILL)
+        gate = asyncio.Event()
+
+        async def slow(event: Event[Any]) -> None:
+            await gate.wait()
+
+        bus.subscribe(TEST_CHANNEL, slow)
+        _ = await bus.dispatch_event(Event[int](payload=0), TEST_CHANNEL)
+        await asyncio.sleep(0)
+        _ = await bus.dispatch_event(Event[int](payload=1), TEST_CHANNEL)
+        spilled = Event[int](payload=2)
+        assert await bus.dispatch_event(spilled, TEST_CHANNEL) == 0
+
+        redis_client.publish.assert_awaited_once_with(TEST_CHANNEL, spilled.model_dump_json())
+        assert bus.get_stats()[TEST_CHANNEL]["spilled"] == 1
+        gate.set()
+        await bus.shutdown()
+
+    async def test_block_policy_waits_for_free_slot(self) -> None:
+        bus, _ = self._make_bus(queue_size=1)
+        gate = asyncio.Event()
+        seen: list[Any] = []
+
+        async def slow(event: Event[Any]) -> None:
+            await gate.wait()
+            seen.append(event.payload)
+
+        bus.subscribe(TEST_CHANNEL, slow)
+        _ = await bus.dispatch_event(Event[int](payload=0), TEST_CHANNEL)
+        await asyncio.sleep(0)
+        _ = await bus.dispatch_event(Event[int](payload=1), TEST_CHANNEL)
+
+        blocked = asyncio.create_task(bus.dispatch_event(Event[int](payload=2), TEST_CHANNEL))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        gate.set()
+        assert await blocked == 1
+        await bus.drain()
+        assert seen == [0, 1, 2]
+        await bus.shutdown()
+
+    async def test_unsubscribe_removes_empty_group(self) -> None:
+        bus, _ = self._make_bus()
+        handler = AsyncMock()
+        bus.subscribe(TEST_CHANNEL, handler)
+        bus.unsubscribe(TEST_CHANNEL, handler)
+
+        assert bus.get_stats() == {}
+        assert await bus.dispatch_event(Event[int](payload=1), TEST_CHANNEL) == 0
+
+    async def test_group_bound_to_other_channel_raises(self) -> None:
+        bus, _ = self._make_bus()
+        bus.subscribe("a", AsyncMock(), group="g")
+        with pytest.raises(ValueError, match="already bound"):
+            bus.subscribe("b", AsyncMock(), group="g")
+
+    async def test_subscribe_events_decorator_registers_on_singleton(self) -> None:
+        @subscribe_events("decorator_channel", group="decorator_group")
+        async def handler(event: Event[Any]) -> None:
+            return None
+
+        try:
+            assert "decorator_group" in event_bus.get_stats()
+            assert event_bus.get_stats()["decorator_group"]["channel"] == "decorator_channel"
+        finally:
+            event_bus.unsubscribe("decorator_channel", handler)
@@ -0,0 +1,303 @@
+"""
+Tests for the embedded in-memory Redis-compatible provider.
+"""
+
+import asyncio
+from typing import cast
+
+import pytest
+from redis.exceptions import ResponseError
+
+from faster.core.config import Settings
+from faster.core.memory_redis import MemoryPubSub, MemoryRedis, TimingWheel
+from faster.core.redis import RedisClient, RedisManager, RedisOperationError, RedisProvider
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, start: float = 1000.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock: FakeClock) -> MemoryRedis:
+    return MemoryRedis(clock=clock)
+
+
+@pytest.fixture
+def client(store: MemoryRedis) -> RedisClient:
+    return RedisClient(store)
+
+
+class TestTimingWheel:
+    """Tests for the hierarchical timing wheel."""
+
+    def test_fires_items_at_their_tick(self) -> None:
+        wheel = TimingWheel(start_tick=0)
+        wheel.schedule("a", 3)
+        wheel.schedule("b", 70)
+        wheel.schedule("c", 5000)
+
+        assert list(wheel.advance(2)) == []
+        assert list(wheel.advance(3)) == [("a", 3)]
+        assert list(wheel.advance(69)) == []
+        assert list(wheel.advance(70)) == [("b", 70)]
+        assert list(wheel.advance(4999)) == []
+        assert list(wheel.advance(5000)) == [("c", 5000)]
+        assert len(wheel) == 0
+
+    def test_past_ticks_fire_on_next_advance(self) -> None:
+        wheel = TimingWheel(start_tick=100)
+        wheel.schedule("late", 50)
+        assert list(wheel.advance(101)) == [("late", 50)]
+
+    def test_far_future_items_are_clamped_and_recascaded(self) -> None:
+        wheel = TimingWheel(start_tick=0)
+        far = (1 << 24) + 10
+        wheel.schedule("far", far)
+
+        assert list(wheel.advance(far - 1)) == []  # parked item is re-placed, not fired early
+        assert len(wheel) == 1
+        assert list(wheel.advance(far)) == [("far", far)]
+
+    def test_advance_on_empty_wheel_jumps(self) -> None:
+        wheel = TimingWheel(start_tick=0)
+        assert list(wheel.advance(10**9)) == []
+        assert wheel.current_tick == 10**9
+
+
+@pytest.mark.asyncio
+class TestMemoryRedisCommands:
+    """Tests for the data-type commands exposed through RedisClient."""
+
+    async def test_strings(self, client: RedisClient) -> None:
+        assert await client.set("k", "v") is True
+        assert await client.get("k") == "v"
+        assert await client.set("k", "other", nx=True) is False
+        assert await client.set("missing", "v", xx=True) is False
+        assert await client.exists("k", "missing") == 1
+        assert await client.delete("k", "missing") == 1
+        assert await client.get("k") is None
+
+    async def test_incr_decr(self, client: RedisClient) -> None:
+        assert await client.incr("counter") == 1
+        assert await client.incr("counter", 5) == 6
+        assert await client.decr("counter", 2) == 4
+        _ = await client.set("text", "abc")
+        with pytest.raises(RedisOperationError):
+            _ = await client.incr("text")
+
+    async def test_hashes(self, client: RedisClient) -> None:
+        assert await client.hset("h", {"a": "1", "b": 2}) == 2
+        assert await client.hset("h", {"a": "x"}) == 0
+        assert await client.hget("h", "a") == "x"
+        assert await client.hgetall("h") == {"a": "x", "b": "2"}
+        assert await client.hdel("h", "a", "b") == 2
+        assert await client.exists("h") == 0
+
+    async def test_lists(self, client: RedisClient) -> None:
+        assert await client.lpush("l", "a", "b") == 2
+        assert await client.rpush("l", "c") == 3
+        assert await client.llen("l") == 3
+        assert await client.lpop("l") == "b"
+        assert await client.rpop("l") == "c"
+        assert await client.lpop("l") == "a"
+        assert await client.lpop("l") is None
+        assert await client.exists("l") == 0
+
+    async def test_sets(self, client: RedisClient) -> None:
+        assert await client.sadd("s", "a", "b", "a") == 2
+        assert await client.sismember("s", "a") is True
+        assert await client.smembers("s") == {"a", "b"}
+        assert await client.srem("s", "a", "z") == 1
+        assert await client.smembers("s") == {"b"}
+
+    async def test_hincrby(self, client: RedisClient) -> None:
+        assert await client.hincrby("h", "a") == 1
+        assert await client.hincrby("h", "a", 4) == 5
+        assert await client.hgetall("h") == {"a": "5"}
+
+    async def test_hyperloglogs_count_exactly(self, client: RedisClient) -> None:
+        assert await client.pfadd("hll:1", "a", "b") == 1
+        assert await client.pfadd("hll:1", "a") == 0
+        assert await client.pfadd("hll:2", "b", "c") == 1
+        assert await client.pfcount("hll:1") == 2
+        assert await client.pfcount("hll:1", "hll:2", "missing") == 3
+        assert await client.pfmerge("hll:all", "hll:1", "hll:2") is True
+        assert await client.pfcount("hll:all") == 3
+
+    async def test_pipeline_runs_commands_in_order(self, client: RedisClient) -> None:
+        results = await client.pipeline([("hincrby", ("h", "a", 2)), ("expire", ("h", 60)), ("hgetall", ("h",))])
+        assert results == [2, True, {"a": "2"}]
+        assert await client.ttl("h") == 60
+
+    async def test_wrong_type_raises(self, client: RedisClient) -> None:
+        _ = await client.set("k", "v")
+        with pytest.raises(RedisOperationError, match="WRONGTYPE"):
+            _ = await client.hget("k", "field")
+
+    async def test_keys_pattern(self, store: MemoryRedis) -> None:
+        _ = await store.set("sys_map:a", "1")
+        _ = await store.set("sys_map:b", "1")
+        _ = await store.set("other", "1")
+        assert sorted(await store.keys("sys_map:*")) == ["sys_map:a", "sys_map:b"]
+
+    async def test_bytes_when_not_decoding(self) -> None:
+        store = MemoryRedis(decode_responses=False)
+        _ = await store.set("k", "v")
+        _ = await store.hset("h", mapping={"f": "v"})
+        assert await store.get("k") == b"v"
+        assert await store.hgetall("h") == {b"f": b"v"}
+
+    async def test_invalid_input_type(self, store: MemoryRedis) -> None:
+        with pytest.raises(ResponseError):
+            _ = await store.set("k", True)
+
+    async def test_ping_and_flushdb(self, client: RedisClient) -> None:
+        _ = await client.set("k", "v")
+        assert await client.ping() is True
+        assert await client.flushdb() is True
+        assert await client.exists("k") == 0
+
+
+@pytest.mark.asyncio
+class TestMemoryRedisExpiry:
+    """Tests for TTL handling."""
+
+    async def test_ttl_and_lazy_expiry(self, client: RedisClient, clock: FakeClock) -> None:
+        _ = await client.set("k", "v", ex=10)
+        assert await client.ttl("k") == 10
+        assert await client.ttl("persistent") == -2
+        _ = await client.set("persistent", "v")
+        assert await client.ttl("persistent") == -1
+
+        clock.advance(9.5)
+        assert await client.get("k") == "v"
+        clock.advance(1)
+        assert await client.get("k") is None
+
+    async def test_wheel_reclaims_expired_keys_without_access(self, store: MemoryRedis, clock: FakeClock) -> None:
+        for i in range(100):
+            _ = await store.set(f"k{i}", "v", ex=5)
+        _ = await store.set("keep", "v")
+        assert store.info()["pending_expirations"] == 100
+
+        clock.advance(6)
+        assert await store.ping() is True
+
+        info = store.info()
+        assert info["keys"] == 1
+        assert info["expired_keys"] == 100
+        assert info["pending_expirations"] == 0
+
+    async def test_set_without_ex_clears_ttl(self, store: MemoryRedis, clock: FakeClock) -> None:
+        _ = await store.set("k", "v", ex=5)
+        _ = await store.set("k", "v2")
+        clock.advance(10)
+        assert await store.get("k") == "v2"
+
+    async def test_expire_updates_ttl(self, store: MemoryRedis, clock: FakeClock) -> None:
+        _ = await store.set("k", "v", ex=5)
+        assert await store.expire("k", 100) is True
+        clock.advance(10)
+        assert await store.get("k") == "v"
+        assert await store.expire("missing", 10) is False
+        assert await store.expire("k", 0) is True
+        assert await store.get("k") is None
+
+
+@pytest.mark.asyncio
+class TestMemoryRedisEviction:
+    """Tests for the LRU memory cap."""
+
+    async def test_evicts_least_recently_used(self) -> None:
+        store = MemoryRedis(max_memory=500)
+        for i in range(4):
+            _ = await store.set(f"k{i}", "x" * 50)
+        _ = await store.get("k0")  # k0 becomes most recently used
+        for i in range(4, 6):
+            _ = await store.set(f"k{i}", "x" * 50)
+
+        assert store.used_memory <= 500
+        assert store.evicted_keys == 2
+        assert await store.get("k0") is not None
+        assert await store.get("k1") is None
+        assert await store.get("k2") is None
+        assert await store.get("k3") is not None
+
+    async def test_memory_accounting_returns_to_zero(self) -> None:
+        store = MemoryRedis(max_memory=10_000)
+        _ = await store.hset("h", mapping={"a": "1", "b": "2"})
+        _ = await store.rpush("l", "a", "b")
+        _ = await store.sadd("s", "a")
+        _ = await store.set("k", "v")
+        _ = await store.incr("n")
+        _ = await store.delete("k", "n")
+        _ = await store.hdel("h", "a", "b")
+        _ = await store.lpop("l")
+        _ = await store.rpop("l")
+        _ = await store.srem("s", "a")
+        assert store.used_memory == 0
+
+
+@pytest.mark.asyncio
+class TestMemoryRedisPubSub:
+    """Tests for in-process publish/subscribe."""
+
+    async def test_publish_reaches_subscribers(self, client: RedisClient) -> None:
+        pubsub = await client.subscribe("chan")
+        assert await client.publish("chan", "hello") == 1
+        assert await client.publish("nobody", "hello") == 0
+
+        subscribe_msg = await pubsub.get_message(timeout=0.1)
+        message = await pubsub.get_message(timeout=0.1)
+        assert subscribe_msg["type"] == "subscribe"
+        assert message == {"type": "message", "pattern": None, "channel": "chan", "data": "hello"}
+
+        await pubsub.unsubscribe("chan")
+        assert await client.publish("chan", "again") == 0
+
+    async def test_listen_yields_messages(self, client: RedisClient) -> None:
+        pubsub = cast(MemoryPubSub, await client.subscribe("chan"))
+
+        async def consume() -> str:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    return str(message["data"])
+            return ""
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        _ = await client.publish("chan", "payload")
+        assert await asyncio.wait_for(task, 1) == "payload"
+        await pubsub.aclose()
+
+
+@pytest.mark.asyncio
+class TestMemoryProviderSetup:
+    """Tests for selecting the provider through RedisManager."""
+
+    async def test_setup_with_memory_provider(self) -> None:
+        manager = RedisManager()
+        settings = Settings(redis_provider="memory", redis_max_memory=1024)
+        assert await manager.setup(settings) is True
+        assert manager.provider == RedisProvider.MEMORY
+
+        client = manager.get_client()
+        assert isinstance(client.client, MemoryRedis)
+        assert client.client.max_memory == 1024
+        assert await client.set("k", "v") is True
+        assert (await manager.check_health())["ping"] is True
+        assert await manager.teardown() is True
@@ -0,0 +1,99 @@
+from pathlib import Path
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import pytest
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from faster.core.auth.router_info import RouterInfo
+from faster.core.metrics import UNMATCHED_ROUTE, HttpMetricsMiddleware, generate_metrics
+
+ITEM_ROUTE = "/metrics-test/items/{item_id}"
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _client(router_info: RouterInfo | None = None, deny: bool = False) -> TestClient:
+    """An app with one parametrized route, optionally behind a middleware answering 403 before routing."""
+    app = FastAPI()
+
+    @app.get(ITEM_ROUTE)
+    async def get_item(item_id: int) -> dict[str, int | float]:
+        return {"item_id": item_id, "in_flight": _sample("http_requests_in_flight")}
+
+    def deny_all(inner: ASGIApp) -> ASGIApp:
+        async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+            await JSONResponse({"detail": "denied"}, status_code=403)(scope, receive, send)
+
+        return middleware
+
+    if deny:
+        app.add_middleware(deny_all)
+    app.add_middleware(HttpMetricsMiddleware, router_info=router_info or RouterInfo())
+    return TestClient(app)
+
+
+class TestHttpMetricsMiddleware:
+    """Tests for the HTTP request metrics middleware."""
+
+    def test_records_requests_by_route_template(self) -> None:
+        labels = {"method": "GET", "route": ITEM_ROUTE}
+        requests = _sample("http_requests_total", **labels, status="200")
+        observed = _sample("http_request_duration_seconds_count", **labels)
+        size = _sample("http_response_size_bytes_sum", **labels)
+        client = _client()
+
+        first = client.get("/metrics-test/items/1")
+        second = client.get("/metrics-test/items/2")
+
+        assert _sample("http_requests_total", **labels, status="200") == requests + 2
+        assert _sample("http_request_duration_seconds_count", **labels) == observed + 2
+        assert _sample("http_response_size_bytes_sum", **labels) == size + len(first.content) + len(second.content)
+        # The request itself was in flight while it was answered
+        assert first.json()["in_flight"] >= 1
+        assert _sample("http_requests_in_flight") == 0
+
+    def test_unmatched_paths_share_one_route_label(self) -> None:
+        labels = {"method": "GET", "route": UNMATCHED_ROUTE, "status": "404"}
+        requests = _sample("http_requests_total", **labels)
+        client = _client()
+
+        assert client.get("/metrics-test/nowhere/1").status_code == 404
+        assert client.get("/metrics-test/nowhere/2").status_code == 404
+
+        assert _sample("http_requests_total", **labels) == requests + 2
+
+    def test_requests_answered_before_routing_use_router_info(self) -> None:
+        router_info = MagicMock(spec=RouterInfo)
+        router_info.find_path_template.return_value = ITEM_ROUTE
+        labels = {"method": "GET", "route": ITEM_ROUTE, "status": "403"}
+        requests = _sample("http_requests_total", **labels)
+
+        assert _client(router_info, deny=True).get("/metrics-test/items/1").status_code == 403
+
+        assert _sample("http_requests_total", **labels) == requests + 1
+        router_info.find_path_template.assert_called_once_with("GET", "/metrics-test/items/1")
+
+
+def test_generate_metrics_aggregates_all_workers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """In multiprocess mode, the metrics written by each worker process are summed."""
+    worker = (
+        "from prometheus_client import Counter; "
+        "Counter('metrics_test_worker_jobs', 'Jobs done', ['kind']).labels('sync').inc(3)"
+    )
+    env = {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        _ = subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert 'metrics_test_worker_jobs_total{kind="sync"} 6.0' in generate_metrics().decode()
+
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR")
+    assert "metrics_test_worker_jobs" not in generate_metrics().decode()
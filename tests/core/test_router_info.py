@@ -204,6 +204,25 @@ class TestRouterInfoRouteFinding:
             assert result is None
             mock_logger.error.assert_called_once_with("Route finder not initialized. Call create_route_finder first.")
 
+    def test_find_path_template(self) -> None:
+        """The path template of the matching route; None, without logging, before the finder is created."""
+        router_info = RouterInfo()
+        with patch("faster.core.auth.router_info.logger") as mock_logger:
+            assert router_info.find_path_template("GET", "/api/items/1") is None
+            mock_logger.error.assert_not_called()
+
+        finder = MagicMock(return_value="GET /api/items/{item_id}")
+        router_info._route_finder = finder  # type: ignore[reportPrivateUsage, unused-ignore]
+        router_info._route_cache["GET /api/items/{item_id}"] = {  # type: ignore[reportPrivateUsage, unused-ignore]
+            "method": "GET",
+            "path": "/api/items/{item_id}",
+            "path_template": "/api/items/{item_id}",
+            "name": "item",
+            "tags": [],
+            "allowed_roles": set(),
+        }
+        assert router_info.find_path_template("GET", "/api/items/1") == "/api/items/{item_id}"
+
 
 class TestRouterInfoTagRoleMapping:
     """Test RouterInfo tag-role mapping functionality."""
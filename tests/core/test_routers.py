@@ -13,6 +13,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 import pytest
 
+from faster.core.database import SQLInstrumentation
 from faster.core.routers import dev_router
 
 
@@ -43,6 +44,23 @@ class TestDevRouter:
         # Check that the content contains HTML
         assert "<!DOCTYPE html>" in response.text or "<html" in response.text.lower()
 
+    @patch("faster.core.routers.DatabaseManager")
+    def test_sql_stats_endpoint(self, mock_db_manager_class: MagicMock, client: TestClient) -> None:
+        """Test the SQL stats endpoint returns the instrumentation snapshot, or an error when disabled."""
+        instrumentation = SQLInstrumentation()
+        instrumentation.record("SELECT * FROM t WHERE id = ?", [1], 0.01)
+        mock_db_manager_class.get_instance.return_value.sql_instrumentation = instrumentation
+
+        response = client.get("/dev/sql_stats", params={"top": 5})
+        assert response.status_code == 200
+        statements = response.json()["data"]["statements"]
+        assert statements[0]["statement"] == "SELECT * FROM t WHERE id = ?"
+        assert statements[0]["count"] == 1
+
+        mock_db_manager_class.get_instance.return_value.sql_instrumentation = None
+        response = client.get("/dev/sql_stats")
+        assert response.json()["status"] == "error"
+
     def test_settings_endpoint(self, client: TestClient) -> None:
         """Test the settings endpoint returns configuration data."""
         # Create a mock app state with settings